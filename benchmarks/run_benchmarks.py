@@ -0,0 +1,222 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 17:28:43 2026
+
+@author: Carlos
+
+Benchmarks the crawler against a local synthetic site. Example:
+
+    python benchmarks/run_benchmarks.py --pages 2000 --workers 4 16 64 \\
+        --parsers soup stream --latency 0.01 --compare results/base.json
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import platform
+import itertools
+import multiprocessing
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+BENCH_DIR = os.path.dirname(os.path.realpath(__file__))
+sys.path.append(os.path.join(BENCH_DIR, "..", "crawler"))
+
+from site_server import SyntheticSite, SiteServer
+
+
+def run_config(config, root_url):
+    """dict: crawls the site with the given configuration and measures it.
+    Note:
+        Runs in a fresh process, so the peak RSS and the CPU time only
+        account for this crawl.
+    """
+    import crawler as cw
+    from scheduler import PolitenessScheduler
+
+    scheduler = PolitenessScheduler(rate=config["rate"], burst=config["rate"])
+    crawler = cw.Crawler(
+        root_url, req_limit=config["req_limit"], scheduler=scheduler,
+        parser=config["parser"], url_store=config["url_store"],
+        frontier=config.get("frontier", "fifo"),
+        indentify_target=lambda page: page.valid_target)
+    crawler.logger.setLevel(logging.WARNING)
+
+    cpu0, t0 = cpu_time(), time.perf_counter()
+    if config["engine"] == "run":
+        crawler.run(config["workers"])
+    else:
+        crawler.run_async(config["workers"], config["parse_workers"])
+    elapsed = time.perf_counter() - t0
+    cpu = cpu_time() - cpu0
+
+    pages = list(crawler.target_pages.values())
+    pages += list(crawler.other_pages.values())
+    latencies = sorted(page.fetch_time for page in pages if page.fetch_time)
+    return dict(
+        config,
+        pages=len(pages),
+        targets=len(crawler.target_pages),
+        elapsed=elapsed,
+        pages_per_sec=len(pages)/elapsed if elapsed else 0.0,
+        fetch_p50=percentile(latencies, 50),
+        fetch_p99=percentile(latencies, 99),
+        cpu_time=cpu,
+        peak_rss_mb=peak_rss_mb())
+
+
+def percentile(values, q):
+    """float: q-th percentile of sorted values, None if there are none."""
+    if not values:
+        return None
+    index = min(len(values) - 1, int(round(q/100*(len(values) - 1))))
+    return values[index]
+
+
+def cpu_time():
+    """float: CPU seconds used by this process and its finished children."""
+    times = os.times()
+    return (times.user + times.system + times.children_user
+            + times.children_system)
+
+
+def peak_rss_mb():
+    """float: peak resident memory of this process, in megabytes."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak/1024**2 if sys.platform == "darwin" else peak/1024
+
+
+def _child(config, root_url, results):
+    results.put(run_config(config, root_url))
+
+
+def run_isolated(config, root_url):
+    """dict: runs 'run_config' in a new spawned process."""
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    process = context.Process(target=_child, args=(config, root_url, results))
+    process.start()
+    result = results.get()
+    process.join()
+    return result
+
+
+def _rounded(run):
+    """dict: copy of the run with the floats rounded for printing."""
+    return {key: round(value, 4) if isinstance(value, float) else value
+            for key, value in run.items()}
+
+
+def config_key(run):
+    """tuple: fields identifying a configuration across result files."""
+    return (run["engine"], run["parser"], run["workers"],
+            run["parse_workers"], run["url_store"], run.get("frontier", "fifo"))
+
+
+def compare(runs, baseline_file, tolerance):
+    """list: descriptions of the runs slower than the baseline."""
+    with open(baseline_file) as f:
+        baseline = {config_key(run): run for run in json.load(f)["runs"]}
+    regressions = []
+    for run in runs:
+        old = baseline.get(config_key(run))
+        if old and run["pages_per_sec"] < old["pages_per_sec"]*(1 - tolerance):
+            regressions.append("{}: {:.1f} -> {:.1f} pages/sec".format(
+                config_key(run), old["pages_per_sec"], run["pages_per_sec"]))
+    return regressions
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    site = parser.add_argument_group("site")
+    site.add_argument("--pages", type=int, default=1000)
+    site.add_argument("--fan-out", type=int, default=10)
+    site.add_argument("--page-size", type=int, default=20000)
+    site.add_argument("--target-share", type=float, default=0.2)
+    site.add_argument("--latency", type=float, default=0.005)
+    site.add_argument("--error-rate", type=float, default=0.0)
+    site.add_argument("--seed", type=int, default=0)
+
+    crawl = parser.add_argument_group("crawl")
+    crawl.add_argument("--engines", nargs="+", default=["run_async"],
+                       choices=["run", "run_async"])
+    crawl.add_argument("--workers", nargs="+", type=int, default=[4, 16])
+    crawl.add_argument("--parsers", nargs="+", default=["soup", "stream"])
+    crawl.add_argument("--parse-workers", nargs="+", type=int, default=[0])
+    crawl.add_argument("--url-stores", nargs="+", default=["set"])
+    crawl.add_argument("--frontiers", nargs="+", default=["fifo"],
+                       choices=["fifo", "priority"])
+    crawl.add_argument("--req-limit", type=int, default=None,
+                       help="defaults to the number of pages")
+    crawl.add_argument("--rate", type=float, default=1e6,
+                       help="requests per second allowed by the scheduler")
+
+    output = parser.add_argument_group("output")
+    output.add_argument("--output", default=os.path.join(BENCH_DIR, "results"))
+    output.add_argument("--compare", help="result file to compare against")
+    output.add_argument("--tolerance", type=float, default=0.1,
+                        help="allowed throughput drop before flagging it")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    site = SyntheticSite(
+        args.pages, args.fan_out, args.page_size, args.target_share,
+        args.latency, args.error_rate, args.seed)
+
+    configs = [
+        dict(engine=engine, parser=parser, workers=workers,
+             parse_workers=parse_workers, url_store=store, frontier=frontier,
+             req_limit=args.req_limit or args.pages, rate=args.rate)
+        for engine, parser, workers, parse_workers, store, frontier
+        in itertools.product(
+            args.engines, args.parsers, args.workers, args.parse_workers,
+            args.url_stores, args.frontiers)
+        if engine == "run_async" or parse_workers == 0
+    ]
+
+    runs = []
+    with SiteServer(site) as server:
+        for config in configs:
+            run = run_isolated(config, server.root_url)
+            runs.append(run)
+            print("{engine:9} {parser:6} workers={workers:<4} "
+                  "parse_workers={parse_workers:<3} {url_store:5} {frontier:8} "
+                  "{pages_per_sec:8.1f} pages/s  p50={fetch_p50}s  "
+                  "p99={fetch_p99}s  cpu={cpu_time:.2f}s  "
+                  "rss={peak_rss_mb}MB".format(**_rounded(run)))
+
+    os.makedirs(args.output, exist_ok=True)
+    filename = os.path.join(
+        args.output, time.strftime("bench-%Y%m%d-%H%M%S.json"))
+    with open(filename, "w") as f:
+        json.dump({
+            "site": {key: getattr(site, key) for key in (
+                "n_pages", "fan_out", "page_size", "target_share",
+                "latency", "error_rate", "seed")},
+            "environment": {
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "cpus": os.cpu_count()},
+            "runs": runs}, f, indent=2)
+    print("Results saved to {}".format(filename))
+
+    if args.compare:
+        regressions = compare(runs, args.compare, args.tolerance)
+        for regression in regressions:
+            print("REGRESSION " + regression)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
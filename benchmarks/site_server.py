@@ -0,0 +1,188 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 17:29:21 2026
+
+@author: Carlos
+"""
+
+import gzip
+import time
+import random
+import threading
+import functools
+import http.server
+
+
+class SyntheticSite(object):
+    """Deterministic site graph used to crawl without the network.
+    Note:
+        Pages are served as '/p<n>', '/p0' being the root. Every page links
+        to the next page, so the whole site is reachable from the root, and
+        to 'fan_out' - 1 pages chosen at random, seeded by the page number.
+        A share of the pages are targets, i.e. have a
+        '<div class="productName">' element. The html is padded up to
+        'page_size' bytes.
+    Args:
+        n_pages (int): number of pages of the site.
+        fan_out (int): number of links on each page.
+        page_size (int): approximate size of each page, in bytes.
+        target_share (float): share of target pages.
+        latency (float): mean delay before answering, in seconds, drawn
+                         uniformly between 0 and twice the mean.
+        error_rate (float): share of requests answered with a 503.
+        seed (int): seed of the graph, the same seed yields the same site.
+    """
+
+    _FILLER = "<p>Lorem ipsum dolor sit amet, consectetur adipiscing elit.</p>\n"
+
+    def __init__(
+            self, n_pages=1000, fan_out=10, page_size=20000, target_share=0.2,
+            latency=0.0, error_rate=0.0, seed=0):
+        self.n_pages = n_pages
+        self.fan_out = fan_out
+        self.page_size = page_size
+        self.target_share = target_share
+        self.latency = latency
+        self.error_rate = error_rate
+        self.seed = seed
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def is_target(self, number):
+        """bool: True if the page is a target page."""
+        return random.Random(self.seed*7919 + number).random() < self.target_share
+
+    def links(self, number):
+        """list: numbers of the pages linked by the page."""
+        rng = random.Random(self.seed*104729 + number)
+        links = [(number + 1) % self.n_pages]  # keeps the site connected
+        links += [rng.randrange(self.n_pages) for _ in range(self.fan_out - 1)]
+        return links
+
+    @functools.lru_cache(maxsize=4096)
+    def html(self, number, base_url):
+        """bytes: html of the page, links are absolute on 'base_url'."""
+        anchors = "".join(
+            '<a href="{}/p{}">Page {}</a>\n'.format(base_url, link, link)
+            for link in self.links(number))
+        target = ""
+        if self.is_target(number):
+            target = '<div class="productName">Product {}</div>\n'.format(
+                number)
+        head = "<html><head><title>Page {}</title></head><body>\n".format(
+            number)
+        size = len(head) + len(anchors) + len(target)
+        n_filler = max(0, (self.page_size - size)//len(self._FILLER))
+        return (head + anchors + self._FILLER*n_filler + target
+                + "</body></html>").encode("utf-8")
+
+    def delay(self):
+        """float: seconds to wait before answering the next request."""
+        with self._lock:
+            return self._random.uniform(0, 2*self.latency)
+
+    def fails(self):
+        """bool: True if the next request should be answered with an error."""
+        with self._lock:
+            return self._random.random() < self.error_rate
+
+
+class LocalServer(object):
+    """Serves a request handler class over HTTP on a local port.
+    Note:
+        Usable as a context manager. Each request is answered by its own
+        thread. The url of the server is set as the 'domain' of the handler
+        class, for the pages linking to absolute urls.
+    Args:
+        handler (type): BaseHTTPRequestHandler subclass answering requests.
+        host (str): interface to listen on.
+        port (int): port to listen on, 0 picks a free one.
+    """
+
+    def __init__(self, handler, host="127.0.0.1", port=0):
+        self.handler = handler
+        self._server = http.server.ThreadingHTTPServer((host, port), handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_port
+        self.url = "http://{}:{}".format(host, self.port)
+        handler.domain = self.url
+        self._thread = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *args):
+        self.stop()
+
+    def start(self):
+        """Starts serving on a background thread."""
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stops the server and releases the port."""
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+
+
+class SiteServer(LocalServer):
+    """Serves a SyntheticSite over HTTP/1.1 on a local port.
+    Note:
+        Usable as a context manager. Connections are kept alive and the
+        pages are gzipped when the client accepts it. Each request is
+        answered by its own thread.
+    Args:
+        site (SyntheticSite): site to serve.
+        host (str): interface to listen on.
+        port (int): port to listen on, 0 picks a free one.
+    """
+
+    def __init__(self, site, host="127.0.0.1", port=0):
+        self.site = site
+        handler = type("Handler", (_SiteHandler,), {"site": site})
+        super().__init__(handler, host, port)
+
+    @property
+    def root_url(self):
+        """str: url of the root page of the site."""
+        return self.url + "/p0"
+
+
+class _SiteHandler(http.server.BaseHTTPRequestHandler):
+    """Answers the requests with the pages of the site."""
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True  # headers and body go in separate writes
+    site = None
+    domain = ""
+
+    def do_GET(self):
+        time.sleep(self.site.delay())
+        try:
+            number = int(self.path[2:]) if self.path.startswith("/p") else -1
+        except ValueError:
+            number = -1
+
+        headers = {"Content-Type": "text/html; charset=utf-8"}
+        if not 0 <= number < self.site.n_pages:
+            status, body = 404, b"Not found"
+        elif self.site.fails():
+            status, body = 503, b"Service unavailable"
+        else:
+            status, body = 200, self.site.html(number, self.domain)
+            if "gzip" in self.headers.get("Accept-Encoding", ""):
+                body = gzip.compress(body, compresslevel=1)
+                headers["Content-Encoding"] = "gzip"
+
+        self.send_response(status)
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.send_header("Content-Length", len(body))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
@@ -0,0 +1,384 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 18:04:48 2026
+
+@author: Carlos
+"""
+
+import io
+import os
+import zlib
+import gzip
+import threading
+import http.client
+import urllib.error
+import collections
+from datetime import datetime, timezone
+
+import transport as tp
+from scheduler import PolitenessScheduler
+
+_DROPPED_HEADERS = ("content-encoding", "transfer-encoding", "content-length")
+
+Record = collections.namedtuple(
+    "Record", ["url", "final_url", "status", "reason", "headers", "body",
+               "truncated"])
+
+
+class ArchiveWriter(object):
+    """Append-only archive of raw responses, with an index of their urls.
+    Note:
+        Each response is stored as a WARC-like record (a WARC header block
+        followed by the HTTP status line, headers and body) compressed as
+        its own gzip member, so the file is a valid gzip stream and any
+        record can be read alone. The bodies are stored decompressed. The
+        index, at 'path' + '.idx', holds a line per record with its url,
+        offset and size, and is written after the record, so it never
+        points to a partial one. Opening an existing archive appends to it.
+        Thread safe.
+    Args:
+        path (str): path of the archive file.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.count = 0
+        self._lock = threading.Lock()
+        self._file = open(path, "ab")
+        self._index = open(path + ".idx", "a", encoding="utf-8")
+
+    def write(self, url, status, headers, body, final_url=None, reason=None,
+              truncated=False):
+        """Appends the response of the url to the archive.
+        Args:
+            url (str): url requested.
+            status (int): HTTP status code.
+            headers (HTTPMessage): response headers, or a dict.
+            body (bytes): decompressed body.
+            final_url (str): url answering, after redirects, the url itself
+                             by default.
+            reason (str): reason phrase of the status.
+            truncated (bool): True if the body isn't complete.
+        """
+        member = gzip.compress(_serialize(
+            url, final_url or url, status, reason, headers, body, truncated))
+        with self._lock:
+            offset = self._file.tell()
+            self._file.write(member)
+            self._file.flush()
+            self._index.write("{}\t{}\t{}\n".format(url, offset, len(member)))
+            self._index.flush()
+            self.count += 1
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+            self._index.close()
+
+
+class Archive(object):
+    """Read access to the records of an archive written by ArchiveWriter.
+    Note:
+        The index is loaded in memory, or rebuilt by scanning the archive
+        when it is missing. A url recorded several times maps to its last
+        record. Records are read with a single seek each and decompressed
+        and parsed outside the lock, so many threads can read at once.
+    Args:
+        path (str): path of the archive file.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        index = path + ".idx"
+        if os.path.exists(index):
+            self._offsets = _load_index(index)
+        else:
+            self._offsets = _scan(path)
+        self._lock = threading.Lock()
+        self._file = open(path, "rb")
+
+    def __len__(self):
+        return len(self._offsets)
+
+    def __contains__(self, url):
+        return url in self._offsets
+
+    def __iter__(self):
+        return iter(self._offsets)
+
+    def get(self, url):
+        """Record: the last record of the url, None if it wasn't archived."""
+        position = self._offsets.get(url)
+        if position is None:
+            return None
+        with self._lock:
+            self._file.seek(position[0])
+            member = self._file.read(position[1])
+        return _parse(gzip.decompress(member))
+
+    def close(self):
+        self._file.close()
+
+
+class RecordingTransport(object):
+    """Transport that archives every response it gets from the network.
+    Note:
+        Wraps a Transport: pass it as the 'transport' of a Crawler to record
+        the crawl. Error answers are archived with their status, and the
+        responses refused from their headers (see Transport.get) with their
+        headers only, so a replay meets the same outcomes. Streamed bodies
+        (the sitemaps) are archived when their stream is closed.
+    Args:
+        path (str): path of the archive, appended to if it exists.
+        transport (Transport): transport making the requests, the shared
+                               one by default.
+    """
+
+    def __init__(self, path, transport=None):
+        self.writer = ArchiveWriter(path)
+        self.transport = transport or tp.get_default_transport()
+        self.resolver = getattr(self.transport, "resolver", None)
+
+    def get(self, url, headers=None, timeout=None, accept=None,
+            max_bytes=None):
+        """Response: the response of Transport.get, once archived."""
+        refused = []
+
+        def check(response_headers):
+            reason = accept(response_headers)
+            if reason is not None:
+                refused.append(response_headers)
+            return reason
+
+        try:
+            response = self.transport.get(
+                url, headers, timeout, accept and check, max_bytes)
+        except urllib.error.HTTPError as e:
+            self.writer.write(url, e.code, e.headers or {}, b"", e.url, e.reason)
+            raise
+        except tp.SkippedContent as e:
+            self.writer.write(url, 200, refused[0], b"", e.url, truncated=True)
+            raise
+        self.writer.write(url, response.status, response.headers, response.body,
+                          response.url, truncated=response.truncated)
+        return response
+
+    def open(self, url, headers=None, timeout=None):
+        """_RecordingStream: the stream of Transport.open, archived when it
+                             is closed.
+        """
+        try:
+            stream = self.transport.open(url, headers, timeout)
+        except urllib.error.HTTPError as e:
+            self.writer.write(url, e.code, e.headers or {}, b"", e.url, e.reason)
+            raise
+        return _RecordingStream(stream, self.writer, url)
+
+    def close(self):
+        self.writer.close()
+        self.transport.close()
+
+
+class ReplayTransport(object):
+    """Transport answering the requests from an archive, off the network.
+    Note:
+        Pass it as the 'transport' of a Crawler, along with a
+        ReplayScheduler, to crawl again what was recorded at full CPU speed,
+        e.g. to try another 'indentify_target' or other rules. The archived
+        answers are replayed as they were: error statuses raise HTTPError,
+        the 'accept' check and the 'max_bytes' limit are applied again, and
+        the urls that weren't archived raise URLError. The request headers
+        are ignored.
+    Args:
+        path (str): path of the archive.
+    """
+
+    def __init__(self, path):
+        self.archive = Archive(path)
+
+    def get(self, url, headers=None, timeout=None, accept=None,
+            max_bytes=None):
+        """Response: the archived response of the url."""
+        record = self._record(url)
+        if accept is not None and record.status < 300:
+            reason = accept(record.headers)
+            if reason is not None:
+                raise tp.SkippedContent(record.final_url, reason)
+        body, truncated = record.body, record.truncated
+        if max_bytes is not None and len(body) > max_bytes:
+            body, truncated = body[:max_bytes], True
+        return tp.Response(record.final_url, record.status, record.headers,
+                           body, 0, {}, len(body), truncated)
+
+    def open(self, url, headers=None, timeout=None):
+        """_ReplayStream: the archived body of the url, as a stream."""
+        record = self._record(url)
+        return _ReplayStream(record)
+
+    def close(self):
+        self.archive.close()
+
+    def _record(self, url):
+        """Record: the record of the url, raising its HTTP error if any."""
+        record = self.archive.get(url)
+        if record is None:
+            raise urllib.error.URLError("not archived: {}".format(url))
+        if record.status >= 400:
+            raise urllib.error.HTTPError(
+                record.final_url, record.status, record.reason, record.headers,
+                None)
+        return record
+
+
+class ReplayScheduler(PolitenessScheduler):
+    """Scheduler that never waits, there is no server to be polite with."""
+
+    def __init__(self):
+        super().__init__(rate=float("inf"))
+
+    def delay(self, host):
+        return 0
+
+    def wait_time(self, host):
+        return 0
+
+    def set_crawl_delay(self, host, delay):
+        pass
+
+    def feedback(self, host, status, retry_after=None):
+        pass
+
+
+class _RecordingStream(object):
+    """Stream that keeps what is read, to archive it when closed."""
+
+    def __init__(self, stream, writer, url):
+        self.url = stream.url
+        self.status = stream.status
+        self.headers = stream.headers
+        self._stream = stream
+        self._writer = writer
+        self._requested = url
+        self._parts = []
+        self._eof = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def read(self, size=-1):
+        data = self._stream.read(size)
+        self._parts.append(data)
+        self._eof = self._eof or size < 0 or len(data) < size
+        return data
+
+    def peek(self, size):
+        return self._stream.peek(size)
+
+    def close(self):
+        if self._stream is None:
+            return
+        self._stream.close()
+        self._writer.write(
+            self._requested, self.status, self.headers, b"".join(self._parts),
+            self.url, truncated=not self._eof)
+        self._stream = None
+
+
+class _ReplayStream(io.BytesIO):
+    """Archived body read as the stream of Transport.open."""
+
+    def __init__(self, record):
+        super().__init__(record.body)
+        self.url = record.final_url
+        self.status = record.status
+        self.headers = record.headers
+
+    def peek(self, size):
+        position = self.tell()
+        data = self.read(size)
+        self.seek(position)
+        return data
+
+
+def _serialize(url, final_url, status, reason, headers, body, truncated):
+    """bytes: the WARC-like record of a response."""
+    reason = reason or http.client.responses.get(status, "")
+    lines = ["HTTP/1.1 {} {}".format(status, reason)]
+    lines += ["{}: {}".format(name, value) for name, value in headers.items()
+              if name.lower() not in _DROPPED_HEADERS]
+    lines.append("Content-Length: {}".format(len(body)))
+    block = ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body
+
+    fields = [
+        "WARC/1.0", "WARC-Type: response",
+        "WARC-Target-URI: {}".format(url),
+        "WARC-Date: {}".format(datetime.now(timezone.utc).strftime(
+            "%Y-%m-%dT%H:%M:%SZ")),
+        "Content-Type: application/http; msgtype=response",
+        "Content-Length: {}".format(len(block))]
+    if final_url != url:
+        fields.append("WARC-Final-URI: {}".format(final_url))
+    if truncated:
+        fields.append("WARC-Truncated: length")
+    return ("\r\n".join(fields) + "\r\n\r\n").encode("latin-1") + block + b"\r\n\r\n"
+
+
+def _parse(data):
+    """Record: the response held by a WARC-like record."""
+    head, _, rest = data.partition(b"\r\n\r\n")
+    fields = dict(line.split(": ", 1)
+                  for line in head.decode("latin-1").split("\r\n")[1:])
+    block = io.BytesIO(rest[:int(fields["Content-Length"])])
+    _, status, reason = (block.readline().decode("latin-1").rstrip("\r\n")
+                         + " ").split(" ", 2)
+    headers = http.client.parse_headers(block)
+    url = fields["WARC-Target-URI"]
+    return Record(url, fields.get("WARC-Final-URI", url), int(status),
+                  reason.strip(), headers, block.read(),
+                  "WARC-Truncated" in fields)
+
+
+def _load_index(path):
+    """dict: (offset, size) of the last record of each url of an index."""
+    offsets = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            parts = line.rstrip("\n").split("\t")
+            if len(parts) == 3:
+                offsets[parts[0]] = (int(parts[1]), int(parts[2]))
+    return offsets
+
+
+def _scan(path, chunk_size=1 << 16):
+    """dict: the index of an archive, rebuilt from its gzip members.
+    Note:
+        The file is read in chunks, the data left after the end of a member
+        being the start of the next one, so the archive is never held in
+        memory as a whole.
+    """
+    offsets = {}
+    offset, data = 0, b""
+    with open(path, "rb") as f:
+        while True:
+            data = data or f.read(chunk_size)
+            if not data:
+                break
+            decompressor = zlib.decompressobj(zlib.MAX_WBITS | 16)
+            parts, size = [], 0
+            try:
+                while data and not decompressor.eof:
+                    parts.append(decompressor.decompress(data))
+                    size += len(data)
+                    data = decompressor.unused_data or (
+                        b"" if decompressor.eof else f.read(chunk_size))
+            except zlib.error:
+                break
+            if not decompressor.eof:
+                break  # a partial record, left by a crash
+            size -= len(data)
+            offsets[_parse(b"".join(parts)).url] = (offset, size)
+            offset += size
+    return offsets
@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 17:51:14 2026
+
+@author: Carlos
+"""
+
+import threading
+
+
+class RequestBudget(object):
+    """Number of requests a crawl may still make, reserved one at a time.
+    Note:
+        A request is reserved before it is sent and counts whether it
+        succeeds or not, so a crawl never makes more than 'limit' requests,
+        whatever the number of workers. The check and the reservation are a
+        single step under a lock held for a few instructions only, so the
+        workers never wait on each other's requests. Thread safe.
+    Args:
+        limit (int): maximum number of requests.
+        used (int): requests already made, e.g. by a resumed crawl.
+    """
+
+    def __init__(self, limit, used=0):
+        self.limit = int(limit)
+        self._used = used
+        self._lock = threading.Lock()
+
+    @property
+    def used(self):
+        """int: number of requests reserved so far."""
+        return self._used
+
+    @property
+    def remaining(self):
+        """int: number of requests that can still be reserved."""
+        return max(0, self.limit - self._used)
+
+    def reserve(self):
+        """bool: reserves a request, False if the budget is spent."""
+        with self._lock:
+            if self._used >= self.limit:
+                return False
+            self._used += 1
+            return True
+
+    def spent(self):
+        """bool: True once every request of the budget is reserved."""
+        return self._used >= self.limit
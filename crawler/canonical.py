@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 17:47:20 2026
+
+@author: Carlos
+"""
+
+import collections
+import urllib.parse
+
+_DEFAULT_PORTS = {"http": "80", "https": "443"}
+_TRACKING_PARAMS = (
+    "utm_*", "gclid", "fbclid", "msclkid", "sid", "sessionid", "session_id",
+    "jsessionid", "phpsessid", "aspsessionid", "cfid", "cftoken")
+
+
+class UrlCanonicalizer(object):
+    """Rewrites the URLs so the aliases of a page share a single form.
+    Note:
+        Lowercases the scheme and host, removes the default port, the
+        fragment and the listed query and path (';jsessionid=') parameters,
+        and sorts the query parameters by name, keeping the order of
+        repeated names. The trailing slash is kept by default: '/dir/' and
+        '/dir' are different resources, and the relative links of the
+        first one don't resolve like the ones of the second. The parameters are
+        compared by name, case insensitively, and a name ending with '*'
+        strips every parameter starting with it. Values are never decoded,
+        so the URL keeps its quoting. Calling the object canonicalizes.
+    Args:
+        strip_params (tuple): names of the parameters to remove, session ids
+                              and tracking parameters by default.
+        sort_query (bool): whether to sort the query parameters.
+        strip_fragment (bool): whether to remove the '#fragment'.
+        strip_trailing_slash (bool): whether '/path/' becomes '/path'.
+    """
+
+    def __init__(self, strip_params=_TRACKING_PARAMS, sort_query=True,
+                 strip_fragment=True, strip_trailing_slash=False):
+        names = [name.lower() for name in strip_params]
+        self.strip_params = tuple(strip_params)
+        self.sort_query = sort_query
+        self.strip_fragment = strip_fragment
+        self.strip_trailing_slash = strip_trailing_slash
+        self._names = frozenset(name for name in names if not name.endswith("*"))
+        self._prefixes = tuple(name[:-1] for name in names if name.endswith("*"))
+
+    def __call__(self, url):
+        return self.canonicalize(url)
+
+    def canonicalize(self, url):
+        """str: canonical form of an absolute url."""
+        parts = urllib.parse.urlsplit(url)
+        scheme = parts.scheme.lower()
+        path = self._path(parts.path)
+        query = self._query(parts.query)
+        fragment = "" if self.strip_fragment else parts.fragment
+        return urllib.parse.urlunsplit(
+            (scheme, self._netloc(scheme, parts.netloc), path, query, fragment))
+
+    def _netloc(self, scheme, netloc):
+        """str: netloc with a lowercase host and no default port."""
+        userinfo, at, hostport = netloc.rpartition("@")
+        host, colon, port = hostport.rpartition(":")
+        if not (colon and port.isdigit()):
+            host, port = hostport, ""
+        elif port == _DEFAULT_PORTS.get(scheme):
+            port = ""
+        return userinfo + at + host.lower() + (":" + port if port else "")
+
+    def _path(self, path):
+        """str: path without the stripped parameters and trailing slash."""
+        if ";" in path:
+            path = "/".join(self._segment(segment) for segment in path.split("/"))
+        if self.strip_trailing_slash and len(path) > 1:
+            path = path.rstrip("/") or "/"
+        return path or "/"
+
+    def _segment(self, segment):
+        """str: path segment without the stripped parameters."""
+        name, *params = segment.split(";")
+        return ";".join([name] + [param for param in params
+                                  if not self._stripped(param)])
+
+    def _query(self, query):
+        """str: query without the stripped parameters, sorted by name."""
+        if not query:
+            return query
+        params = [param for param in query.split("&")
+                  if param and not self._stripped(param)]
+        if self.sort_query:
+            params.sort(key=lambda param: param.partition("=")[0])
+        return "&".join(params)
+
+    def _stripped(self, param):
+        """bool: True if the 'name=value' parameter must be removed."""
+        name = urllib.parse.unquote(param.partition("=")[0]).lower()
+        return name in self._names or name.startswith(self._prefixes)
+
+
+class TrapGuard(object):
+    """Rejects the URLs that look like crawler traps before they're queued.
+    Note:
+        Three guards, each one turned off by None (the query variants are
+        unbounded by default, so catalogues paged with '?page=N' or '?id=N'
+        are crawled whole): 'max_depth' bounds the
+        number of links followed from the root page, 'max_query_variants'
+        the number of distinct queries accepted for a single path (faceted
+        navigation, calendars, sorting options) and 'max_repeated_segments'
+        the number of times a segment may appear in a path, which catches
+        relative links that keep growing the path ('/a/b/a/b/a/b'). The
+        depth of the URLs waiting to be visited is kept until 'release' is
+        called; URLs without a known parent, like the sitemap ones, are at
+        depth 1. The crawler counts the rejected URLs in its 'trap_<reason>'
+        metrics. Not thread safe, the crawler calls it under its lock.
+    Args:
+        max_depth (int): maximum number of links from the root page.
+        max_query_variants (int): maximum number of queries per path.
+        max_repeated_segments (int): maximum occurrences of a path segment.
+    """
+
+    def __init__(self, max_depth=None, max_query_variants=None,
+                 max_repeated_segments=3):
+        self.max_depth = max_depth
+        self.max_query_variants = max_query_variants
+        self.max_repeated_segments = max_repeated_segments
+        self._depths = {}
+        self._variants = collections.Counter()
+
+    def check(self, url, parent=None):
+        """str: why the url found on the parent is a trap, None if it isn't.
+        Note:
+            Must only be called once per url, each accepted url counts as a
+            new variant of its path.
+        """
+        depth = self._depths.get(parent, 0) + 1
+        if self.max_depth is not None and depth > self.max_depth:
+            return "depth"
+        parts = urllib.parse.urlsplit(url)
+        if self.max_repeated_segments is not None:
+            segments = collections.Counter(
+                segment for segment in parts.path.split("/") if segment)
+            if segments and max(segments.values()) > self.max_repeated_segments:
+                return "repeated_segments"
+        if self.max_query_variants is not None and parts.query:
+            key = (parts.netloc, parts.path)
+            if self._variants[key] >= self.max_query_variants:
+                return "query_variants"
+            self._variants[key] += 1
+        if self.max_depth is not None:
+            self._depths[url] = depth
+        return None
+
+    def release(self, url):
+        """Forgets the depth of a url once its links are queued."""
+        self._depths.pop(url, None)
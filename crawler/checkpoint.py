@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 17:24:16 2026
+
+@author: Carlos
+"""
+
+import os
+import queue
+import pickle
+import threading
+import collections
+
+import url_store as us
+
+
+Snapshot = collections.namedtuple(
+    "Snapshot",
+    ["meta", "seen", "pending", "visited", "invalid", "pages", "aliases",
+     "skipped", "retries", "requests"])
+
+
+class Checkpoint(object):
+    """Append-only journal of the events of a crawl.
+    Note:
+        The crawler records every change of its state (URLs queued, visited,
+        invalid, failed or skipped, the pages found and the duplicates) as a
+        small event. Without 'keep_pages' the pages themselves aren't
+        journaled, only that their visit is done, so a resumed crawl has no
+        'target_pages' nor 'other_pages' from before: they are in its sink. A writer thread collects the events and appends them to
+        the file in batches every 'interval' seconds, so the workers never
+        wait for the disk.
+        Each batch is a single pickle followed by a fsync: a crash can only
+        lose the last 'interval' seconds, and a torn batch at the end of the
+        file is ignored when loading.
+    Args:
+        path (str): path of the journal file, created if missing.
+        meta (dict): crawl parameters, written once at the top of the file.
+        interval (float): seconds between two batches.
+    """
+
+    def __init__(self, path, meta=None, interval=5.0):
+        self.path = path
+        self.interval = interval
+        self._events = queue.Queue()
+        self._lock = threading.Lock()
+        self._closed = threading.Event()
+
+        new_file = not os.path.exists(path) or os.path.getsize(path) == 0
+        self._file = open(path, "ab")
+        if new_file:
+            self.record("meta", meta or {})
+            self.flush()
+
+        self._writer = threading.Thread(target=self._write_loop, daemon=True)
+        self._writer.start()
+
+    def record(self, kind, *args):
+        """Queues an event to be written with the next batch."""
+        self._events.put((kind,) + args)
+
+    def flush(self):
+        """Writes all the queued events to the disk."""
+        with self._lock:
+            batch = []
+            while True:
+                try:
+                    batch.append(self._events.get_nowait())
+                except queue.Empty:
+                    break
+            if not batch or self._file.closed:
+                return
+            pickle.dump(batch, self._file, pickle.HIGHEST_PROTOCOL)
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def close(self):
+        """Writes the pending events and closes the journal."""
+        self._closed.set()
+        self._writer.join()
+        self.flush()
+        self._file.close()
+
+    def _write_loop(self):
+        """Flushes the events periodically until the journal is closed."""
+        while not self._closed.wait(self.interval):
+            self.flush()
+
+
+def load(path):
+    """Snapshot: rebuilds the state of a crawl by replaying its journal.
+    Note:
+        'pending' holds, in queue order, the URLs queued but not visited yet,
+        including the ones whose request failed so they are tried again,
+        and 'retries' how many times each of those failed. A visit without
+        an outcome (a page, a duplicate, a skip, a failure or an invalid
+        url) was still in flight when the crawl stopped: its url is pending
+        again, first in the queue, and isn't counted as visited. 'requests'
+        is the number of requests made, failed ones included: the visits
+        and the other requests (root page, robots.txt and sitemaps).
+    """
+    meta = {}
+    seen = visited = invalid = None
+    pending = collections.OrderedDict()
+    in_flight = collections.OrderedDict()
+    pages = []
+    aliases = {}
+    skipped = {}
+    retries = {}
+    requests = 0
+
+    for batch in _read_batches(path):
+        for event in batch:
+            kind, args = event[0], event[1:]
+            if kind == "meta":
+                meta = args[0]
+                store = meta.get("url_store", "set")
+                exact = "set" if store == "set" else "hash"
+                seen = us.new_url_set(store, meta.get("error_rate", 1e-4))
+                visited = us.new_url_set(exact)
+                invalid = us.new_url_set(exact)
+            elif kind == "push":
+                for url in args[0]:
+                    if url not in seen:
+                        seen.add(url)
+                        pending[url] = None
+            elif kind == "visit":
+                requests += 1
+                visited.add(args[0])
+                pending.pop(args[0], None)
+                in_flight[args[0]] = None
+            elif kind == "request":
+                requests += 1
+            elif kind == "fail":
+                visited.discard(args[0])
+                in_flight.pop(args[0], None)
+                pending[args[0]] = None
+                retries[args[0]] = retries.get(args[0], 0) + 1
+            elif kind == "invalid":
+                invalid.add(args[0])
+                pending.pop(args[0], None)
+                in_flight.pop(args[0], None)
+            elif kind == "page":
+                pages.append(args)
+                in_flight.pop(args[0].url, None)
+            elif kind == "done":
+                in_flight.pop(args[0], None)
+            elif kind == "alias":
+                aliases[args[0]] = args[1]
+                in_flight.pop(args[0], None)
+            elif kind == "skip":
+                skipped[args[0]] = args[1]
+                in_flight.pop(args[0], None)
+
+    for url in in_flight:
+        visited.discard(url)
+
+    return Snapshot(
+        meta, seen, list(in_flight) + list(pending), visited, invalid, pages,
+        aliases, skipped, retries, requests)
+
+
+def _read_batches(path):
+    """generator: batches of events of the journal, up to a torn batch."""
+    with open(path, "rb") as f:
+        while True:
+            try:
+                yield pickle.load(f)
+            except (EOFError, pickle.UnpicklingError, ValueError):
+                break
@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 18:07:02 2026
+
+@author: Carlos
+"""
+
+import time
+import threading
+import collections
+
+Decision = collections.namedtuple(
+    "Decision", ["time", "limit", "reason", "latency", "error_rate",
+                 "throughput"])
+
+
+class AimdController(object):
+    """Adapts the number of requests in flight to how the site answers.
+    Note:
+        Additive increase, multiplicative decrease over windows of
+        completed requests, each as long as the current limit (and at
+        least 'min_window'). When a window ends, the limit is cut by
+        'decrease' if the share of failed requests (timeouts, connection
+        errors, 429 and 503 answers) reaches 'error_threshold' or if their
+        mean latency exceeds 'tolerance' times the baseline; otherwise it
+        grows by 'increase' if the window used the whole limit. The
+        baseline is the lowest mean latency of a window, raised by 'aging'
+        at every window so it follows the site through the day. Every
+        change of the limit is kept in 'history' along with the latency,
+        error rate and throughput (requests per second) that caused it.
+        Thread safe.
+    Args:
+        initial (int): limit at the start of the crawl.
+        min_limit (int): lowest limit.
+        max_limit (int): highest limit, the number of workers started.
+        increase (int): requests added to the limit after a good window.
+        decrease (float): factor applied to the limit after a bad window.
+        tolerance (float): mean latency over the baseline that is too slow.
+        error_threshold (float): share of failures that is too many.
+        min_window (int): minimum number of requests of a window.
+        aging (float): relative raise of the baseline at every window.
+    Attributes:
+        limit (int): current number of requests allowed in flight.
+        history (deque): the last Decision objects, oldest first.
+    """
+
+    _FAILURES = (429, 503)
+
+    def __init__(
+            self, initial=4, min_limit=1, max_limit=32, increase=1,
+            decrease=0.5, tolerance=2.0, error_threshold=0.1, min_window=4,
+            aging=0.05):
+        if not 1 <= min_limit <= initial <= max_limit:
+            raise ValueError("Expected 1 <= min_limit <= initial <= max_limit")
+        self.limit = initial
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.increase = increase
+        self.decrease = decrease
+        self.tolerance = tolerance
+        self.error_threshold = error_threshold
+        self.min_window = min_window
+        self.aging = aging
+        self.history = collections.deque(maxlen=100)
+        self.baseline = None
+        self._lock = threading.Lock()
+        self._reset_window()
+
+    def record(self, latency, status, in_flight):
+        """Reports a completed request.
+        Args:
+            latency (float): seconds the request took.
+            status (int): HTTP status code, None if it timed out or failed
+                          to connect.
+            in_flight (int): requests in flight when it completed, itself
+                             included.
+        Returns:
+            Decision: the change of the limit made, None if unchanged.
+        """
+        failed = status is None or status in self._FAILURES
+        with self._lock:
+            self._count += 1
+            self._failures += failed
+            self._latency += latency
+            self._saturated = self._saturated or in_flight >= self.limit
+            if self._count < max(self.limit, self.min_window):
+                return None
+            return self._end_window()
+
+    def _end_window(self):
+        """Decision: adapts the limit to the window that just ended."""
+        latency = self._latency/self._count
+        error_rate = self._failures/self._count
+        throughput = self._count/max(time.monotonic() - self._start, 1e-9)
+        if self.baseline is None or latency < self.baseline:
+            self.baseline = latency
+        slow = latency > self.tolerance*self.baseline
+        saturated = self._saturated
+        self.baseline *= 1 + self.aging
+        self._reset_window()
+
+        if error_rate >= self.error_threshold or slow:
+            limit = max(self.min_limit, int(self.limit*self.decrease))
+            reason = "errors" if error_rate >= self.error_threshold else "latency"
+        elif saturated:
+            limit = min(self.max_limit, self.limit + self.increase)
+            reason = "increase"
+        else:
+            return None
+        if limit == self.limit:
+            return None
+        self.limit = limit
+        decision = Decision(time.time(), limit, reason, latency, error_rate,
+                            throughput)
+        self.history.append(decision)
+        return decision
+
+    def _reset_window(self):
+        self._count = 0
+        self._failures = 0
+        self._latency = 0.0
+        self._saturated = False
+        self._start = time.monotonic()
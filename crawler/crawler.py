@@ -7,10 +7,30 @@ Created on Thu May 17 07:47:17 2018
 
 
 import time
+import asyncio
+import threading
 import urllib.error
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 
 import helpers
+import sinks
+import budget as bg
+import concurrency as cc
+import metrics as mt
 import webpage as wp
+import transport as tp
+import robots as rb
+import resolver as rs
+import recrawl as rc
+import sitemap as sm
+import filters as ft
+import rules as rl
+import canonical as cn
+import url_store as us
+import checkpoint as ckpt
+import fingerprint as fp
+from scheduler import PolitenessScheduler
 from thread_manager import ThreadingManager
 
 
@@ -20,38 +40,237 @@ class Crawler(object):
         The crawling is performed in an iterative manner, following the setps
         described in the docstring of the 'iterative_crawl' method. This crawl
         can be parallelized, splitting the task between an arbitrary number of
-        workers, as long as it doesn't raise suspicion on the domain.
+        workers, as long as it doesn't raise suspicion on the domain. The
+        'run_async' method performs the same crawl over a continuous frontier
+        instead of level by level.
     Args:
         domain (str): the domain that needs to be crawled.
-        req_limit (int): upper limit on the number of requests before stopping
+        req_limit (int): upper limit on the number of requests, failed ones
+                         included: the pages, the root page among them, and
+                         the robots.txt and sitemap files. Each request is
+                         reserved before it is sent, so the limit is never
+                         exceeded, except by the root page, which is always
+                         requested.
         greedy (bool): flag to determine whether or not to keep parsed html on
-                       each visited page.
+                       each visited page. When off, only a compact PageRecord
+                       of each page is stored.
         identify_target (function): function to identify target pages.
+        transport (Transport): client shared by all requests of the crawl,
+                               defaults to the shared keep-alive transport.
+                               The hosts of the queued links are resolved
+                               ahead of time by its resolver, the duration
+                               of these lookups is the 'resolve' phase.
+        scheduler (PolitenessScheduler): per-host rate limiter, the default one
+                                         allows 10 requests per second.
+        parser (str): html parser used on each page, 'soup' or 'stream'.
+        url_store (str): how URLs are remembered, 'set' keeps the strings,
+                         'hash' keeps 64 bit fingerprints and 'bloom' keeps
+                         the frontier's seen URLs in a Bloom filter.
+        error_rate (float): false positive rate of the Bloom filter.
+        checkpoint (str): path of a journal where the state of the crawl is
+                          saved as it changes, see 'resume'. It is closed
+                          when the crawl ends. Without 'keep_pages', the
+                          pages aren't journaled, only the end of their
+                          visit.
+        sink (ResultSink): sink where each page is written as soon as it is
+                           classified, see the 'sinks' module. It is closed
+                           when the crawl ends.
+        keep_pages (bool): whether to keep the pages in 'target_pages' and
+                           'other_pages', turn it off when using a sink to
+                           keep the memory flat.
+        metrics (CrawlMetrics): instrumentation of the crawl, see 'stats'.
+        recrawl (str): path of a cache of the pages of earlier crawls. Pages
+                       are requested conditionally on the validators saved
+                       there, and the ones that didn't change (304) reuse
+                       the saved title, target and links without parsing.
+                       The cache is saved once, when the crawl ends.
+        frontier (str): order of the visits, 'fifo' visits the URLs in the
+                        order they were found (BFS) and 'priority' visits
+                        first the ones the scorer deems likely targets.
+        scorer (object): scorer of the 'priority' frontier, by default a
+                         scoring.NaiveBayesScorer learning from the pages
+                         classified by 'identify_target'.
+        robots (bool): whether to drop the URLs disallowed by the robots.txt
+                       of their host before they are queued. The Crawl-delay
+                       is obeyed either way.
+        sitemaps (bool or list): seeds the frontier with the URLs of the
+                                 domain's sitemaps, the ones listed in its
+                                 robots.txt or /sitemap.xml when True, or
+                                 the sitemap URLs given.
+        dedupe (str): fingerprints the raw body of each page to skip the
+                      parsing and links of duplicates, which are kept in
+                      'aliases' instead. 'exact' only finds identical
+                      bodies, 'near' also the ones with a close SimHash.
+        canonicalizer (UrlCanonicalizer): rewrites the links before they're
+                                          queued so the aliases of a page
+                                          are only visited once, defaults to
+                                          canonical.UrlCanonicalizer().
+        traps (TrapGuard): drops the links that look like crawler traps,
+                           defaults to canonical.TrapGuard().
+        content_filter (ContentFilter): skips the links to files and the
+                                        responses that aren't html, and
+                                        truncates the huge ones, defaults
+                                        to filters.ContentFilter(). The
+                                        skipped URLs are kept in 'skipped'
+                                        with the reason.
+        rules (list): extraction rules (see rules.Rule) compiled once for
+                      the crawl, the values found are in the 'fields' of
+                      each page, which 'indentify_target' can check.
     """
 
     _timeout = 10  # seconds before raising wp.TimeoutException
+    _max_retries = 2  # times a failed url is queued again
+    _DEDUPE = {"exact": 0, "near": 3}  # SimHash bits apart of near duplicates
 
     def __init__(
             self, domain, req_limit=1e4, greedy=False,
-            indentify_target=lambda page: True):
+            indentify_target=lambda page: True, transport=None,
+            scheduler=None, parser="soup", url_store="set", error_rate=1e-4,
+            checkpoint=None, sink=None, keep_pages=True, metrics=None,
+            recrawl=None, frontier="fifo", scorer=None, robots=True,
+            sitemaps=False, dedupe=None, canonicalizer=None, traps=None,
+            content_filter=None, rules=None):
 
         # Initialize
-        self.root_page = wp.WebPage(domain)
+        self.transport = transport or tp.get_default_transport()
+        self.metrics = metrics or mt.CrawlMetrics()
+        self.scheduler = scheduler or PolitenessScheduler()
+        self.robots = rb.RobotsCache(
+            self.transport, wp.WebPage._AGENT, self._timeout, self.scheduler,
+            self._charge)
+        self.parser = parser
         self.target_pages = {}
         self.other_pages = {}
-        self.visited_urls = set()
-        self.invalid_urls = set()
-        self.inner_urls = set()
+        self.aliases = {}  # url of each duplicate -> url of its canonical page
+        self.skipped = {}  # url of each skipped link -> why it was skipped
+        self._retries = {}  # url of each failed request -> times it failed
+        self.frontier_kind = frontier
+        self.scorer = scorer
+        self._frontier = self._new_frontier(us.new_url_set(url_store, error_rate))
+        self._lock = threading.Lock()  # guards the frontier in 'run'
+        self._state_lock = threading.Lock()  # guards the results in 'run'
+        self.canonicalizer = canonicalizer or cn.UrlCanonicalizer()
+        self.traps = traps or cn.TrapGuard()
+        self.content_filter = content_filter or ft.ContentFilter()
+        self.rules = rules
+        if rules is not None and not isinstance(rules, rl.RuleSet):
+            self.rules = rl.RuleSet(rules)
+        self.visited_urls = us.new_url_set(self._exact_store(url_store))
+        self.invalid_urls = us.new_url_set(self._exact_store(url_store))
         self.unvisited = set()
         self.manager = None
+        self.controller = None
+        self._visiting = 0  # requests being sent or read
+        self._sitemap_roots = None  # sitemaps left to a side task, if any
+        self._gate = threading.Condition()  # caps '_visiting' in 'run'
 
         # Crawl parameters
         self.req_limit = req_limit
+        self.budget = bg.RequestBudget(req_limit)
         self.greedy = greedy
+        self.sink = sink
+        self.keep_pages = keep_pages
+        self.obey_robots = robots
+        self.sitemaps = sitemaps
+        self.n_targets = 0
         self.identify_target = indentify_target
         self.log_frequency = req_limit/10
         self.logger = helpers.get_debug_logger("mylogger")
 
+        self.content_index = None
+        if dedupe is not None:
+            if dedupe not in self._DEDUPE:
+                raise ValueError("Unknown dedupe: {}, expected one of {}".format(
+                    dedupe, tuple(self._DEDUPE)))
+            self.content_index = fp.ContentIndex(self._DEDUPE[dedupe])
+
+        self.recrawl = None
+        if recrawl is not None:
+            self.recrawl = rc.RecrawlCache(recrawl)
+
+        self.checkpoint = None
+        if checkpoint is not None:
+            meta = {"domain": domain, "req_limit": req_limit,
+                    "greedy": greedy, "parser": parser,
+                    "url_store": url_store, "error_rate": error_rate,
+                    "recrawl": recrawl, "frontier": frontier,
+                    "robots": robots, "sitemaps": sitemaps, "dedupe": dedupe,
+                    "keep_pages": keep_pages,
+                    "sink": getattr(sink, "filename", None)}
+            self.checkpoint = ckpt.Checkpoint(checkpoint, meta)
+
+        self.root_page = self._open_root(domain)
+
+    @classmethod
+    def resume(cls, path, **kwargs):
+        """Crawler: recreates a crawl from its checkpoint journal.
+        Note:
+            The crawl parameters are read from the journal, any keyword given
+            overrides them (e.g. 'indentify_target', which isn't saved). The
+            crawler keeps appending to the same journal, so it can be resumed
+            again, and to the file of the sink, reopened with 'append' so the
+            results already written are kept (a sink given instead must be
+            opened with 'append' too). The pages still in flight when the
+            crawl stopped are visited again. Call 'run' or 'run_async' to
+            carry on with the crawl.
+        Args:
+            path (str): path of the journal given as 'checkpoint' before.
+        """
+        snapshot = ckpt.load(path)
+        options = dict(snapshot.meta, **kwargs)
+        if isinstance(options.get("sink"), str):
+            options["sink"] = sinks.open_sink(options["sink"], append=True)
+        crawler = cls(options.pop("domain"), checkpoint=path, **options)
+
+        crawler._frontier = crawler._new_frontier(snapshot.seen)
+        for url in snapshot.pending:
+            crawler._frontier.requeue(url)
+        crawler.visited_urls = snapshot.visited
+        crawler.budget = bg.RequestBudget(
+            crawler.req_limit, snapshot.requests + crawler.budget.used)
+        crawler.invalid_urls = snapshot.invalid
+        crawler.aliases = snapshot.aliases
+        crawler.skipped = snapshot.skipped
+        crawler._retries = snapshot.retries
+        for page, is_target in snapshot.pages:
+            pages = crawler.target_pages if is_target else crawler.other_pages
+            pages[page.url] = page
+        crawler.n_targets = len(crawler.target_pages)
+        return crawler
+
+    def _open_root(self, domain):
+        """WebPage: the root page of the domain, whose links seed the crawl.
+        Note:
+            Its request, and the one of the robots.txt, are charged to the
+            budget like any other.
+        """
+        self.robots.rules(helpers.safe_url(domain))  # reads the Crawl-delay
+        self._charge()
+        return wp.WebPage(domain, transport=self.transport, parser=self.parser)
+
+    def _new_frontier(self, seen):
+        """Frontier: an empty frontier of the crawl over the seen URLs."""
+        return us.new_frontier(self.frontier_kind, seen, self.scorer)
+
+    def stats(self):
+        """dict: live statistics of the crawl.
+        Note:
+            Safe to call from any thread while the crawl runs. Holds the
+            summary of each request phase (dns, connect, ttfb, download,
+            parse and links), the counters, the errors by type and the queue
+            depth and requests in flight, along with the progress and the
+            number of page requests made.
+        """
+        stats = self.metrics.snapshot()
+        stats.update(
+            visited=len(self.visited_urls), invalid=len(self.invalid_urls),
+            targets=self.n_targets, requests=self.budget.used)
+        return stats
+
+    def serve_stats(self, port=0, host="127.0.0.1"):
+        """HTTPServer: exposes the metrics for Prometheus at /metrics."""
+        return self.metrics.serve(port, host)
+
     def export_csv(self, filename, only_targets=True):
         """Export the results to a csv file."""
         exported = self.target_pages.values()
@@ -62,82 +281,689 @@ class Crawler(object):
     def run(self, n_workers):
         """Iterative function to find and store all pages within a domain.
         Args:
-            n_workers (int): number of workers executing the inner loop.
+            n_workers (int or AimdController): number of workers executing
+                                               the inner loop, or the
+                                               controller adapting how many
+                                               of them send requests at once.
         Algorithm:
-            1 - Fetch the non visited URLs;
-            2 - Outer loops runs until there are no unvisited URLs;
-            3 - Clear the inner url set and loop through all non visited URLs;
-            4 - Request and parse each URL, updating the sets and dicts;
-            5 - Update the non visited URL set keep going with the outer loop.
+            1 - Queue the URLs of the root page and sitemaps in the frontier;
+            2 - Outer loops runs until the frontier is empty;
+            3 - Take all the queued URLs, in the order of the frontier;
+            4 - Request and parse each URL, updating the sets and dicts and
+                queueing the new URLs in the frontier;
+            5 - Keep going with the outer loop.
         """
+        self._log_start()
+        n_workers = self._set_concurrency(n_workers)
+        try:
+            self._crawl_levels(n_workers)
+        finally:
+            self._close_outputs()
 
-        msg = "Initiating crawl...\n" \
-              + "Domain: {}\n".format(self.root_page.domain) \
-              + "Request limit: {}\n".format(self.req_limit) \
-              + "Greedy mode: {}\n".format("Yes" if self.greedy else "No")
-        self.logger.debug(msg)
-
-        self.unvisited = self._get_unvisited_urls(self.root_page.child_urls)
-        while len(self.unvisited) > 0 and len(self.visited_urls) < self.req_limit:
+    def _crawl_levels(self, n_workers):
+        """Sets up the frontier and crawls it a BFS level at a time."""
+        self._seed()
+        self.unvisited = self._frontier
+        self.metrics.set_gauge("queue_depth", len(self._frontier))
+        while len(self._frontier) > 0 and not self._budget_spent():
             try:
-                self.inner_urls = set()
+                level = [self._frontier.pop() for _ in range(len(self._frontier))]
                 self.manager = ThreadingManager(self, n_workers)
-                self.manager.manage(list(self.unvisited), "_inner_loop")
-                self.unvisited = self._get_unvisited_urls(self.inner_urls)
+                self.manager.manage(level, "_inner_loop")
             except KeyboardInterrupt:
                 self.manager.stop_all_workers()
                 self.logger.debug("Crawling interrupted...")
                 return
+            finally:
+                self._flush_outputs()
 
         self.logger.debug("Crawling completed...")
 
+    def run_async(self, concurrency, parse_workers=0):
+        """Crawls the domain with an asyncio engine over a continuous frontier.
+        Note:
+            Unlike 'run', there are no BFS levels: every discovered URL goes
+            straight into a single frontier and a new request starts as soon
+            as one finishes, so exactly 'concurrency' requests are in flight
+            while there is work to do. A slow page only holds its own slot.
+            The blocking fetch and parse runs on a thread pool, while all the
+            crawl state is updated on the event loop thread.
+
+            With 'parse_workers', the fetch threads only download the pages
+            and the raw responses are parsed on a pool of processes, so the
+            parsing isn't serialized on the GIL and scales with the cores.
+            Only the parsed page, without its soup, and its child URLs come
+            back to the crawler.
+
+            With an AimdController as 'concurrency', the number of requests
+            in flight follows its limit, which adapts to the latency and
+            errors of the answers. Its decisions are logged.
+        Args:
+            concurrency (int or AimdController): number of requests kept in
+                                                 flight, or the controller
+                                                 adapting it.
+            parse_workers (int): number of parsing processes, 0 parses the
+                                 pages on the fetch threads.
+        """
+        self._log_start()
+        concurrency = self._set_concurrency(concurrency)
+        try:
+            asyncio.run(self._crawl_async(concurrency, parse_workers))
+        except KeyboardInterrupt:
+            self.logger.debug("Crawling interrupted...")
+            return
+        finally:
+            self._close_outputs()
+
+        self.logger.debug("Crawling completed...")
+
+    async def _crawl_async(self, concurrency, parse_workers=0):
+        """Sets up the frontier and runs the asynchronous workers."""
+        loop = asyncio.get_running_loop()
+        self._in_flight = 0
+        self._visiting = 0
+        self._wakeup = asyncio.Condition()
+        self.unvisited = self._frontier
+        self.metrics.set_gauge("queue_depth", len(self._frontier))
+        self._sitemap_roots = []
+        self._seed()
+
+        self._parse_pool = None
+        if parse_workers:
+            self._parse_pool = ProcessPoolExecutor(max_workers=parse_workers)
+        try:
+            with ThreadPoolExecutor(max_workers=concurrency) as executor:
+                workers = [
+                    self._async_worker(loop, executor)
+                    for _ in range(concurrency)
+                ]
+                await asyncio.gather(*workers, *self._side_tasks())
+        finally:
+            if self._parse_pool is not None:
+                self._parse_pool.shutdown()
+
+    def _set_concurrency(self, concurrency):
+        """int: number of workers to start, keeping the controller if any."""
+        self.controller = None
+        if isinstance(concurrency, cc.AimdController):
+            self.controller = concurrency
+            self.metrics.set_gauge("concurrency_limit", concurrency.limit)
+            return concurrency.max_limit
+        return concurrency
+
+    def _limit(self):
+        """float: number of requests allowed in flight."""
+        if self.controller is None:
+            return float("inf")
+        return self.controller.limit
+
+    def _report(self, start, status):
+        """Reports the latency and status of a request to the controller."""
+        if self.controller is None or start is None:
+            return
+        decision = self.controller.record(
+            time.perf_counter() - start, status, self._visiting)
+        if decision is not None:
+            self.metrics.set_gauge("concurrency_limit", decision.limit)
+            self.logger.debug(
+                "Concurrency limit {} ({}): latency {:.3f}s, error rate {:.2f}, "
+                "{:.1f} requests/s".format(
+                    decision.limit, decision.reason, decision.latency,
+                    decision.error_rate, decision.throughput))
+
+    def _side_tasks(self):
+        """list: coroutines run along the workers, the reading of the
+                 sitemaps if any, holding a slot so the workers wait for it.
+        """
+        roots, self._sitemap_roots = self._sitemap_roots, None
+        if not roots:
+            return []
+        self._in_flight += 1
+        return [self._read_sitemaps(roots)]
+
+    async def _read_sitemaps(self, roots):
+        """Queues the URLs of the sitemaps of the root urls."""
+        loop = asyncio.get_running_loop()
+        try:
+            for root_url in roots:
+                await self._queue_sitemaps(loop, root_url)
+        finally:
+            async with self._wakeup:
+                self._in_flight -= 1
+                self._wakeup.notify_all()
+
+    async def _queue_sitemaps(self, loop, root_url):
+        """Queues the URLs of the sitemaps of the root url's domain, read
+           on a thread a batch at a time, as they come.
+        """
+        batches = self._sitemap_batches(root_url)
+        while True:
+            batch = await loop.run_in_executor(None, next, batches, None)
+            if batch is None:
+                return
+            async with self._wakeup:
+                self._enqueue(batch)
+                self._wakeup.notify_all()
+
+    async def _async_worker(self, loop, executor):
+        """Pulls URLs from the frontier until the crawl is over.
+        Note:
+            Workers sleep on a condition instead of polling. The crawl is over
+            when the budget is spent or when the frontier is empty and no
+            request is in flight, i.e. nothing else can be discovered.
+        """
+        while True:
+            async with self._wakeup:
+                await self._wakeup.wait_for(self._can_proceed)
+                if not self._frontier.ready() or not self._reserve():
+                    self._wakeup.notify_all()
+                    return
+                url = self._frontier.pop()
+                self._mark_visited(url)
+                self._in_flight += 1
+                self._visiting += 1
+                self.metrics.add_gauge("queue_depth", -1)
+                self.metrics.set_gauge("in_flight", self._in_flight)
+                self._log_progress()
+
+            start, status = None, None
+            try:
+                await asyncio.sleep(self.scheduler.delay(helpers.get_domain(url)))
+                start = time.perf_counter()
+                visit = await self._visit(loop, executor, url)
+                status = 200
+                if self.obey_robots and self.robots.missing(visit[1]):
+                    await loop.run_in_executor(
+                        executor, self._read_robots, visit[1])
+                self._process(url, *visit)
+            except (urllib.error.HTTPError, wp.TimeoutException) as e:
+                status = getattr(e, "code", None)
+                self._on_timeout_exception(url, e)
+            except tp.SkippedContent as e:
+                status = 200
+                self._learn(url)
+                self._mark_skipped(url, e.reason)
+            except urllib.error.URLError:
+                self._mark_invalid(url)
+            except Exception as e:
+                self._on_unexpected_exception(url, e)
+            finally:
+                self._report(start, status)
+                async with self._wakeup:
+                    self._in_flight -= 1
+                    self._visiting -= 1
+                    self.metrics.set_gauge("in_flight", self._in_flight)
+                    self._wakeup.notify_all()
+
+    async def _visit(self, loop, executor, url):
+        """tuple: fetches and parses the url, returns the page, its links and
+                  the canonical url if the page is a duplicate (see 'dedupe').
+        """
+        if self._parse_pool is None:
+            new_page, canonical = await loop.run_in_executor(
+                executor, self._fetch_page, url)
+            if new_page is None:
+                return None, {}, canonical
+            return new_page, new_page.child_links, None
+
+        response, cached, canonical = await loop.run_in_executor(
+            executor, self._fetch, url)
+        if canonical is not None:
+            return None, {}, canonical
+        if response.status == 304 and cached is not None:
+            new_page = wp.WebPage(
+                url, transport=self.transport, parser=self.parser,
+                response=response, cached=cached, rules=self.rules)
+            return new_page, new_page.child_links, None
+        new_page, child_links = await loop.run_in_executor(
+            self._parse_pool, wp.parse_response, url, response, self.parser,
+            self.rules)
+        new_page.transport = self.transport
+        return new_page, child_links, None
+
+    def _can_proceed(self):
+        """bool: True when a worker has something to do or should stop."""
+        return (self._frontier.ready() and self._visiting < self._limit()
+                or self._in_flight == 0 or self._budget_spent())
+
+    def _budget_spent(self):
+        """bool: True if the request limit has been reached."""
+        return self.budget.spent()
+
+    def _reserve(self):
+        """bool: takes a request from the budget, False once it is spent."""
+        return self.budget.reserve()
+
+    def _charge(self):
+        """bool: reserves a request that isn't the visit of a queued url (the
+                 root page, a robots.txt or a sitemap), False once the budget
+                 is spent. The request is journaled so a resumed crawl still
+                 counts it. Thread safe.
+        """
+        if not self.budget.reserve():
+            return False
+        self._record("request")
+        return True
+
+    def _seed(self):
+        """Queues the links of the root page and the URLs of the sitemaps."""
+        self._enqueue(self._canonical(self.root_page.child_links))
+        self._seed_sitemaps(self.root_page.url)
+
+    def _seed_sitemaps(self, root_url):
+        """Queues the URLs of the sitemaps of the root url's domain.
+        Note:
+            The async engine leaves them to a side task instead, so the
+            workers can start before the sitemaps are read.
+        """
+        if not self.sitemaps:
+            return
+        if self._sitemap_roots is not None:
+            self._sitemap_roots.append(root_url)
+            return
+        for batch in self._sitemap_batches(root_url):
+            self._enqueue(batch)
+
+    def _sitemap_batches(self, root_url):
+        """generator: dicts of up to 1000 sitemap URLs of the root url's
+                      domain, canonical and mapped to an empty anchor text.
+        """
+        domain = helpers.get_domain(root_url)
+        batch = {}
+        for url in self._sitemap_urls(root_url):
+            if helpers.get_domain(url) == domain:
+                batch[self.canonicalizer(helpers.safe_url(url))] = ""
+            if len(batch) >= 1000:
+                yield batch
+                batch = {}
+        if batch:
+            yield batch
+
+    def _sitemap_urls(self, root_url):
+        """generator: page URLs listed by the sitemaps of the domain."""
+        if not self.sitemaps:
+            return
+        sitemaps = self.sitemaps
+        if sitemaps is True:
+            parts = urllib.parse.urlsplit(root_url)
+            sitemaps = self.robots.sitemaps(root_url) or [
+                "{}://{}/sitemap.xml".format(parts.scheme, parts.netloc)]
+        for url in sitemaps:
+            yield from sm.iter_sitemap(
+                url, self.transport, self._timeout,
+                {"User-Agent": wp.WebPage._AGENT}, logger=self.logger,
+                reserve=self._charge)
+
+    def _enqueue(self, links, parent=None):
+        """Adds the URLs never seen before to the frontier.
+        Note:
+            The frontier remembers every URL it was given, so a URL is only
+            queued once per crawl, even if its request fails. URLs disallowed
+            by robots.txt are dropped unless 'robots' is off, and so are the
+            ones the content filter or the trap guard rejects. Waiting workers
+            are woken up when the request that discovered the URLs releases
+            its slot.
+        Args:
+            links (dict): URLs found on the parent page mapped to the text of
+                          their anchor.
+            parent (str): url of the page where the links were found.
+        """
+        self._read_robots(links)
+        with self._lock:
+            pushed = [url for url, text in links.items()
+                      if url not in self._frontier.seen and self._wanted(url)
+                      and self._allowed(url) and self._admitted(url, parent)
+                      and self._frontier.push(url, text, parent)]
+        self._record("push", pushed)
+        self.metrics.add_gauge("queue_depth", len(pushed))
+        self._prefetch(pushed)
+
+    def _prefetch(self, urls):
+        """Resolves the hosts of the urls in the background, if needed."""
+        resolver = getattr(self.transport, "resolver", None)
+        if resolver is None:
+            return
+        for endpoint in {rs.endpoint(url) for url in urls} - {None}:
+            future = resolver.prefetch(*endpoint)
+            if future is not None:
+                self.metrics.increment("dns_prefetched")
+                future.add_done_callback(self._on_prefetched)
+
+    def _on_prefetched(self, future):
+        """Records the duration of a lookup made ahead of time."""
+        if future.exception() is None:
+            self.metrics.observe("resolve", future.result())
+
+    def _read_robots(self, links):
+        """Reads the robots.txt of the hosts of the links not read yet, so
+           they aren't fetched while holding the lock.
+        """
+        if not self.obey_robots:
+            return
+        for url in self.robots.missing(links):
+            self.robots.rules(url)
+
+    def _allowed(self, url):
+        """bool: True if robots.txt allows the url, or if it isn't obeyed.
+        Note:
+            A disallowed url is marked as seen so it is only checked once.
+        """
+        if not self.obey_robots or self.robots.allowed(url):
+            return True
+        self._frontier.seen.add(url)
+        self.metrics.increment("robots_disallowed")
+        return False
+
+    def _wanted(self, url):
+        """bool: False if the content filter skips the url before fetching.
+        Note:
+            A skipped url is marked as seen so it is only checked once.
+        """
+        reason = self.content_filter.check_url(url)
+        if reason is None:
+            return True
+        self._frontier.seen.add(url)
+        self._mark_skipped(url, reason)
+        return False
+
+    def _admitted(self, url, parent):
+        """bool: False if the trap guard rejects the url.
+        Note:
+            A rejected url is marked as seen so it is only checked once.
+        """
+        reason = self.traps.check(url, parent)
+        if reason is None:
+            return True
+        self._frontier.seen.add(url)
+        self.metrics.increment("trap_" + reason)
+        return False
+
+    def _canonical(self, links):
+        """dict: the links by canonical url, with the first anchor text."""
+        canonical = {}
+        for url, text in links.items():
+            url = self.canonicalizer(url)
+            if not canonical.get(url):
+                canonical[url] = text
+        return canonical
+
+    def _learn(self, url, is_target=None):
+        """Reports the outcome of a visit to the frontier."""
+        with self._lock:
+            self._frontier.learn(url, is_target)
+            self.traps.release(url)
+
     def _inner_loop(self, url):
         """Runs the inner loop of the iterative process.
         Note:
             The loop is executed inside the threading manager. After retrieving
-            the urls from the queue.
+            the urls from the queue. The request is reserved before anything
+            else: once the budget is spent, the url goes back to the frontier
+            without being requested.
         Args:
             url (str): the url being requested.
         """
 
-        self.visited_urls.add(url)
-        if len(self.visited_urls) > self.req_limit:
-            self.manager.stop_all_workers()
-        if len(self.visited_urls) % self.log_frequency == 0:
-            msg = "Visited pages: {}; Targets found {}; Running visits {}".format(
-                len(self.visited_urls), len(self.target_pages), len(self.unvisited))
-            self.logger.debug(msg)
+        if not self._reserve():
+            with self._lock:
+                self._frontier.requeue(url)
+            return
+        self._mark_visited(url)
+        self.metrics.add_gauge("queue_depth", -1)
+        self.metrics.add_gauge("in_flight", 1)
+        self._log_progress()
 
+        start, status = None, None
         try:
 
-            new_page = wp.WebPage(url, timeout=self._timeout)
-            if self.identify_target(new_page):
-                self.target_pages[new_page.url] = new_page
-            else:
-                self.other_pages[new_page.url] = new_page
-            self.inner_urls |= set(new_page.child_urls)
-            if not self.greedy:
-                new_page.free()  # frees memory after parsing
+            self.scheduler.wait(helpers.get_domain(url))
+            self._enter()
+            start = time.perf_counter()
+            new_page, canonical = self._fetch_page(url)
+            status = 200
+            child_links = {} if new_page is None else new_page.child_links
+            self._process(url, new_page, child_links, canonical)
 
         except (urllib.error.HTTPError, wp.TimeoutException) as e:
+            status = getattr(e, "code", None)
             self._on_timeout_exception(url, e)
+        except tp.SkippedContent as e:
+            status = 200
+            self._learn(url)
+            self._mark_skipped(url, e.reason)
         except urllib.error.URLError:
+            self._mark_invalid(url)
+        except Exception as e:
+            self._on_unexpected_exception(url, e)
+        finally:
+            if start is not None:
+                self._report(start, status)
+                self._leave()
+            self.metrics.add_gauge("in_flight", -1)
+
+    def _enter(self):
+        """Blocks until the limit allows one more request in flight."""
+        with self._gate:
+            self._gate.wait_for(lambda: self._visiting < self._limit())
+            self._visiting += 1
+
+    def _leave(self):
+        """Releases the slot of a request taken by '_enter'."""
+        with self._gate:
+            self._visiting -= 1
+            self._gate.notify_all()
+
+    def _fetch(self, url):
+        """tuple: the response of the url, what an earlier crawl saved of it
+                  and the canonical url if its body is a duplicate.
+        Note:
+            This and '_fetch_page' are the blocking part of a visit, they
+            don't touch the state of the crawler so they can run in any
+            thread. The content index is thread safe.
+        """
+        cached = self._cached(url)
+        response = wp.request_page(
+            url, self._timeout, self.transport, rc.conditional_headers(cached),
+            self.content_filter)
+        self.scheduler.feedback(helpers.get_domain(url), 200)
+        if response.truncated:
+            self.metrics.increment("truncated")
+        canonical = None
+        if self.content_index is not None and response.status != 304:
+            canonical = self.content_index.add(url, response.body)
+        return response, cached, canonical
+
+    def _fetch_page(self, url):
+        """tuple: the WebPage of the url, its child URLs resolved, or None
+                  and the canonical url if the page is a duplicate.
+        """
+        response, cached, canonical = self._fetch(url)
+        if canonical is not None:
+            return None, canonical
+        new_page = wp.WebPage(
+            url, timeout=self._timeout, transport=self.transport,
+            parser=self.parser, response=response, cached=cached,
+            rules=self.rules)
+        new_page.child_urls  # parses the links while still off the main loop
+        return new_page, None
+
+    def _process(self, url, page, child_links, canonical):
+        """Stores the outcome of a visit and queues the links found."""
+        if canonical is not None:
+            self._mark_alias(url, canonical)
+            return
+        self._remember(page, child_links)
+        self._enqueue(self._canonical(child_links), url)
+        self._store_page(page)
+        if not self.greedy:
+            page.free()  # frees memory after parsing
+
+    def _cached(self, url):
+        """CacheEntry: what an earlier crawl saved of the url, if anything."""
+        return None if self.recrawl is None else self.recrawl.get(url)
+
+    def _remember(self, page, child_urls):
+        """Saves the validators and values of the page for the next crawl."""
+        if self.recrawl is None:
+            return
+        if page.not_modified:
+            self.metrics.increment("not_modified")
+        entry = page.cache_entry(child_urls)
+        if entry is not None:
+            self.recrawl.put(page.url, entry)
+
+    def _store_page(self, page):
+        """Classifies the page as target or not and stores it.
+        Note:
+            The target is identified on the live page. Unless in greedy mode,
+            the page itself is dropped and only its record is kept.
+        """
+        is_target = bool(self.identify_target(page))
+        with self._state_lock:
+            self.n_targets += is_target
+        self._learn(page.url, is_target)
+        self.metrics.observe_all(page.timings)
+        self.metrics.increment("pages")
+        self.metrics.increment("bytes", page.wire_bytes)
+        if not self.greedy:
+            page = page.record()
+        if self.sink is not None:
+            self.sink.write(page, is_target)
+        if not self.keep_pages:
+            self._record("done", page.url)
+            return
+        with self._state_lock:
+            if is_target:
+                self.target_pages[page.url] = page
+            else:
+                self.other_pages[page.url] = page
+        self._record("page", page, is_target)
+
+    def _mark_visited(self, url):
+        """Adds the url to the visited set."""
+        with self._state_lock:
+            self.visited_urls.add(url)
+        self._record("visit", url)
+
+    def _mark_alias(self, url, canonical):
+        """Reports the url as a duplicate of the canonical url."""
+        self.metrics.increment("duplicates")
+        self._learn(url)
+        if self.keep_pages:
+            with self._state_lock:
+                self.aliases[url] = canonical
+        self._record("alias", url, canonical)
+
+    def _mark_skipped(self, url, reason):
+        """Reports the url as skipped by the content filter."""
+        self.metrics.increment("skipped_" + reason)
+        if self.keep_pages:
+            with self._state_lock:
+                self.skipped[url] = reason
+        self._record("skip", url, reason)
+
+    def _mark_invalid(self, url):
+        """Adds the url to the invalid set."""
+        with self._state_lock:
             self.invalid_urls.add(url)
+        self._learn(url)
+        self.metrics.error("invalid_url")
+        self._record("invalid", url)
+
+    def _record(self, kind, *args):
+        """Journals a change of state if the crawl is checkpointed."""
+        if self.checkpoint is not None:
+            self.checkpoint.record(kind, *args)
+
+    def _flush_outputs(self):
+        """Writes the journal events and results still in the buffers."""
+        if self.checkpoint is not None:
+            self.checkpoint.flush()
+        if self.sink is not None:
+            self.sink.flush()
+
+    def _close_outputs(self):
+        """Closes the journal and the sink and saves the recrawl cache, once
+           the crawl is over.
+        """
+        if self.checkpoint is not None:
+            self.checkpoint.close()
+        if self.sink is not None:
+            self.sink.close()
+        if self.recrawl is not None:
+            self.recrawl.save()
 
-    def _on_timeout_exception(self, url, exception, wait=60):
+    def _log_start(self):
+        """Logs the parameters of the crawl."""
+        msg = "Initiating crawl...\n" \
+              + "Domain: {}\n".format(self.root_page.domain) \
+              + "Request limit: {}\n".format(self.req_limit) \
+              + "Greedy mode: {}\n".format("Yes" if self.greedy else "No")
+        self.logger.debug(msg)
+
+    def _log_progress(self):
+        """Logs the crawl progress every 'log_frequency' visited pages."""
+        if len(self.visited_urls) % self.log_frequency == 0:
+            gauges = self.metrics.gauges
+            msg = "Visited pages: {}; Targets found {}; Running visits {}; " \
+                  "Queued {}".format(
+                      len(self.visited_urls), self.n_targets,
+                      gauges["in_flight"], gauges["queue_depth"])
+            self.logger.debug(msg)
+
+    def _on_timeout_exception(self, url, exception):
         """Event handler to deal with timeout events.
         Note:
-            It's important to wait for a few seconds after getting timed out,
-            trying the domain you are not a threat.
+            Instead of stalling the worker, the answer is reported to the
+            scheduler, which slows down the host when throttling answers spike
+            and pauses it when the server sends a Retry-After header. Timeouts,
+            429 and 5xx answers are transient: the url is queued again, at the
+            back of the frontier, so it is visited later at the host's new
+            pace, up to '_max_retries' times before it is marked invalid. Any
+            other error status (404, 410, 403...) won't change on a retry and
+            marks the url invalid at once. Its request still counts towards
+            the budget.
         """
         self.logger.debug(str(exception))
-        time.sleep(wait)
-        self.visited_urls.remove(url)
-
-    def _get_unvisited_urls(self, urls):
-        """set: Return the unvisited URLs among the ones given."""
-        unvisited = set()
-        for url in urls:
-            if url not in self.visited_urls and url not in self.invalid_urls:
-                unvisited.add(url)
-        return unvisited  # sets are not subscriptable
+        status = getattr(exception, "code", None)
+        self.metrics.error("timeout" if status is None else "http_{}".format(status))
+        headers = getattr(exception, "headers", None) or {}
+        self.scheduler.feedback(
+            helpers.get_domain(url), status, headers.get("Retry-After"))
+        if not self._retryable(status):
+            self._mark_invalid(url)
+            return
+        with self._lock:
+            retries = self._retries[url] = self._retries.get(url, 0) + 1
+        if retries > self._max_retries:
+            self._mark_invalid(url)
+            return
+        with self._state_lock:
+            self.visited_urls.discard(url)
+        self._learn(url)
+        with self._lock:
+            self._frontier.requeue(url)
+        self.metrics.add_gauge("queue_depth", 1)
+        self._record("fail", url)
+
+    @staticmethod
+    def _retryable(status):
+        """bool: True if a request failing with the status may succeed later,
+                 i.e. it timed out (None) or was answered with 429 or 5xx.
+        """
+        return status is None or status == 429 or status >= 500
+
+    def _on_unexpected_exception(self, url, exception):
+        """Event handler of the errors no other handler expects.
+        Note:
+            A bug or a malformed page must not stop the crawl: the error is
+            logged and counted, and the url is marked invalid.
+        """
+        self.logger.debug("Unexpected error on {}: {!r}".format(url, exception))
+        self.metrics.error("unexpected")
+        self._mark_invalid(url)
+
+    @staticmethod
+    def _exact_store(url_store):
+        """str: kind of store for sets that need removals and no false hits."""
+        return "set" if url_store == "set" else "hash"
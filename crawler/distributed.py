@@ -0,0 +1,403 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 17:41:36 2026
+
+@author: Carlos
+"""
+
+import asyncio
+import hashlib
+import warnings
+import threading
+import collections
+import multiprocessing
+from multiprocessing.managers import BaseManager
+
+import helpers
+from crawler import Crawler
+
+_SHARD_KEYS = ("host", "url")
+
+
+def shard_of(url, n_shards, by="host"):
+    """int: shard owning the url, from a stable hash of its host or itself.
+    Raises:
+        ValueError: If 'by' isn't 'host' or 'url'.
+    """
+    if by == "host":
+        key = helpers.get_domain(url)
+    elif by == "url":
+        key = url
+    else:
+        raise ValueError("Unknown shard key: {}, expected one of {}".format(
+            by, _SHARD_KEYS))
+    digest = hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little") % n_shards
+
+
+class Coordinator(object):
+    """Global state of a distributed crawl, shared by all the nodes.
+    Note:
+        Holds an inbox per node, where the other nodes drop the batches of
+        links it owns, hands out the global request budget in leases and
+        detects the end of the crawl: every node is idle and no batch is
+        waiting in an inbox, or the budget is spent. A node is marked busy
+        as soon as it takes a batch, so no link is ever in transit while
+        all the nodes look idle. Served to the nodes over a socket by
+        'serve_coordinator'.
+    Args:
+        n_nodes (int): number of nodes of the crawl.
+        req_limit (int): maximum number of requests of the whole crawl.
+    """
+
+    def __init__(self, n_nodes, req_limit):
+        self.n_nodes = n_nodes
+        self.req_limit = int(req_limit)
+        self._inboxes = [collections.deque() for _ in range(n_nodes)]
+        self._busy = [True]*n_nodes
+        self._granted = 0
+        self._exhausted = False
+        self._reports = {}
+        self._lock = threading.Lock()
+
+    def settings(self):
+        """tuple: number of nodes and request limit of the crawl."""
+        return self.n_nodes, self.req_limit
+
+    def acquire(self, n):
+        """int: grants up to n requests of the budget, 0 once it is spent."""
+        with self._lock:
+            grant = max(0, min(n, self.req_limit - self._granted))
+            self._granted += grant
+            self._exhausted = self._exhausted or grant < n
+            return grant
+
+    def send(self, node, links):
+        """Drops a batch of (url, anchor text) pairs in the node's inbox."""
+        with self._lock:
+            self._inboxes[node].append(links)
+
+    def receive(self, node):
+        """list: next batch of the node's inbox, None if it is empty."""
+        with self._lock:
+            if not self._inboxes[node]:
+                return None
+            self._busy[node] = True
+            return self._inboxes[node].popleft()
+
+    def idle(self, node, unused=0):
+        """Marks the node as idle, returning the requests it didn't use."""
+        with self._lock:
+            self._busy[node] = False
+            self._granted -= unused
+
+    def finished(self):
+        """bool: True when no node can do anything else."""
+        with self._lock:
+            if any(self._busy):
+                return False
+            return self._exhausted or not any(self._inboxes)
+
+    def report(self, node, summary):
+        """Stores the summary of the results of a node."""
+        with self._lock:
+            self._reports[node] = summary
+
+    def reports(self):
+        """list: summaries reported by the nodes, in node order."""
+        with self._lock:
+            return [self._reports[node] for node in sorted(self._reports)]
+
+
+class DistributedCrawler(Crawler):
+    """Node of a crawl whose frontier is sharded across several processes.
+    Note:
+        Each node only queues, and remembers, the URLs of its own shard. The
+        links owned by other nodes are grouped in batches of 'batch_size'
+        and sent to their owner through the coordinator, which also hands
+        out the global request budget, 'lease' requests at a time, so the
+        nodes rarely wait on it. At most 'lease' requests per node may be
+        left unused at the end. Sharding by url spreads the domain over all
+        the nodes, each one then applying the scheduler's rate on its own,
+        while sharding by host keeps every host on one node, so its
+        politeness limits hold: a single domain crawl then runs on one node
+        only, hence a warning. The root url is visited by its owner like
+        any other url and each node reads the robots.txt of the domain, all
+        of it charged to the global budget, like the sitemaps. Every call to the coordinator
+        is made by the mailbox on a thread, off the event loop. Links
+        received from other nodes are at depth 1 for the trap guard. Only
+        the 'run_async' engine is supported. The other arguments are the
+        ones of Crawler, except for 'req_limit', read from the coordinator.
+    Args:
+        domain (str): the domain that needs to be crawled.
+        coordinator (Coordinator): coordinator of the crawl, or its proxy.
+        node (int): number of this node, from 0 to n_nodes - 1.
+        shard_by (str): 'url' or 'host', what is hashed to pick the owner.
+        batch_size (int): number of links sent to another node at once.
+        lease (int): number of requests taken from the budget at once.
+        poll_interval (float): seconds between two checks of the inbox.
+    """
+
+    def __init__(
+            self, domain, coordinator, node, shard_by="url", batch_size=500,
+            lease=16, poll_interval=0.05, **kwargs):
+        self.coordinator = coordinator
+        self.node = node
+        self.n_nodes, req_limit = coordinator.settings()
+        self.shard_by = shard_by
+        self.batch_size = batch_size
+        self.lease = lease
+        self.poll_interval = poll_interval
+        self.root_url = helpers.safe_url(domain)
+        self._outboxes = collections.defaultdict(list)
+        self._permits = 0
+        self._exhausted = False
+        self._nudge = None
+        shard_of(domain, self.n_nodes, shard_by)  # validates the shard key
+        if shard_by == "host" and self.n_nodes > 1:
+            warnings.warn("Sharding a single domain by host runs the whole "
+                          "crawl on one node, shard it by url instead")
+        super().__init__(domain, req_limit=req_limit, **kwargs)
+
+    def run(self, n_workers):
+        """Not supported, distributed crawls run on 'run_async'."""
+        raise NotImplementedError("Distributed crawls only run on run_async")
+
+    def _open_root(self, domain):
+        """None: the root url is visited by the workers of its owner."""
+        return None
+
+    async def _crawl_async(self, concurrency, parse_workers=0):
+        """Runs the workers, with an event waking up the mailbox."""
+        self._nudge = asyncio.Event()
+        await super()._crawl_async(concurrency, parse_workers)
+
+    def _seed(self):
+        """Nothing, the mailbox seeds the crawl once it holds a lease."""
+
+    def _enqueue(self, links, parent=None):
+        """Queues the links of this node's shard and keeps the others for
+           the mailbox, woken up once a batch is full.
+        """
+        local = {}
+        for url, text in links.items():
+            owner = shard_of(url, self.n_nodes, self.shard_by)
+            if owner == self.node:
+                local[url] = text
+                continue
+            outbox = self._outboxes[owner]
+            outbox.append((url, text))
+            if len(outbox) >= self.batch_size and self._nudge is not None:
+                self._nudge.set()
+        super()._enqueue(local, parent)
+
+    def _log_start(self):
+        """Logs the parameters of the crawl."""
+        msg = "Initiating crawl...\n" \
+              + "Domain: {}\n".format(helpers.get_domain(self.root_url)) \
+              + "Node: {} of {}\n".format(self.node, self.n_nodes) \
+              + "Request limit: {}\n".format(self.req_limit) \
+              + "Greedy mode: {}\n".format("Yes" if self.greedy else "No")
+        self.logger.debug(msg)
+
+    def _send(self, batches):
+        """Sends the batches of (owner, links) to their nodes."""
+        for owner, links in batches:
+            self.coordinator.send(owner, links)
+            self.metrics.increment("urls_sent", len(links))
+
+    def _budget_spent(self):
+        """bool: True once the global budget is spent for this node."""
+        return self._permits == 0 and self._exhausted
+
+    def _can_proceed(self):
+        """bool: True when a worker has something to do or should stop.
+        Note:
+            A worker without any permit left waits for the next lease.
+        """
+        return (self._frontier.ready() and self._visiting < self._limit()
+                and self._permits > 0
+                or self._in_flight == 0 or self._budget_spent())
+
+    def _reserve(self):
+        """bool: uses one permit of the lease, False once the budget is spent."""
+        if self._permits == 0:
+            return False
+        self._permits -= 1
+        if self._permits == 0:
+            self._nudge.set()  # the mailbox takes the next lease
+        self.budget.reserve()  # counts the requests of this node
+        return True
+
+    def _charge(self):
+        """bool: takes a request of the global budget for a robots.txt or a
+                 sitemap, False once it is spent.
+        Note:
+            Called on a thread, so it asks the coordinator directly instead
+            of using the permits of the workers.
+        """
+        if not self.coordinator.acquire(1):
+            return False
+        self.budget.reserve()  # counts the requests of this node
+        self._record("request")
+        return True
+
+    def _side_tasks(self):
+        """list: the mailbox, holding a slot so the workers wait for it."""
+        tasks = super()._side_tasks()
+        self._in_flight += 1
+        return tasks + [self._mailbox()]
+
+    async def _mailbox(self):
+        """Exchanges links with the other nodes until the crawl is over.
+        Note:
+            Takes the leases of the budget as the workers use them. The node
+            reports itself idle when only the mailbox is running, there is
+            nothing it can visit and every link found was sent, and leaves
+            when the coordinator says the whole crawl is over.
+        """
+        loop = asyncio.get_running_loop()
+        try:
+            await self._start(loop)
+            while True:
+                self._nudge.clear()
+                batches = [item for item in self._outboxes.items() if item[1]]
+                self._outboxes.clear()
+                if batches:
+                    await loop.run_in_executor(None, self._send, batches)
+                if self._permits == 0 and self._frontier:
+                    await self._lease(loop)
+                links = await loop.run_in_executor(
+                    None, self.coordinator.receive, self.node)
+                if links and not self._budget_spent():
+                    self.metrics.increment("urls_received", len(links))
+                    async with self._wakeup:
+                        super()._enqueue(dict(links))
+                        self._wakeup.notify_all()
+                    continue
+                if self._in_flight == 1 and not any(self._outboxes.values()) \
+                        and (not self._frontier or self._budget_spent()):
+                    permits, self._permits = self._permits, 0
+                    await loop.run_in_executor(
+                        None, self.coordinator.idle, self.node, permits)
+                    if await loop.run_in_executor(
+                            None, self.coordinator.finished):
+                        return
+                try:
+                    await asyncio.wait_for(
+                        self._nudge.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            async with self._wakeup:
+                self._in_flight -= 1
+                self._wakeup.notify_all()
+
+    async def _start(self, loop):
+        """Reads the robots.txt, takes the first lease and queues the root
+           url and the URLs of the sitemaps, on its owner.
+        """
+        if self.obey_robots:
+            await loop.run_in_executor(None, self.robots.rules, self.root_url)
+        if not await self._lease(loop):
+            return
+        if shard_of(self.root_url, self.n_nodes, self.shard_by) != self.node:
+            return
+        async with self._wakeup:
+            self._enqueue(self._canonical({self.root_url: ""}))
+            self._wakeup.notify_all()
+        await self._queue_sitemaps(loop, self.root_url)
+
+    async def _lease(self, loop):
+        """int: takes the next lease of the budget, waking up the workers."""
+        if self._exhausted:
+            return 0
+        permits = await loop.run_in_executor(
+            None, self.coordinator.acquire, self.lease)
+        async with self._wakeup:
+            self._permits += permits
+            self._exhausted = permits == 0
+            self._wakeup.notify_all()
+        return permits
+
+
+def serve_coordinator(
+        n_nodes, req_limit, address=("127.0.0.1", 0), authkey=b"crawler"):
+    """tuple: the Coordinator and the address it is served at.
+    Note:
+        The coordinator is served on a background thread of this process,
+        over a socket the nodes connect to with 'connect', from this machine
+        or any other that can reach the address.
+    """
+    coordinator = Coordinator(n_nodes, req_limit)
+    manager_class = type("CoordinatorManager", (BaseManager,), {})
+    manager_class.register("coordinator", callable=lambda: coordinator)
+    server = manager_class(address, authkey).get_server()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return coordinator, server.address
+
+
+def connect(address, authkey=b"crawler"):
+    """Coordinator: proxy of the coordinator served at the address."""
+    manager_class = type("CoordinatorManager", (BaseManager,), {})
+    manager_class.register("coordinator")
+    manager = manager_class(tuple(address), authkey)
+    manager.connect()
+    return manager.coordinator()
+
+
+def run_node(address, authkey, node, domain, concurrency=8, parse_workers=0,
+             **kwargs):
+    """Runs one node of a distributed crawl and reports its results.
+    Note:
+        The summary reported to the coordinator holds the node's stats and
+        its pages. '{node}' in the 'checkpoint' and 'recrawl' paths is
+        replaced by the number of the node, so each one has its own files.
+    Args:
+        address (tuple): address of the coordinator.
+        authkey (bytes): key shared by the coordinator and the nodes.
+        node (int): number of this node.
+        domain (str): the domain that needs to be crawled.
+        concurrency (int): number of requests kept in flight by the node.
+        parse_workers (int): number of parsing processes of the node.
+        kwargs: arguments of the DistributedCrawler.
+    """
+    for key in ("checkpoint", "recrawl"):
+        if kwargs.get(key):
+            kwargs[key] = kwargs[key].format(node=node)
+    coordinator = connect(address, authkey)
+    crawler = DistributedCrawler(domain, coordinator, node, **kwargs)
+    crawler.run_async(concurrency, parse_workers)
+    coordinator.report(node, {
+        "node": node,
+        "stats": crawler.stats(),
+        "target_pages": list(crawler.target_pages.values()),
+        "other_pages": list(crawler.other_pages.values()),
+    })
+
+
+def crawl_local(domain, n_nodes=2, req_limit=1e4, concurrency=8,
+                parse_workers=0, authkey=b"crawler", **kwargs):
+    """list: crawls with 'n_nodes' processes on this machine.
+    Note:
+        The local backend of the distributed mode: the coordinator is served
+        on a local socket and each node runs in its own process. The other
+        arguments are passed to every DistributedCrawler and must be
+        picklable, e.g. 'indentify_target' must be a module level function.
+        Returns the summary reported by each node, see 'run_node'.
+    """
+    coordinator, address = serve_coordinator(
+        n_nodes, req_limit, ("127.0.0.1", 0), authkey)
+    context = multiprocessing.get_context("spawn")
+    processes = [
+        context.Process(
+            target=run_node, args=(address, authkey, node, domain),
+            kwargs=dict(kwargs, concurrency=concurrency,
+                        parse_workers=parse_workers))
+        for node in range(n_nodes)
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+    return coordinator.reports()
@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 17:21:22 2026
+
+@author: Carlos
+"""
+
+import re
+import codecs
+import collections
+import html.parser
+
+
+Extraction = collections.namedtuple(
+    "Extraction",
+    ["title", "target_name", "hrefs", "anchor_texts", "base_href", "fields"])
+
+_CHARSET = re.compile(rb"""charset\s*=\s*["']?([\w.:-]+)""", re.I)
+
+
+class PageExtractor(html.parser.HTMLParser):
+    """Event based parser that only keeps what the crawler uses.
+    Note:
+        No tree is built: the parser collects the href of the anchors, the
+        text of the first <title>, the href of the first <base> and the text
+        of the first element matching the target tag and class while the
+        markup is fed to it. A 'matcher' (see rules.RuleMatcher) receives
+        the tags in the same pass.
+    Attributes:
+        title (str): text of the page title.
+        target_name (str): text of the target element, None if not found.
+        hrefs (list): href values of the anchors, in document order.
+        anchor_texts (list): text of each of those anchors.
+        base_href (str): href of the <base> tag, None if there is none.
+    """
+
+    def __init__(self, target_tag, target_class, matcher=None):
+        super().__init__(convert_charrefs=True)
+        self.target_tag = target_tag
+        self.target_class = target_class
+        self.matcher = matcher
+        self.title = None
+        self.target_name = None
+        self.hrefs = []
+        self.anchor_texts = []
+        self.base_href = None
+
+        self._anchor = None  # parts of the anchor text while inside it
+        self._title = None  # parts of the title while inside it
+        self._target = None  # parts of the target text while inside it
+        self._depth = 0  # nesting of target tags inside the target
+
+    def handle_starttag(self, tag, attrs):
+        if self.matcher is not None:
+            self.matcher.start(tag, attrs)
+        if tag == "a":
+            self._close_anchor()
+            for name, value in attrs:
+                if name == "href" and value is not None:
+                    self.hrefs.append(value)
+                    self._anchor = []
+                    break
+        elif tag == "title" and self.title is None and self._title is None:
+            self._title = []
+        elif tag == "base" and self.base_href is None:
+            self.base_href = dict(attrs).get("href")
+
+        if tag != self.target_tag:
+            return
+        if self._target is not None:
+            self._depth += 1
+        elif self.target_name is None and self._has_target_class(attrs):
+            self._target = []
+            self._depth = 1
+
+    def handle_endtag(self, tag):
+        if self.matcher is not None:
+            self.matcher.end(tag)
+        if tag == "a":
+            self._close_anchor()
+        elif tag == "title" and self._title is not None:
+            self.title = "".join(self._title)
+            self._title = None
+        elif tag == self.target_tag and self._target is not None:
+            self._depth -= 1
+            if self._depth == 0:
+                self.target_name = "".join(self._target)
+                self._target = None
+
+    def handle_data(self, data):
+        if self.matcher is not None:
+            self.matcher.data(data)
+        if self._anchor is not None:
+            self._anchor.append(data)
+        if self._title is not None:
+            self._title.append(data)
+        if self._target is not None:
+            self._target.append(data)
+
+    def close(self):
+        """Flushes the parser, closing any element left open."""
+        super().close()
+        self._close_anchor()
+        if self.matcher is not None:
+            self.matcher.close()
+        if self._title is not None:
+            self.title = "".join(self._title)
+        if self._target is not None:
+            self.target_name = "".join(self._target)
+
+    def _close_anchor(self):
+        if self._anchor is not None:
+            self.anchor_texts.append(" ".join("".join(self._anchor).split()))
+            self._anchor = None
+
+    def _has_target_class(self, attrs):
+        """bool: True if the 'class' attribute contains the target class."""
+        for name, value in attrs:
+            if name == "class" and value:
+                return self.target_class in value.split()
+        return False
+
+
+def sniff_encoding(body, content_type=None):
+    """str: charset of the page, from the headers, a <meta> tag or utf-8."""
+    for source in (content_type.encode("latin-1", "ignore") if content_type else b"",
+                   body[:2048]):
+        match = _CHARSET.search(source)
+        if match:
+            encoding = match.group(1).decode("ascii")
+            try:
+                return codecs.lookup(encoding).name
+            except LookupError:
+                pass
+    return "utf-8"
+
+
+def feed(parser, body, content_type=None, chunk_size=65536):
+    """Decodes the body and feeds it to the html parser, a chunk at a time."""
+    decoder = codecs.getincrementaldecoder(
+        sniff_encoding(body, content_type))(errors="replace")
+    for i in range(0, len(body), chunk_size):
+        parser.feed(decoder.decode(body[i:i+chunk_size]))
+    parser.feed(decoder.decode(b"", final=True))
+
+
+def extract(body, target_tag, target_class, content_type=None,
+            chunk_size=65536, rules=None):
+    """Extraction: extracts title, target text and hrefs in a single pass.
+    Args:
+        body (bytes): raw html of the page.
+        target_tag (str): type of html tag that identifies the target.
+        target_class (str): class of the html tag that identifies the target.
+        content_type (str): Content-Type header, used to find the charset.
+        chunk_size (int): number of bytes decoded and fed at a time.
+        rules (RuleSet): extraction rules evaluated in the same pass, their
+                         values are the 'fields', None without rules.
+    """
+    matcher = None if rules is None else rules.matcher(body)
+    parser = PageExtractor(target_tag, target_class, matcher)
+    feed(parser, body, content_type, chunk_size)
+    parser.close()
+    fields = None if rules is None else rules.values(body, matcher)
+    return Extraction(parser.title or "", parser.target_name, parser.hrefs,
+                      parser.anchor_texts, parser.base_href, fields)
@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 17:53:16 2026
+
+@author: Carlos
+"""
+
+import urllib.parse
+
+_EXTENSIONS = (
+    ".pdf", ".jpg", ".jpeg", ".png", ".gif", ".webp", ".svg", ".ico", ".bmp",
+    ".tif", ".tiff", ".mp3", ".mp4", ".m4a", ".avi", ".mov", ".wmv", ".webm",
+    ".ogg", ".wav", ".flac", ".zip", ".gz", ".tgz", ".bz2", ".xz", ".rar",
+    ".7z", ".tar", ".exe", ".dmg", ".iso", ".msi", ".apk", ".bin", ".doc",
+    ".docx", ".xls", ".xlsx", ".ppt", ".pptx", ".odt", ".ods", ".csv", ".xml",
+    ".rss", ".atom", ".json", ".css", ".js", ".woff", ".woff2", ".ttf", ".eot")
+_CONTENT_TYPES = ("text/html", "application/xhtml+xml")
+
+
+class ContentFilter(object):
+    """Decides which links are requested and which responses are read.
+    Note:
+        Links whose path ends with one of 'extensions' are dropped before
+        they are queued. The Content-Type of each response is checked as
+        soon as its headers arrive, and the body of the ones that aren't
+        html is never downloaded. Responses without a Content-Type are read.
+        Bodies are cut at 'max_bytes' while they are downloaded, so a huge
+        page can't hold a worker or fill the memory.
+    Args:
+        extensions (tuple): extensions of the links never requested.
+        content_types (tuple): media types of the bodies that are read.
+        max_bytes (int): size of the bodies, decompressed, beyond which
+                         they are truncated, None for no limit.
+    """
+
+    def __init__(self, extensions=_EXTENSIONS, content_types=_CONTENT_TYPES,
+                 max_bytes=5 << 20):
+        self.extensions = frozenset(extension.lower() for extension in extensions)
+        self.content_types = frozenset(kind.lower() for kind in content_types)
+        self.max_bytes = max_bytes
+
+    def check_url(self, url):
+        """str: why the url mustn't be requested, None if it can be."""
+        name = urllib.parse.urlsplit(url).path.rsplit("/", 1)[-1]
+        dot = name.rfind(".")
+        if dot >= 0 and name[dot:].lower() in self.extensions:
+            return "extension"
+        return None
+
+    def check_headers(self, headers):
+        """str: why the body of the response mustn't be read, None if it
+                can be.
+        """
+        content_type = headers.get("Content-Type")
+        if not content_type:
+            return None
+        kind = content_type.split(";", 1)[0].strip().lower()
+        if kind not in self.content_types:
+            return "content_type"
+        return None
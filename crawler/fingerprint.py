@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 17:44:21 2026
+
+@author: Carlos
+"""
+
+import re
+import hashlib
+import threading
+import collections
+
+Fingerprint = collections.namedtuple("Fingerprint", ["exact", "simhash"])
+
+_SCRIPTS = re.compile(rb"<(script|style)\b.*?</\1\s*>", re.I | re.S)
+_TAGS = re.compile(rb"<[^>]*>")
+_WORDS = re.compile(rb"\w+")
+_BITS = [bytes((value >> bit) & 1 for value in range(256)) for bit in range(8)]
+
+
+def exact_hash(body):
+    """int: 64 bit hash of the raw body."""
+    return int.from_bytes(
+        hashlib.blake2b(body, digest_size=8).digest(), "little")
+
+
+def simhash(body, shingle_size=3):
+    """int: 64 bit SimHash of the text of an html body, None if it has no
+         words.
+    Note:
+        The text is split in overlapping shingles of 'shingle_size' words,
+        markup, scripts and styles excluded. Each bit of the SimHash is the
+        majority vote of that bit over the hashes of the shingles, so pages
+        sharing most of their text differ on a few bits only. The votes are
+        counted a byte column at a time with 'bytes.translate', instead of
+        looping over every bit of every shingle. Pages without any text,
+        e.g. a frameset or an image gallery, would all get the same value,
+        hence None.
+    """
+    text = _TAGS.sub(b" ", _SCRIPTS.sub(b" ", body)).lower()
+    words = _WORDS.findall(text)
+    if not words:
+        return None
+    shingles = {b" ".join(words[i:i + shingle_size])
+                for i in range(max(1, len(words) - shingle_size + 1))}
+    digests = b"".join(hashlib.blake2b(shingle, digest_size=8).digest()
+                       for shingle in shingles)
+    value = 0
+    for byte in range(8):
+        column = digests[byte::8]
+        for bit in range(8):
+            if 2*column.translate(_BITS[bit]).count(1) > len(shingles):
+                value |= 1 << (8*byte + bit)
+    return value
+
+
+def fingerprint(body):
+    """Fingerprint: the exact hash and the SimHash of a body."""
+    return Fingerprint(exact_hash(body), simhash(body))
+
+
+class ContentIndex(object):
+    """Remembers the content of the pages to recognize the duplicates.
+    Note:
+        The first page seen with a given content is its canonical page, any
+        later one is reported as its alias. Identical bodies are found by
+        their exact hash and, if 'max_distance' is positive, pages whose
+        SimHash differs from a known one on at most 'max_distance' bits are
+        near duplicates. The SimHashes are split in 'max_distance' + 1
+        bands indexed apart: two values that close share at least one
+        band, so only the pages sharing a band are compared. Pages without
+        any text are only matched by their exact hash. Thread safe.
+    Args:
+        max_distance (int): maximum number of differing SimHash bits of
+                            near duplicates, 0 only finds exact ones.
+    """
+
+    def __init__(self, max_distance=3):
+        self.max_distance = max_distance
+        self._exact = {}
+        self._bands = [{} for _ in range(max_distance + 1)] if max_distance else []
+        self._width = 64//(max_distance + 1)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._exact)
+
+    def add(self, url, body):
+        """str: canonical url of the body if it is a duplicate, else None,
+                the url then becoming the canonical page of its content.
+        """
+        exact = exact_hash(body)
+        value = simhash(body) if self.max_distance else None
+        with self._lock:
+            canonical = self._exact.get(exact)
+            if canonical is None and value is not None:
+                canonical = self._near(value)
+            if canonical is not None:
+                return canonical
+            self._exact[exact] = url
+            for band, index in zip(self._keys(value), self._bands):
+                index.setdefault(band, []).append((value, url))
+        return None
+
+    def _near(self, value):
+        """str: url of a known page whose SimHash is close to the value."""
+        for band, index in zip(self._keys(value), self._bands):
+            for other, url in index.get(band, ()):
+                if bin(value ^ other).count("1") <= self.max_distance:
+                    return url
+        return None
+
+    def _keys(self, value):
+        """list: bands of the SimHash, the last one taking the spare bits."""
+        if value is None:
+            return []
+        mask = (1 << self._width) - 1
+        keys = [(value >> (i*self._width)) & mask
+                for i in range(len(self._bands) - 1)]
+        keys.append(value >> ((len(self._bands) - 1)*self._width))
+        return keys
@@ -6,10 +6,15 @@ Created on Sat May 19 14:04:28 2018
 """
 
 import os
+import re
 import csv
 import pickle
-import urllib
+import urllib.parse
 import logging
+import functools
+
+_SAFE_CHARS = "%/:=&?~#+!$,;'@()*[]"
+_SCHEME = re.compile(r"[a-zA-Z][a-zA-Z0-9+.-]*:")
 
 
 def safe_url(url):
@@ -18,9 +23,10 @@ def safe_url(url):
     """
     if not (url.startswith("https://") or url.startswith("http://")):
         url = "https://" + url
-    return urllib.parse.quote(url, safe="%/:=&?~#+!$,;'@()*[]")
+    return urllib.parse.quote(url, safe=_SAFE_CHARS)
 
 
+@functools.lru_cache(maxsize=1 << 14)
 def get_domain(url):
     """Return the domain of the url, or an empty string."""
     url = safe_url(url)
@@ -28,6 +34,61 @@ def get_domain(url):
     return parsed_url.netloc
 
 
+def resolve_links(base_url, links, domain):
+    """list: the (url, text) links of the domain, resolved against the base.
+    Note:
+        The links of a whole page are resolved in one pass with 'urljoin',
+        so relative ('../a', 'a?b') and scheme relative ('//host/a') hrefs
+        follow the rules of the browsers. The resolution and quoting of each
+        href is cached and shared by all the pages: absolute hrefs are
+        cached on their own and root relative ones ('/a') per origin, so the
+        navigation links repeated on every page are only resolved once.
+        Fragment only hrefs, which point to the page itself, and the
+        non http(s) ones are skipped.
+    Args:
+        base_url (str): url the hrefs are relative to, the page url or the
+                        href of its <base> tag.
+        links (list): (href, anchor text) pairs, in document order.
+        domain (str): netloc of the links that are kept.
+    """
+    origin = _origin(base_url)
+    domain = domain.lower()
+    resolved = []
+    for href, text in links:
+        href = href.strip()
+        if not href or href[0] == "#":
+            continue
+        if _SCHEME.match(href):
+            base = ""
+        elif href[0] == "/":
+            base = origin
+        else:
+            base = base_url
+        host, url = _resolve(base, href)
+        if host == domain:
+            resolved.append((url, text))
+    return resolved
+
+
+@functools.lru_cache(maxsize=1 << 10)
+def _origin(url):
+    """str: 'scheme://netloc' of the url."""
+    parts = urllib.parse.urlsplit(url)
+    return "{}://{}".format(parts.scheme, parts.netloc)
+
+
+@functools.lru_cache(maxsize=1 << 16)
+def _resolve(base, href):
+    """tuple: lowercase netloc and quoted url of the href, an empty netloc
+              if it isn't an http(s) url.
+    """
+    url = urllib.parse.urljoin(base, href)
+    parts = urllib.parse.urlsplit(url)
+    if parts.scheme not in ("http", "https"):
+        return "", url
+    return parts.netloc.lower(), urllib.parse.quote(url, safe=_SAFE_CHARS)
+
+
 def get_url(domain, route):
     """Concatenates the domain with the route."""
     return domain + route
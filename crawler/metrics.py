@@ -0,0 +1,204 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 17:31:32 2026
+
+@author: Carlos
+"""
+
+import bisect
+import threading
+import collections
+import http.server
+
+
+class Histogram(object):
+    """Histogram of durations over fixed, exponentially spaced buckets.
+    Note:
+        Observing is a binary search and an increment, cheap enough to be
+        done on every request. Quantiles are estimated as the upper bound
+        of the bucket where they fall.
+    Args:
+        bounds (tuple): upper bounds of the buckets, in seconds.
+    """
+
+    BOUNDS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25,
+              0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+    def __init__(self, bounds=BOUNDS):
+        self.bounds = bounds
+        self.counts = [0]*(len(bounds) + 1)  # the last one is +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        """Adds a duration to the histogram."""
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q):
+        """float: estimate of the q-quantile (0 < q < 1), None if empty."""
+        if self.count == 0:
+            return None
+        rank = q*self.count
+        cumulative = 0
+        for bound, count in zip(self.bounds + (float("inf"),), self.counts):
+            cumulative += count
+            if cumulative >= rank:
+                return bound
+        return float("inf")
+
+    def summary(self):
+        """dict: count, mean and main quantiles of the histogram."""
+        return {
+            "count": self.count,
+            "mean": self.sum/self.count if self.count else None,
+            "p50": self.quantile(0.5),
+            "p90": self.quantile(0.9),
+            "p99": self.quantile(0.99),
+        }
+
+
+class CrawlMetrics(object):
+    """Thread safe instrumentation of a crawl.
+    Note:
+        Holds a histogram per request phase, counters (requests, bytes and
+        errors by type) and gauges (queue depth, requests in flight). Every
+        observation is also forwarded to the hooks, callables receiving the
+        kind of metric, its name and the value, e.g. to ship them to an
+        external system.
+    Attributes:
+        phases (dict): histogram of each request phase.
+        counters (Counter): monotonic counters.
+        errors (Counter): number of errors of each type.
+        gauges (dict): current value of the gauges.
+    """
+
+    PHASES = ("dns", "connect", "ttfb", "download", "parse", "links")
+
+    def __init__(self):
+        self.phases = {phase: Histogram() for phase in self.PHASES}
+        self.counters = collections.Counter()
+        self.errors = collections.Counter()
+        self.gauges = {"queue_depth": 0, "in_flight": 0}
+        self.hooks = []
+        self._lock = threading.Lock()
+
+    def add_hook(self, hook):
+        """Registers a callable called as hook(kind, name, value)."""
+        self.hooks.append(hook)
+
+    def observe(self, phase, seconds):
+        """Records the duration of a request phase."""
+        with self._lock:
+            histogram = self.phases.get(phase)
+            if histogram is None:
+                histogram = self.phases[phase] = Histogram()
+            histogram.observe(seconds)
+        self._notify("histogram", phase, seconds)
+
+    def observe_all(self, timings):
+        """Records the durations of a dict of phases."""
+        for phase, seconds in timings.items():
+            self.observe(phase, seconds)
+
+    def increment(self, name, value=1):
+        """Adds the value to a counter."""
+        with self._lock:
+            self.counters[name] += value
+        self._notify("counter", name, value)
+
+    def error(self, kind):
+        """Counts an error of the given type."""
+        with self._lock:
+            self.errors[kind] += 1
+        self._notify("error", kind, 1)
+
+    def set_gauge(self, name, value):
+        """Sets the current value of a gauge."""
+        with self._lock:
+            self.gauges[name] = value
+        self._notify("gauge", name, value)
+
+    def add_gauge(self, name, delta):
+        """Moves a gauge up or down by 'delta'."""
+        with self._lock:
+            self.gauges[name] = self.gauges.get(name, 0) + delta
+            value = self.gauges[name]
+        self._notify("gauge", name, value)
+
+    def snapshot(self):
+        """dict: consistent copy of every metric."""
+        with self._lock:
+            return {
+                "phases": {phase: histogram.summary()
+                           for phase, histogram in self.phases.items()},
+                "counters": dict(self.counters),
+                "errors": dict(self.errors),
+                "gauges": dict(self.gauges),
+            }
+
+    def prometheus(self, prefix="crawler"):
+        """str: every metric in the Prometheus text exposition format."""
+        lines = []
+        with self._lock:
+            name = prefix + "_phase_seconds"
+            lines.append("# TYPE {} histogram".format(name))
+            for phase, histogram in sorted(self.phases.items()):
+                cumulative = 0
+                bounds = histogram.bounds + (float("inf"),)
+                for bound, count in zip(bounds, histogram.counts):
+                    cumulative += count
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    lines.append('{}_bucket{{phase="{}",le="{}"}} {}'.format(
+                        name, phase, le, cumulative))
+                lines.append('{}_sum{{phase="{}"}} {}'.format(
+                    name, phase, histogram.sum))
+                lines.append('{}_count{{phase="{}"}} {}'.format(
+                    name, phase, histogram.count))
+
+            for counter, value in sorted(self.counters.items()):
+                lines.append("# TYPE {}_{}_total counter".format(prefix, counter))
+                lines.append("{}_{}_total {}".format(prefix, counter, value))
+
+            lines.append("# TYPE {}_errors_total counter".format(prefix))
+            for kind, value in sorted(self.errors.items()):
+                lines.append('{}_errors_total{{type="{}"}} {}'.format(
+                    prefix, kind, value))
+
+            for gauge, value in sorted(self.gauges.items()):
+                lines.append("# TYPE {}_{} gauge".format(prefix, gauge))
+                lines.append("{}_{} {}".format(prefix, gauge, value))
+        return "\n".join(lines) + "\n"
+
+    def serve(self, port=0, host="127.0.0.1"):
+        """HTTPServer: serves 'prometheus' at /metrics on a daemon thread.
+        Note:
+            The port actually used is 'server.server_port'. Call
+            'server.shutdown()' to stop it.
+        """
+        metrics = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path != "/metrics":
+                    self.send_error(404)
+                    return
+                body = metrics.prometheus().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", len(body))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        server = http.server.ThreadingHTTPServer((host, port), Handler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+
+    def _notify(self, kind, name, value):
+        for hook in self.hooks:
+            hook(kind, name, value)
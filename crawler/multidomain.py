@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 17:59:48 2026
+
+@author: Carlos
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import helpers
+import url_store as us
+from crawler import Crawler
+
+
+class MultiDomainCrawler(Crawler):
+    """Crawl of many domains sharing one worker pool, transport and budget.
+    Note:
+        The home page of each domain is queued as a seed, and every page
+        keeps the links of its own domain. The frontier is a HostFrontier:
+        the hosts take turns in a round-robin, weighted by 'weights', at
+        most 'max_per_host' requests of a host are in flight at a time and
+        the hosts the scheduler would make wait are passed over, so a few
+        slow hosts never hold up the others. The robots.txt of the domains
+        is read concurrently before the crawl starts. The 'frontier' and
+        'scorer' arguments are ignored and only the 'run_async' engine is
+        supported, the other arguments are the ones of Crawler. The pages
+        are grouped by domain with 'results_by_domain'.
+    Args:
+        domains (list): the domains that need to be crawled.
+        max_per_host (int): number of requests to a host in flight at once.
+        weights (dict): number of turns per round of some domains, 1 for
+                        the others.
+        robots_workers (int): number of robots.txt read at once.
+    """
+
+    def __init__(self, domains, max_per_host=2, weights=None, robots_workers=16,
+                 **kwargs):
+        self.domains = list(domains)
+        self.seeds = [helpers.safe_url(domain) for domain in self.domains]
+        self.max_per_host = max_per_host
+        self.weights = {helpers.get_domain(domain): weight
+                        for domain, weight in (weights or {}).items()}
+        self.robots_workers = robots_workers
+        super().__init__(self.domains, **kwargs)
+
+    def run(self, n_workers):
+        """Not supported, multi-domain crawls run on 'run_async'."""
+        raise NotImplementedError("Multi-domain crawls only run on run_async")
+
+    def results_by_domain(self):
+        """dict: the target and other pages of each domain, by domain.
+        Note:
+            Each domain maps to a dict with the 'targets' and 'others'
+            lists of its pages, the domains without pages are included.
+        """
+        results = {helpers.get_domain(seed): {"targets": [], "others": []}
+                   for seed in self.seeds}
+        for key, pages in (("targets", self.target_pages),
+                           ("others", self.other_pages)):
+            for url, page in list(pages.items()):
+                results.setdefault(helpers.get_domain(url), {
+                    "targets": [], "others": []})[key].append(page)
+        return results
+
+    def _open_root(self, domain):
+        """None: the home pages are visited by the workers, as seeds."""
+        return None
+
+    def _new_frontier(self, seen):
+        """HostFrontier: a frontier that is fair to the hosts of the crawl."""
+        return us.HostFrontier(
+            seen, self.max_per_host, self.weights, self.scheduler.wait_time)
+
+    def _seed(self):
+        """Queues the home page and the sitemap URLs of each domain."""
+        with ThreadPoolExecutor(max_workers=self.robots_workers) as executor:
+            list(executor.map(self.robots.rules, self.seeds))
+        self._enqueue(self._canonical(dict.fromkeys(self.seeds, "")))
+        for seed in self.seeds:
+            self._seed_sitemaps(seed)
+
+    def _log_start(self):
+        """Logs the parameters of the crawl."""
+        msg = "Initiating crawl...\n" \
+              + "Domains: {}\n".format(len(self.domains)) \
+              + "Request limit: {}\n".format(self.req_limit) \
+              + "Greedy mode: {}\n".format("Yes" if self.greedy else "No")
+        self.logger.debug(msg)
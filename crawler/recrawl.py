@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 17:33:37 2026
+
+@author: Carlos
+"""
+
+import os
+import pickle
+import threading
+import collections
+
+
+CacheEntry = collections.namedtuple(
+    "CacheEntry",
+    ["etag", "last_modified", "title", "target_name", "child_urls", "fields"],
+    defaults=[None])
+
+
+class RecrawlCache(object):
+    """Validators and extracted values of the pages seen by earlier crawls.
+    Note:
+        For each page that answered with an ETag or a Last-Modified header,
+        the cache keeps those validators along with the title, target,
+        fields and child URLs extracted from it. The next crawl sends them back as
+        'If-None-Match' and 'If-Modified-Since', and when the server answers
+        304 Not Modified the page is rebuilt from the entry without
+        downloading or parsing it. The file is rewritten atomically on
+        'save', so a crash never leaves a half written cache.
+    Args:
+        path (str): path of the cache file, loaded if it exists.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._entries = {}
+        self._lock = threading.Lock()
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            with open(path, "rb") as f:
+                self._entries = pickle.load(f)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, url):
+        return url in self._entries
+
+    def get(self, url):
+        """CacheEntry: the entry stored for the url, None if there is none."""
+        return self._entries.get(url)
+
+    def put(self, url, entry):
+        """Stores the entry of the url, replacing the previous one."""
+        with self._lock:
+            self._entries[url] = entry
+
+    def save(self):
+        """Writes the cache to its file."""
+        with self._lock:
+            entries = dict(self._entries)
+        temp_path = self.path + ".tmp"
+        with open(temp_path, "wb") as f:
+            pickle.dump(entries, f, pickle.HIGHEST_PROTOCOL)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.path)
+
+
+def conditional_headers(entry):
+    """dict: request headers revalidating the entry, empty if there is none."""
+    headers = {}
+    if entry is not None:
+        if entry.etag:
+            headers["If-None-Match"] = entry.etag
+        if entry.last_modified:
+            headers["If-Modified-Since"] = entry.last_modified
+    return headers
@@ -0,0 +1,164 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 18:02:39 2026
+
+@author: Carlos
+"""
+
+import time
+import socket
+import functools
+import threading
+import collections
+import urllib.parse
+from concurrent.futures import Future, ThreadPoolExecutor
+
+_PORTS = {"http": 80, "https": 443}
+
+_Entry = collections.namedtuple("_Entry", ["expires", "addresses", "error"])
+
+
+class DnsCache(object):
+    """Cache of the addresses of the hosts, shared by every connection.
+    Note:
+        The system resolver doesn't tell the TTL of its answers, so the
+        addresses found are kept 'ttl' seconds and the failed lookups
+        'negative_ttl' seconds. The threads resolving a host that is
+        already being looked up wait for that lookup instead of starting
+        their own. 'prefetch' resolves a host on a background thread, so
+        the first connection to it finds its addresses ready. A pinned host
+        always resolves to the addresses given, without any lookup, e.g. to
+        point a test domain to a local server. Thread safe.
+    Args:
+        ttl (float): seconds the addresses of a host are kept.
+        negative_ttl (float): seconds a failed lookup is kept.
+        max_entries (int): number of hosts kept, the oldest entries are
+                           dropped beyond it.
+        max_workers (int): number of threads of the prefetching.
+    Attributes:
+        hits (int): number of lookups answered from the cache.
+        misses (int): number of lookups sent to the system resolver.
+    """
+
+    def __init__(self, ttl=300, negative_ttl=10, max_entries=4096,
+                 max_workers=4):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        self.max_workers = max_workers
+        self.hits = 0
+        self.misses = 0
+        self._cache = collections.OrderedDict()  # (host, port) -> _Entry
+        self._pending = {}  # (host, port) -> Future of the lookup
+        self._pinned = {}  # host -> list of ip addresses
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._cache)
+
+    def resolve(self, host, port):
+        """list: addresses of the host, as returned by getaddrinfo.
+        Raises:
+            socket.gaierror: If the host can't be resolved.
+        """
+        if host in self._pinned:
+            return _numeric(self._pinned[host], port)
+        key = (host, port)
+        with self._lock:
+            entry = self._fresh(key)
+            if entry is not None:
+                self.hits += 1
+                if entry.error is not None:
+                    raise socket.gaierror(*entry.error.args)
+                return entry.addresses
+            future = self._pending.get(key)
+            owner = future is None
+            if owner:
+                future = self._pending[key] = Future()
+        if owner:
+            self._lookup(key, future)
+        return future.result()
+
+    def prefetch(self, host, port):
+        """Future: starts resolving the host in the background, its result
+                   is the duration of the lookup. None if the host is
+                   pinned, cached or already being looked up.
+        """
+        if host in self._pinned:
+            return None
+        key = (host, port)
+        with self._lock:
+            if self._fresh(key) is not None or key in self._pending:
+                return None
+            future = self._pending[key] = Future()
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    self.max_workers, thread_name_prefix="dns")
+            return self._executor.submit(self._lookup, key, future)
+
+    def pin(self, host, addresses):
+        """Resolves the host to the ip addresses given from now on."""
+        if isinstance(addresses, str):
+            addresses = [addresses]
+        self._pinned[host] = list(addresses)
+
+    def unpin(self, host):
+        """Resolves the host with the system resolver again."""
+        self._pinned.pop(host, None)
+
+    def clear(self):
+        """Forgets every address found, the pinned hosts are kept."""
+        with self._lock:
+            self._cache.clear()
+
+    def _fresh(self, key):
+        """_Entry: the cached answer for the key, None if missing or stale."""
+        entry = self._cache.get(key)
+        if entry is None or entry.expires <= time.monotonic():
+            return None
+        return entry
+
+    def _lookup(self, key, future):
+        """float: resolves the key, answering the future, returns the
+                  seconds it took.
+        """
+        start = time.perf_counter()
+        addresses, error = None, None
+        try:
+            addresses = socket.getaddrinfo(key[0], key[1], 0, socket.SOCK_STREAM)
+        except OSError as e:
+            error = e
+        elapsed = time.perf_counter() - start
+        ttl = self.ttl if error is None else self.negative_ttl
+        with self._lock:
+            self.misses += 1
+            self._cache.pop(key, None)
+            self._cache[key] = _Entry(time.monotonic() + ttl, addresses, error)
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+            del self._pending[key]
+        if error is None:
+            future.set_result(addresses)
+        else:
+            future.set_exception(error)
+        return elapsed
+
+
+@functools.lru_cache(maxsize=1 << 14)
+def endpoint(url):
+    """tuple: host and port a url connects to, None if it has no host."""
+    parts = urllib.parse.urlsplit(url)
+    if not parts.hostname:
+        return None
+    try:
+        port = parts.port
+    except ValueError:
+        return None
+    return parts.hostname, port or _PORTS.get(parts.scheme, 80)
+
+
+def _numeric(addresses, port):
+    """list: getaddrinfo entries of ip addresses, without any lookup."""
+    return [entry for address in addresses for entry in socket.getaddrinfo(
+        address, port, 0, socket.SOCK_STREAM, 0, socket.AI_NUMERICHOST)]
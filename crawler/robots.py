@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 17:38:54 2026
+
+@author: Carlos
+"""
+
+import threading
+import urllib.error
+import urllib.parse
+import urllib.robotparser
+
+
+class RobotsCache(object):
+    """Rules of the robots.txt of each host, fetched once per host.
+    Note:
+        The robots.txt of a host is requested the first time one of its URLs
+        is checked and kept for the rest of the crawl. Following RFC 9309, a
+        missing file (4xx) allows everything and a server error (5xx)
+        disallows everything. A host that can't be reached is allowed, its
+        pages will fail on their own. The Crawl-delay of each host is handed
+        to the scheduler as soon as the file is read.
+    Args:
+        transport (Transport): client used to request the files.
+        agent (str): user agent matched against the rules.
+        timeout (float): time in seconds before giving up on a file.
+        scheduler (PolitenessScheduler): receives the Crawl-delay of each
+                                         host, if given.
+        reserve (callable): called before each request, e.g. to charge it to
+                            the crawl's budget. When it returns False the
+                            file isn't requested and the host is allowed,
+                            the budget being spent for its pages too.
+        headers (dict): headers of the requests, e.g. the crawler's ones. The
+                        User-Agent is always 'agent'.
+    """
+
+    def __init__(self, transport, agent, timeout=10, scheduler=None,
+                 reserve=None, headers=None):
+        self.transport = transport
+        self.agent = agent
+        self.headers = dict(headers or {}, **{"User-Agent": agent})
+        self.timeout = timeout
+        self.scheduler = scheduler
+        self.reserve = reserve
+        self._rules = {}
+        self._lock = threading.Lock()
+
+    def allowed(self, url):
+        """bool: True if the robots.txt of the url's host allows fetching it."""
+        return self.rules(url).can_fetch(self.agent, url)
+
+    def sitemaps(self, url):
+        """list: sitemap URLs listed in the robots.txt of the url's host."""
+        return self.rules(url).site_maps() or []
+
+    def missing(self, urls):
+        """list: a url of each host of the urls whose robots.txt wasn't read."""
+        missing = {}
+        for url in urls:
+            parts = urllib.parse.urlsplit(url)
+            key = (parts.scheme, parts.netloc)
+            if key not in self._rules:
+                missing.setdefault(key, url)
+        return list(missing.values())
+
+    def rules(self, url):
+        """RobotFileParser: parsed robots.txt of the url's host."""
+        parts = urllib.parse.urlsplit(url)
+        key = (parts.scheme, parts.netloc)
+        rules = self._rules.get(key)
+        if rules is None:
+            with self._lock:
+                rules = self._rules.get(key)
+                if rules is None:
+                    rules = self._rules[key] = self._fetch(*key)
+        return rules
+
+    def _fetch(self, scheme, netloc):
+        """RobotFileParser: downloads and parses the robots.txt of a host."""
+        rules = urllib.robotparser.RobotFileParser(
+            "{}://{}/robots.txt".format(scheme, netloc))
+        if self.reserve is not None and not self.reserve():
+            rules.allow_all = True
+            return rules
+        try:
+            response = self.transport.get(
+                rules.url, headers=self.headers, timeout=self.timeout)
+        except urllib.error.HTTPError as e:
+            rules.disallow_all = e.code >= 500
+            rules.allow_all = not rules.disallow_all
+            return rules
+        except (urllib.error.URLError, OSError):
+            rules.allow_all = True
+            return rules
+
+        rules.parse(response.body.decode("utf-8", "ignore").splitlines())
+        if self.scheduler is not None:
+            self.scheduler.set_crawl_delay(netloc, rules.crawl_delay(self.agent))
+        return rules
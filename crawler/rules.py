@@ -0,0 +1,376 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 17:56:14 2026
+
+@author: Carlos
+"""
+
+import re
+import html.parser
+
+import bs4
+
+import extractor
+
+_VOID = frozenset((
+    "area", "base", "br", "col", "embed", "hr", "img", "input", "link",
+    "meta", "param", "source", "track", "wbr"))
+_COMPOUND = re.compile(r"([a-zA-Z][\w-]*|\*)?((?:[.#][\w-]+|\[[^\]]*\])*)$")
+_STEP = re.compile(r"(?:\[[^\]]*\]|[^\s\[])+")
+_PART = re.compile(
+    r"\.([\w-]+)|#([\w-]+)"
+    r"|\[\s*([\w:-]+)\s*(?:=\s*(\"[^\"]*\"|'[^']*'|[^\]\s]*)\s*)?\]")
+
+
+class Rule(object):
+    """Declarative extraction of a named field of the pages.
+    Note:
+        A rule selects the first element matching a CSS 'selector' and takes
+        its 'attribute', or its text if no attribute is given. The selector
+        supports tags, classes, ids, '[attr]' and '[attr=value]' conditions
+        and the descendant combinator, e.g. 'div.product span[itemprop=sku]'.
+        A 'regex' refines the value, keeping its first group if it has one,
+        and the next matching element is tried when it doesn't match.
+        Without a selector, the regex runs on the raw bytes of the page,
+        e.g. to read json embedded in a script.
+
+        The 'prefilter' are bytes that any page with the field contains: the
+        pages without them aren't searched for the field at all. By default
+        it is the last class, id or attribute value of the selector.
+    Args:
+        name (str): name of the field.
+        selector (str): CSS selector of the element holding the field.
+        attribute (str): attribute holding the value instead of the text.
+        regex (str): pattern the value must match.
+        prefilter (bytes): bytes the page must contain to be searched.
+    Raises:
+        ValueError: If the selector is invalid or neither a selector nor a
+                    regex is given.
+    """
+
+    def __init__(self, name, selector=None, attribute=None, regex=None,
+                 prefilter=None):
+        if selector is None and regex is None:
+            raise ValueError("Rule {} needs a selector or a regex".format(name))
+        self.name = name
+        self.selector = selector
+        self.attribute = attribute
+        self.regex = regex
+        self._compounds = [] if selector is None else _compile_selector(selector)
+        self._pattern = None
+        if regex is not None:
+            self._pattern = re.compile(regex.encode() if selector is None else regex)
+        if prefilter is None and self._compounds:
+            prefilter = self._compounds[-1].literal()
+        if isinstance(prefilter, str):
+            prefilter = prefilter.encode()
+        self.prefilter = prefilter
+
+    def __repr__(self):
+        return "Rule({!r}, selector={!r}, attribute={!r}, regex={!r})".format(
+            self.name, self.selector, self.attribute, self.regex)
+
+    @property
+    def key(self):
+        """tuple: what the selected elements have, see RuleMatcher."""
+        return self._compounds[-1].key()
+
+    def matches(self, tag, attrs, ancestors):
+        """bool: True if the element, inside the ancestors, is selected."""
+        if not self._compounds[-1].matches(tag, attrs):
+            return False
+        remaining = len(self._compounds) - 1
+        for parent_tag, parent_attrs in reversed(ancestors):
+            if remaining == 0:
+                break
+            if self._compounds[remaining - 1].matches(parent_tag, parent_attrs):
+                remaining -= 1
+        return remaining == 0
+
+    def refine(self, value):
+        """str: the value kept from the selected text or attribute, None if
+                the regex doesn't match it.
+        """
+        if self._pattern is None:
+            return value
+        match = self._pattern.search(value)
+        if match is None:
+            return None
+        return match.group(1) if match.groups() else match.group(0)
+
+    def search(self, body):
+        """str: value of a regex rule without selector in the raw body."""
+        value = self.refine(body)
+        return None if value is None else value.decode("utf-8", "replace")
+
+
+class RuleSet(object):
+    """Extraction rules compiled once and evaluated in a single pass.
+    Note:
+        The prefilters of all the rules are checked on the raw body first,
+        and only the rules that may match are evaluated. The selector rules
+        share a single pass over the page: the one of the 'stream' parser
+        (see extractor.extract), a walk of the tree already built by the
+        'soup' parser (see 'extract_tree') or a pass of their own.
+        Picklable, so it can be sent to the parse processes.
+    Args:
+        rules (list): Rule objects, with different names.
+    Raises:
+        ValueError: If two rules have the same name.
+    """
+
+    def __init__(self, rules):
+        self.rules = list(rules)
+        self.names = [rule.name for rule in self.rules]
+        if len(set(self.names)) != len(self.names):
+            raise ValueError("Duplicate rule names: {}".format(self.names))
+
+    def candidates(self, body):
+        """list: the rules whose prefilter is in the body."""
+        return [rule for rule in self.rules
+                if rule.prefilter is None or rule.prefilter in body]
+
+    def matcher(self, body):
+        """RuleMatcher: matcher of the selector rules that may match the
+                        body, None if there is none.
+        """
+        rules = [rule for rule in self.candidates(body) if rule.selector]
+        return RuleMatcher(rules) if rules else None
+
+    def values(self, body, matcher=None):
+        """dict: the value of each field, None if not found, from the
+                 matcher fed with the page and the regex rules.
+        """
+        values = dict.fromkeys(self.names)
+        if matcher is not None:
+            values.update(matcher.values)
+        for rule in self.candidates(body):
+            if rule.selector is None:
+                values[rule.name] = rule.search(body)
+        return values
+
+    def extract(self, body, content_type=None):
+        """dict: the value of each field of a page, parsing it if needed."""
+        matcher = self.matcher(body)
+        if matcher is not None:
+            parser = _RuleParser(matcher)
+            extractor.feed(parser, body, content_type)
+            parser.close()
+        return self.values(body, matcher)
+
+    def extract_tree(self, soup, body):
+        """dict: the value of each field of a page already parsed by bs4.
+        Note:
+            The tree is walked once, in document order, and the walk stops
+            as soon as every field is found.
+        """
+        matcher = self.matcher(body)
+        if matcher is not None:
+            _walk(soup, matcher)
+            matcher.close()
+        return self.values(body, matcher)
+
+
+class RuleMatcher(object):
+    """Matches the selector rules while the tags of a page are read.
+    Note:
+        Driven by a parser through 'start', 'end' and 'data', it keeps the
+        stack of the open elements so the descendant selectors can be
+        checked when an element starts, and collects the text of the
+        selected elements until they end. Each rule stops at its first
+        value. The rules still searched are indexed by a class, id,
+        attribute or tag their elements must have, so an element is only
+        checked against the rules that can select it.
+    Attributes:
+        values (dict): value of each field found so far.
+    """
+
+    def __init__(self, rules):
+        self.values = {}
+        self._pending = {}  # rules still searched, by key
+        self._stack = []  # (tag, attrs) of the open elements
+        self._captures = []  # [rule, depth, text parts] being collected
+        for rule in rules:
+            self._pending.setdefault(rule.key, []).append(rule)
+
+    @property
+    def done(self):
+        """bool: True once every rule has its value."""
+        return not self._pending and not self._captures
+
+    def start(self, tag, attrs):
+        attrs = dict(attrs)
+        if self._pending:
+            for rule in self._candidates(tag, attrs):
+                if rule not in self._pending.get(rule.key, ()):
+                    continue  # found by an earlier candidate
+                if not rule.matches(tag, attrs, self._stack):
+                    continue
+                if rule.attribute is not None:
+                    self._found(rule, attrs.get(rule.attribute))
+                elif tag in _VOID:
+                    self._found(rule, "")
+                else:
+                    self._remove(rule)
+                    self._captures.append([rule, len(self._stack) + 1, []])
+        if tag not in _VOID:
+            self._stack.append((tag, attrs))
+
+    def end(self, tag):
+        for depth in range(len(self._stack) - 1, -1, -1):
+            if self._stack[depth][0] == tag:
+                del self._stack[depth:]
+                break
+        self._close_captures(len(self._stack))
+
+    def data(self, data):
+        for _, _, parts in self._captures:
+            parts.append(data)
+
+    def close(self):
+        """Keeps the text of the elements left open."""
+        self._close_captures(0)
+
+    def _close_captures(self, depth):
+        """Ends the captures of the elements deeper than the depth."""
+        for capture in [c for c in self._captures if c[1] > depth]:
+            self._captures.remove(capture)
+            rule, _, parts = capture
+            self._pending.setdefault(rule.key, []).append(rule)
+            self._found(rule, " ".join("".join(parts).split()))
+
+    def _found(self, rule, value):
+        """Stores the value of the rule, unless the regex rejects it."""
+        value = None if value is None else rule.refine(value)
+        if value is not None:
+            self.values[rule.name] = value
+            self._remove(rule)
+
+    def _candidates(self, tag, attrs):
+        """list: the rules searched that may select the element."""
+        keys = [("tag", tag), ("tag", None)]
+        keys += [("attr", name) for name in attrs]
+        if attrs.get("id"):
+            keys.append(("id", attrs["id"]))
+        keys += [("class", name)
+                 for name in set((attrs.get("class") or "").split())]
+        return [rule for key in keys for rule in self._pending.get(key, ())]
+
+    def _remove(self, rule):
+        """Stops searching the rule."""
+        rules = self._pending[rule.key]
+        rules.remove(rule)
+        if not rules:
+            del self._pending[rule.key]
+
+
+class _RuleParser(html.parser.HTMLParser):
+    """Parser that only feeds a RuleMatcher."""
+
+    def __init__(self, matcher):
+        super().__init__(convert_charrefs=True)
+        self.matcher = matcher
+
+    def handle_starttag(self, tag, attrs):
+        self.matcher.start(tag, attrs)
+
+    def handle_endtag(self, tag):
+        self.matcher.end(tag)
+
+    def handle_data(self, data):
+        self.matcher.data(data)
+
+    def close(self):
+        super().close()
+        self.matcher.close()
+
+
+class _Compound(object):
+    """Conditions of a selector on a single element."""
+
+    def __init__(self, tag, classes, id_, attrs):
+        self.tag = tag
+        self.classes = classes
+        self.id = id_
+        self.attrs = attrs
+
+    def matches(self, tag, attrs):
+        if self.tag is not None and self.tag != tag:
+            return False
+        if self.id is not None and attrs.get("id") != self.id:
+            return False
+        if self.classes and not self.classes.issubset(
+                (attrs.get("class") or "").split()):
+            return False
+        for name, value in self.attrs:
+            if name not in attrs or value is not None and attrs[name] != value:
+                return False
+        return True
+
+    def key(self):
+        """tuple: the most selective condition, a class, id, attribute or
+                  the tag, None for any.
+        """
+        if self.classes:
+            return ("class", min(self.classes))
+        if self.id is not None:
+            return ("id", self.id)
+        if self.attrs:
+            return ("attr", self.attrs[0][0])
+        return ("tag", self.tag)
+
+    def literal(self):
+        """bytes: text any element matching the compound is written with."""
+        values = [value for _, value in self.attrs if value]
+        values += [self.id] if self.id else []
+        values += sorted(self.classes)
+        return values[0].encode() if values else None
+
+
+def _walk(soup, matcher):
+    """Feeds the elements of a bs4 tree to the matcher, in document order."""
+    stack = [(None, iter(soup.children))]
+    while stack and not matcher.done:
+        name, children = stack[-1]
+        child = next(children, None)
+        if child is None:
+            stack.pop()
+            if name is not None:
+                matcher.end(name)
+        elif isinstance(child, bs4.Tag):
+            matcher.start(child.name, [
+                (key, " ".join(value) if isinstance(value, list) else value)
+                for key, value in child.attrs.items()])
+            stack.append((child.name, iter(child.children)))
+        elif isinstance(child, bs4.NavigableString) and not isinstance(
+                child, bs4.element.PreformattedString):
+            matcher.data(str(child))  # text, scripts and styles, no comments
+
+
+def _compile_selector(selector):
+    """list: the _Compound of each step of a descendant selector."""
+    compounds = []
+    for step in _STEP.findall(selector):
+        match = _COMPOUND.match(step)
+        if match is None:
+            raise ValueError("Unsupported selector: {}".format(selector))
+        tag = match.group(1)
+        classes, id_, attrs = set(), None, []
+        for part in _PART.finditer(match.group(2)):
+            class_, ident, name, value = part.groups()
+            if class_:
+                classes.add(class_)
+            elif ident:
+                id_ = ident
+            else:
+                if value and value[0] in "\"'":
+                    value = value[1:-1]
+                attrs.append((name.lower(), value))
+        if "".join(part.group(0) for part in _PART.finditer(match.group(2))) \
+                != match.group(2):
+            raise ValueError("Unsupported selector: {}".format(selector))
+        compounds.append(_Compound(
+            None if tag in (None, "*") else tag.lower(), classes, id_, attrs))
+    if not compounds:
+        raise ValueError("Empty selector")
+    return compounds
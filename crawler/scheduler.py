@@ -0,0 +1,199 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 17:20:23 2026
+
+@author: Carlos
+"""
+
+import time
+import datetime
+import threading
+import collections
+import email.utils
+
+
+class TokenBucket(object):
+    """Token bucket that hands out reservations instead of blocking.
+    Note:
+        Each reservation takes one token, even if the bucket is empty, and
+        returns how long the caller has to wait before using it. This keeps
+        the requests exactly at 'rate' in the long run, allows bursts of up
+        to 'burst' requests, and lets threads and coroutines sleep on their
+        own terms.
+    Attributes:
+        rate (float): tokens added to the bucket per second.
+        burst (int): maximum number of tokens kept in the bucket.
+    """
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.paused_until = 0
+        self._last = time.monotonic()
+
+    def reserve(self):
+        """float: takes a token and returns the seconds to wait for it."""
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self._last)*self.rate)
+        self._last = now
+        self.tokens -= 1
+        delay = 0 if self.tokens >= 0 else -self.tokens/self.rate
+        return max(delay, self.paused_until - now)
+
+    def wait_time(self):
+        """float: seconds a reservation made now would wait, without
+                  taking a token.
+        """
+        now = time.monotonic()
+        tokens = min(self.burst, self.tokens + (now - self._last)*self.rate)
+        delay = 0 if tokens >= 1 else (1 - tokens)/self.rate
+        return max(delay, self.paused_until - now)
+
+
+class PolitenessScheduler(object):
+    """Rate limits the requests made to each host.
+    Note:
+        Every host has its own token bucket. The rate starts at 'rate' and
+        is capped by the Crawl-delay of the host when there is one. When the
+        share of throttling answers (429, 503 or timeouts) among the last
+        'window' requests reaches 'threshold', the rate of the host is cut by
+        'backoff'. The share is only trusted once 'min_samples' answers are
+        known, and a cut is followed by a cooldown of 'window' answers, so a
+        single spike cuts the rate once. Every successful request then
+        raises it back by 'recovery' until it reaches the cap again. A
+        Retry-After header, in seconds or as a date, pauses the host.
+    Args:
+        rate (float): requests per second allowed on each host.
+        burst (int): number of requests that may be sent at once.
+        min_rate (float): lower bound for the rate after backing off.
+        backoff (float): factor applied to the rate when throttled.
+        recovery (float): factor applied to the rate after each success.
+        window (int): number of recent answers considered for throttling.
+        threshold (float): share of throttling answers that cuts the rate.
+        min_samples (int): number of answers needed before a cut.
+    """
+
+    _THROTTLE_CODES = (429, 503)
+
+    def __init__(
+            self, rate=10, burst=5, min_rate=0.1, backoff=0.5,
+            recovery=1.05, window=20, threshold=0.1, min_samples=5):
+        self.rate = rate
+        self.burst = burst
+        self.min_rate = min_rate
+        self.backoff = backoff
+        self.recovery = recovery
+        self.window = window
+        self.threshold = threshold
+        self.min_samples = min_samples
+
+        self._buckets = {}
+        self._max_rates = {}
+        self._answers = {}
+        self._since_cut = {}  # answers of each host since its last cut
+        self._lock = threading.Lock()
+
+    def delay(self, host):
+        """float: reserves a request to the host, returns the time to wait."""
+        with self._lock:
+            return self._bucket(host).reserve()
+
+    def wait(self, host):
+        """Blocks the calling thread until a request to the host is allowed."""
+        delay = self.delay(host)
+        if delay > 0:
+            time.sleep(delay)
+
+    def wait_time(self, host):
+        """float: seconds the next request to the host would have to wait."""
+        with self._lock:
+            return self._bucket(host).wait_time()
+
+    def host_rate(self, host):
+        """float: current number of requests per second allowed on the host."""
+        with self._lock:
+            return self._bucket(host).rate
+
+    def set_crawl_delay(self, host, delay):
+        """Caps the rate of the host to one request every 'delay' seconds."""
+        if not delay:
+            return
+        with self._lock:
+            bucket = self._bucket(host)
+            self._max_rates[host] = min(self.rate, 1/float(delay))
+            bucket.rate = min(bucket.rate, self._max_rates[host])
+            bucket.burst = 1
+            bucket.tokens = min(bucket.tokens, 1)
+
+    def feedback(self, host, status, retry_after=None):
+        """Adapts the rate of the host to the answer of a request.
+        Args:
+            host (str): host that answered.
+            status (int): HTTP status code, or None if the request timed out.
+            retry_after (str): value of the Retry-After header, if any.
+        """
+        throttled = status is None or status in self._THROTTLE_CODES
+        with self._lock:
+            bucket = self._bucket(host)
+            answers = self._answers[host]
+            answers.append(throttled)
+            self._since_cut[host] += 1
+
+            if throttled:
+                if (len(answers) >= self.min_samples
+                        and self._since_cut[host] >= self.window
+                        and sum(answers) >= self.threshold*len(answers)):
+                    bucket.rate = max(self.min_rate, bucket.rate*self.backoff)
+                    self._since_cut[host] = 0  # a single cut per spike
+                pause = _parse_retry_after(retry_after)
+                if pause:
+                    bucket.paused_until = time.monotonic() + pause
+            else:
+                bucket.rate = min(
+                    self._max_rates[host], bucket.rate*self.recovery)
+
+    def __getstate__(self):
+        """Pickles the settings only, e.g. to hand them to another process."""
+        state = self.__dict__.copy()
+        state.update(_buckets={}, _max_rates={}, _answers={}, _since_cut={},
+                     _lock=None)
+        return state
+
+    def __setstate__(self, state):
+        """Restores a pickled scheduler, without any host yet."""
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def _bucket(self, host):
+        """TokenBucket: returns the bucket of the host, creating it if new."""
+        bucket = self._buckets.get(host)
+        if bucket is None:
+            bucket = TokenBucket(self.rate, self.burst)
+            self._buckets[host] = bucket
+            self._max_rates[host] = self.rate
+            self._answers[host] = collections.deque(maxlen=self.window)
+            self._since_cut[host] = self.window
+        return bucket
+
+
+def _parse_retry_after(value):
+    """float: seconds to wait from a Retry-After header, in seconds or an
+              HTTP date, 0 if missing or invalid.
+    """
+    if value is None:
+        return 0.0
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        date = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError, IndexError):
+        return 0.0
+    if date is None:
+        return 0.0
+    if date.tzinfo is None:
+        date = date.replace(tzinfo=datetime.timezone.utc)
+    now = datetime.datetime.now(datetime.timezone.utc)
+    return max(0.0, (date - now).total_seconds())
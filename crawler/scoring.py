@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 17:35:44 2026
+
+@author: Carlos
+"""
+
+import re
+import math
+import collections
+import urllib.parse
+
+
+LinkContext = collections.namedtuple(
+    "LinkContext", ["url", "anchor_text", "depth"])
+
+_TOKEN = re.compile(r"[a-z]+|\d+")
+_MAX_BUCKET = 10  # depths and path lengths above it share a feature
+
+
+def link_features(context):
+    """set: tokens describing a link, the input of the scorers.
+    Note:
+        Words of the url path and of the anchor text, with every number
+        replaced by the same token so '/item/12' and '/item/97' look alike,
+        plus the number of path segments, the presence of a query and the
+        depth of the link from the root page.
+    """
+    parts = urllib.parse.urlsplit(context.url)
+    path = parts.path.lower()
+    features = {"path:" + _word(token) for token in _TOKEN.findall(path)}
+    features.update(
+        "anchor:" + _word(token)
+        for token in _TOKEN.findall((context.anchor_text or "").lower()))
+    segments = len([segment for segment in path.split("/") if segment])
+    features.add("segments:{}".format(min(segments, _MAX_BUCKET)))
+    features.add("depth:{}".format(min(context.depth, _MAX_BUCKET)))
+    if parts.query:
+        features.add("query")
+    return features
+
+
+def _word(token):
+    return "<num>" if token.isdigit() else token
+
+
+class NaiveBayesScorer(object):
+    """Learns online which links are likely to lead to target pages.
+    Note:
+        An incremental naive Bayes model over the 'link_features' of the
+        links already classified. The score is the log-odds of the link
+        leading to a target, so it is 0 for every link before anything has
+        been learned and the frontier keeps its discovery order. Any object
+        with the same 'score' and 'learn' methods can be used instead.
+    Args:
+        smoothing (float): additive smoothing of the feature counts.
+    """
+
+    def __init__(self, smoothing=1.0):
+        self.smoothing = smoothing
+        self.counts = (collections.Counter(), collections.Counter())
+        self.totals = [0, 0]  # links learned of each class
+
+    def score(self, context):
+        """float: log-odds of the link leading to a target page."""
+        others, targets = self.totals
+        alpha = self.smoothing
+        score = math.log((targets + alpha)/(others + alpha))
+        for feature in link_features(context):
+            score += math.log(
+                (self.counts[1][feature] + alpha)/(targets + 2*alpha))
+            score -= math.log(
+                (self.counts[0][feature] + alpha)/(others + 2*alpha))
+        return score
+
+    def learn(self, context, is_target):
+        """Updates the model with the class of a visited link."""
+        label = int(bool(is_target))
+        self.totals[label] += 1
+        self.counts[label].update(link_features(context))
@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 17:25:28 2026
+
+@author: Carlos
+"""
+
+import os
+import csv
+import json
+import threading
+
+import helpers
+
+
+class ResultSink(object):
+    """Writes the results of a crawl to a file while the crawl runs.
+    Note:
+        Rows are kept in a buffer and written in bulk every 'buffer_size'
+        results, so the crawler never blocks on the disk for a single page.
+        The sink is thread safe. Subclasses only define how a batch of rows
+        is serialized.
+    Args:
+        filename (str): path of the output file, overwritten if it exists.
+        buffer_size (int): number of results written at once.
+        append (bool): whether to append to the file instead, e.g. when the
+                       crawl is resumed. The header is only written to a new
+                       or empty file.
+    """
+
+    FIELDS = ("url", "title", "target_name", "is_target", "status",
+              "fetch_time", "fields")
+    extension = ""
+
+    def __init__(self, filename, buffer_size=1000, append=False):
+        self.filename = helpers.add_extension(filename, self.extension)
+        self.buffer_size = buffer_size
+        self.count = 0
+        self._rows = []
+        self._lock = threading.Lock()
+        new_file = not append or not os.path.exists(self.filename) \
+            or os.path.getsize(self.filename) == 0
+        self._file = open(self.filename, "a" if append else "w",
+                          newline="", encoding="utf-8")
+        self._open(new_file)
+
+    def write(self, page, is_target):
+        """Adds the page to the buffer, flushing it when full."""
+        row = (page.url, page.title, page.target_name, is_target,
+               getattr(page, "status", None), getattr(page, "fetch_time", None),
+               getattr(page, "fields", None))
+        with self._lock:
+            self._rows.append(row)
+            self.count += 1
+            if len(self._rows) >= self.buffer_size:
+                self._flush()
+
+    def flush(self):
+        """Writes the buffered results to the file."""
+        with self._lock:
+            self._flush()
+
+    def close(self):
+        """Flushes the buffer and closes the file."""
+        self.flush()
+        self._file.close()
+
+    def _flush(self):
+        if self._rows and not self._file.closed:
+            self._write_rows(self._rows)
+            self._file.flush()
+        self._rows = []
+
+    def _open(self, new_file):
+        """Writes the header of a new file, if the format has one."""
+
+    def _write_rows(self, rows):
+        raise NotImplementedError
+
+
+class CsvSink(ResultSink):
+    """Writes one csv row per page, with a header line. The fields of the
+    extraction rules are written as a json object.
+    """
+
+    extension = ".csv"
+
+    def _open(self, new_file):
+        self._writer = csv.writer(self._file)
+        if new_file:
+            self._writer.writerow(self.FIELDS)
+
+    def _write_rows(self, rows):
+        self._writer.writerows(
+            row[:-1] + (json.dumps(row[-1], ensure_ascii=False)
+                        if row[-1] is not None else "",)
+            for row in rows)
+
+
+class JsonlSink(ResultSink):
+    """Writes one json object per line and page."""
+
+    extension = ".jsonl"
+
+    def _write_rows(self, rows):
+        self._file.write("".join(
+            json.dumps(dict(zip(self.FIELDS, row)), ensure_ascii=False) + "\n"
+            for row in rows))
+
+
+def open_sink(filename, buffer_size=1000, append=False):
+    """ResultSink: sink for the format of the file extension, csv by default."""
+    if filename.endswith(JsonlSink.extension):
+        return JsonlSink(filename, buffer_size, append)
+    return CsvSink(filename, buffer_size, append)
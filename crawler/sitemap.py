@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 17:38:11 2026
+
+@author: Carlos
+"""
+
+import gzip
+import zlib
+import socket
+import urllib.error
+import xml.etree.ElementTree as ET
+
+_GZIP_MAGIC = b"\x1f\x8b"
+
+
+def iter_sitemap(url, transport, timeout=10, headers=None, max_depth=3,
+                 logger=None, reserve=None):
+    """generator: page URLs listed by a sitemap, following sitemap indexes.
+    Note:
+        The sitemap is parsed while it is downloaded, and decompressed on the
+        fly when gzipped ('.xml.gz' files or gzip encoded responses), so only
+        the entry being read is held in memory, whatever the size of the
+        file. Nested sitemaps of an index are read depth first, up to
+        'max_depth' levels. A sitemap that can't be fetched or parsed is
+        skipped.
+    Args:
+        url (str): url of the sitemap or sitemap index.
+        transport (Transport): client used to request the sitemaps.
+        timeout (float): time in seconds before giving up on a request.
+        headers (dict): headers of the requests, e.g. the user agent.
+        max_depth (int): maximum nesting of sitemap indexes.
+        logger (Logger): where the skipped sitemaps are reported.
+        reserve (callable): called before each request, e.g. to charge it to
+                            the crawl's budget. No more sitemaps are read
+                            once it returns False.
+    """
+    if reserve is not None and not reserve():
+        return
+    nested = []
+    try:
+        with transport.open(url, headers=headers, timeout=timeout) as stream:
+            source = stream
+            if stream.peek(2) == _GZIP_MAGIC:
+                source = gzip.GzipFile(fileobj=stream)
+            for is_index, loc in _iter_locs(source):
+                if not is_index:
+                    yield loc
+                elif max_depth > 0:
+                    nested.append(loc)
+    except (urllib.error.URLError, socket.timeout, ET.ParseError,
+            OSError, EOFError, zlib.error) as e:
+        if logger is not None:
+            logger.debug("Skipping sitemap {}: {}".format(url, e))
+
+    for loc in nested:  # fetched after the index stream is released
+        yield from iter_sitemap(
+            loc, transport, timeout, headers, max_depth - 1, logger, reserve)
+
+
+def _iter_locs(source):
+    """generator: (is_index, loc) of each entry of a sitemap file."""
+    root = None
+    for event, element in ET.iterparse(source, events=("start", "end")):
+        if root is None:
+            root = element
+            is_index = _local_name(root.tag) == "sitemapindex"
+        elif event == "end" and _local_name(element.tag) in ("url", "sitemap"):
+            for child in element:
+                if _local_name(child.tag) == "loc" and child.text:
+                    yield is_index, child.text.strip()
+                    break
+            root.clear()  # drops the entries already read
+
+
+def _local_name(tag):
+    """str: tag without its namespace."""
+    return tag.rsplit("}", 1)[-1]
@@ -8,8 +8,6 @@ Created on Sun May 20 15:04:56 2018
 import queue
 import threading
 
-import helpers
-
 
 class Task(threading.Thread):
     """Custom thread object to handle tasks executed iteratively over a queue.
@@ -42,7 +40,8 @@ class ThreadingManager(object):
     Note:
         The manager  takes a processor object  that needs to perform calls on a
         list  and wait for  responses. This work is  splitted between a certain
-        number of threads using a queue.
+        number of threads using a queue. The actual distributed crawl lives
+        in the 'distributed' module.
     Attributes:
         processor (object): processor object that performs the requests.
         n_workers (int): number of threads to work on the downlodas.
@@ -55,7 +54,6 @@ class ThreadingManager(object):
 
         # Queue variables
         self.queue = queue.Queue()
-        self.thread_count = threading.active_count()
 
     def manage(self, elements, process_name):
         """Manage the processing, splitting the task between the workres.
@@ -64,8 +62,10 @@ class ThreadingManager(object):
             process_name (str): name of the task to be paralelized.
         """
         process = getattr(self.processor, process_name)
-        n_bundles = int(len(elements)/self.n_workers)
-        bundles = list(helpers.chunks(elements, n_bundles))
+        # strided bundles, so the first elements are processed first by
+        # every worker when the list is sorted by priority
+        bundles = [elements[i::self.n_workers] for i in range(self.n_workers)]
+        bundles = [bundle for bundle in bundles if bundle]
 
         for bundle in bundles:
             self.queue.put(bundle)
@@ -73,8 +73,8 @@ class ThreadingManager(object):
             worker.start()
             self.workers.append(worker)
 
-        while threading.active_count() > self.thread_count:
-            pass
+        for worker in self.workers:
+            worker.join()  # blocks without spinning on the thread count
 
     def stop_all_workers(self):
         """Commands all workers to interrupt their processes."""
@@ -0,0 +1,501 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 17:19:31 2026
+
+@author: Carlos
+"""
+
+import time
+import zlib
+import queue
+import base64
+import socket
+import threading
+import http.client
+import urllib.error
+import urllib.parse
+import urllib.request
+
+import resolver as rs
+
+
+class Response(object):
+    """Holds the outcome of a request made through the transport.
+    Attributes:
+        url (str): final url of the response, after following redirects.
+        status (int): HTTP status code.
+        headers (HTTPMessage): response headers.
+        body (bytes): decompressed response body.
+        elapsed (float): seconds taken by the request, redirects included.
+        timings (dict): seconds spent on each phase of the request: 'dns' and
+                        'connect' (only for new connections, TLS included),
+                        'ttfb' (until the headers arrive) and 'download'.
+        wire_bytes (int): size of the body as received, before decompression.
+        truncated (bool): True if the body was cut at the size limit.
+    """
+
+    def __init__(self, url, status, headers, body, elapsed=None,
+                 timings=None, wire_bytes=None, truncated=False):
+        self.url = url
+        self.status = status
+        self.headers = headers
+        self.body = body
+        self.elapsed = elapsed
+        self.timings = timings or {}
+        self.wire_bytes = len(body) if wire_bytes is None else wire_bytes
+        self.truncated = truncated
+
+
+class SkippedContent(Exception):
+    """Raised when a response is refused before its body is downloaded.
+    Attributes:
+        url (str): final url of the response.
+        reason (str): why the response was refused, e.g. 'content_type'.
+    """
+
+    def __init__(self, url, reason):
+        super().__init__(url, reason)
+        self.url = url
+        self.reason = reason
+
+    def __str__(self):
+        return "Skipped {}: {}".format(self.url, self.reason)
+
+
+class BodyStream(object):
+    """File-like body of a response, read and decompressed on demand.
+    Note:
+        Returned by 'Transport.open' for bodies too large to be held in
+        memory at once. Only a chunk of the body is buffered at a time. The
+        connection goes back to the pool when the body is read to the end,
+        or is closed if the stream is closed before that. Usable as a
+        context manager.
+    Attributes:
+        url (str): final url of the response, after following redirects.
+        status (int): HTTP status code.
+        headers (HTTPMessage): response headers.
+    """
+
+    def __init__(self, transport, key, connection, response, url):
+        self.url = url
+        self.status = response.status
+        self.headers = response.headers
+        self._transport = transport
+        self._key = key
+        self._connection = connection
+        self._response = response
+        self._decoder = _decoder(response)
+        self._buffer = bytearray()
+        self._eof = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def read(self, size=-1):
+        """bytes: up to 'size' decompressed bytes, all the rest if negative."""
+        while not self._eof and (size < 0 or len(self._buffer) < size):
+            self._fill()
+        if size < 0:
+            size = len(self._buffer)
+        data = bytes(self._buffer[:size])
+        del self._buffer[:size]
+        return data
+
+    def peek(self, size):
+        """bytes: the next 'size' bytes, without consuming them."""
+        while not self._eof and len(self._buffer) < size:
+            self._fill()
+        return bytes(self._buffer[:size])
+
+    def close(self):
+        """Releases the connection, closing it if the body wasn't read."""
+        if self._connection is None:
+            return
+        if self._eof:
+            self._transport._finish(self._key, self._connection, self._response)
+        else:
+            self._connection.close()
+        self._connection = None
+
+    def _fill(self):
+        """Reads the next chunk from the socket into the buffer."""
+        try:
+            chunk = self._response.read(self._transport.chunk_size)
+            if not chunk:
+                self._eof = True
+                if self._decoder is not None:
+                    self._buffer += self._decoder.flush()
+            elif self._decoder is None:
+                self._buffer += chunk
+            else:
+                self._buffer += self._decoder.decompress(chunk)
+        except socket.timeout:
+            self.close()
+            raise
+        except (OSError, http.client.HTTPException, zlib.error) as e:
+            self._eof = False
+            self.close()
+            raise urllib.error.URLError(e)
+
+
+class Transport(object):
+    """HTTP client that keeps persistent connections to each host.
+    Note:
+        Idle connections are kept in a pool per (scheme, host) and reused by
+        the next request to the same host, so the TCP and TLS handshakes are
+        paid once per connection instead of once per page. Responses are
+        requested with gzip/deflate and decompressed while being read. The
+        transport is thread safe, each thread borrows its own connection.
+        The hosts of the new connections are resolved through a DnsCache.
+        Requests go through the proxy of their scheme unless their host is
+        listed under 'no': http ones are sent to the proxy with the absolute
+        url, https ones through a CONNECT tunnel, and the proxy credentials,
+        if any, are sent as Proxy-Authorization. The connections through a
+        proxy are pooled apart from the direct ones.
+    Args:
+        max_idle (int): maximum number of idle connections kept per host.
+        max_redirects (int): maximum number of redirects followed.
+        chunk_size (int): number of bytes read from the socket at a time.
+        resolver (DnsCache): cache of the addresses of the hosts, a new
+                             resolver.DnsCache by default.
+        proxies (dict): proxy url of each scheme, and the hosts reached
+                        directly under 'no', as returned by
+                        urllib.request.getproxies(), which reads the
+                        http_proxy, https_proxy and no_proxy environment
+                        variables and is the default. {} never uses a proxy.
+    Raises:
+        HTTPError: If the final response has an error status (>= 400).
+        URLError: If the host cannot be reached.
+        SkippedContent: If 'get' refuses the response from its headers.
+        socket.timeout: If the server takes too long to answer.
+    """
+
+    _ENCODINGS = "gzip, deflate"
+    _REDIRECTS = (301, 302, 303, 307, 308)
+
+    def __init__(self, max_idle=16, max_redirects=5, chunk_size=65536,
+                 resolver=None, proxies=None):
+        self.max_idle = max_idle
+        self.max_redirects = max_redirects
+        self.chunk_size = chunk_size
+        self.resolver = rs.DnsCache() if resolver is None else resolver
+        self.proxies = urllib.request.getproxies() if proxies is None else proxies
+        self._pools = {}
+        self._lock = threading.Lock()
+
+    def get(self, url, headers=None, timeout=None, accept=None,
+            max_bytes=None):
+        """Response: performs a GET request, following redirects.
+        Note:
+            'accept' is called with the headers of a successful (2xx) final
+            response before its body is read, and returns why the response
+            is refused, or None. A refused body isn't downloaded: the
+            connection is closed, unless the body is small enough to be
+            drained. Bodies longer than 'max_bytes' once decompressed are
+            cut there, see Response.truncated, and their connection closed.
+        """
+        start = time.perf_counter()
+        timings = {}
+        headers = dict(headers or {})
+        headers.setdefault("Accept-Encoding", self._ENCODINGS)
+        for _ in range(self.max_redirects + 1):
+            key, connection, response = self._send(url, headers, timeout, timings)
+            location = response.headers.get("Location")
+            if response.status not in self._REDIRECTS or not location:
+                break
+            self._discard(key, connection, response)
+            url = urllib.parse.urljoin(url, location)
+
+        if response.status >= 400:
+            self._discard(key, connection, response)
+            raise urllib.error.HTTPError(
+                url, response.status, response.reason, response.headers, None)
+        if accept is not None and response.status < 300:
+            reason = accept(response.headers)
+            if reason is not None:
+                self._abort(key, connection, response)
+                raise SkippedContent(url, reason)
+        body, wire_bytes, truncated = self._read(
+            key, connection, response, timings, max_bytes)
+        return Response(
+            url, response.status, response.headers, body,
+            time.perf_counter() - start, timings, wire_bytes, truncated)
+
+    def open(self, url, headers=None, timeout=None):
+        """BodyStream: performs a GET request, following redirects, without
+                       reading the body, which is streamed instead.
+        """
+        headers = dict(headers or {})
+        headers.setdefault("Accept-Encoding", self._ENCODINGS)
+        for _ in range(self.max_redirects + 1):
+            key, connection, response = self._send(url, headers, timeout, {})
+            location = response.headers.get("Location")
+            if response.status not in self._REDIRECTS or not location:
+                break
+            self._discard(key, connection, response)
+            url = urllib.parse.urljoin(url, location)
+
+        if response.status >= 400:
+            self._discard(key, connection, response)
+            raise urllib.error.HTTPError(
+                url, response.status, response.reason, response.headers, None)
+        return BodyStream(self, key, connection, response, url)
+
+    def close(self):
+        """Closes every idle connection kept by the transport."""
+        with self._lock:
+            pools, self._pools = self._pools, {}
+        for pool in pools.values():
+            while not pool.empty():
+                pool.get_nowait().close()
+
+    def _read(self, key, connection, response, timings, max_bytes=None):
+        """tuple: reads the body of a response sent by '_send', its wire size
+                  and whether it was truncated.
+        Note:
+            The download time is added to 'timings'. The connection goes
+            back to the pool, or is closed if the body was truncated.
+        """
+        start = time.perf_counter()
+        try:
+            body, wire_bytes, truncated = self._read_body(response, max_bytes)
+        except socket.timeout:
+            connection.close()
+            raise
+        except (OSError, http.client.HTTPException, zlib.error) as e:
+            connection.close()  # the rest of the body can't be trusted
+            raise urllib.error.URLError(e)
+        _add_time(timings, "download", time.perf_counter() - start)
+        if truncated:
+            connection.close()
+        else:
+            self._finish(key, connection, response)
+        return body, wire_bytes, truncated
+
+    def _send(self, url, headers, timeout, timings):
+        """tuple: the pool key, the connection and the response, whose
+                  headers have been read but not the body.
+        Note:
+            A pooled connection may have been closed by the server while
+            idle, in which case the request is retried once on a new one.
+        """
+        parts = urllib.parse.urlsplit(url)
+        if parts.scheme not in ("http", "https") or not parts.hostname:
+            raise urllib.error.URLError("unknown url: {}".format(url))
+        target = parts.path or "/"
+        if parts.query:
+            target += "?" + parts.query
+        proxy = self._proxy(parts)
+        if proxy is not None and parts.scheme == "http":
+            target = "http://{}{}".format(parts.netloc, target)
+            authorization = _parse_proxy(proxy)[2]
+            if authorization is not None:
+                headers = dict(headers, **{"Proxy-Authorization": authorization})
+        key = (parts.scheme, parts.netloc, proxy)
+
+        for attempt in range(2):
+            connection, reused = self._acquire(key, timeout)
+            try:
+                if not reused:
+                    self._connect(connection, timings)
+                start = time.perf_counter()
+                connection.request("GET", target, headers=headers)
+                response = connection.getresponse()
+                _add_time(timings, "ttfb", time.perf_counter() - start)
+                return key, connection, response
+            except socket.timeout:
+                connection.close()
+                raise
+            except (http.client.RemoteDisconnected, ConnectionResetError,
+                    BrokenPipeError) as e:
+                connection.close()
+                if reused and attempt == 0:
+                    continue
+                raise urllib.error.URLError(e)
+            except (OSError, http.client.HTTPException) as e:
+                connection.close()
+                raise urllib.error.URLError(e)
+
+    def _proxy(self, parts):
+        """str: url of the proxy of the split url, None to go direct."""
+        proxy = self.proxies.get(parts.scheme)
+        if not proxy or urllib.request.proxy_bypass_environment(
+                parts.hostname, self.proxies):
+            return None
+        return proxy
+
+    def _finish(self, key, connection, response):
+        """Pools the connection once its response has been read."""
+        if response.will_close:
+            connection.close()
+        else:
+            self._release(key, connection)
+
+    def _abort(self, key, connection, response):
+        """Drops a refused body, only reading it if it fits in a chunk."""
+        length = response.getheader("Content-Length", "")
+        if length.isdigit() and int(length) <= self.chunk_size:
+            self._discard(key, connection, response)
+        else:
+            connection.close()
+
+    def _discard(self, key, connection, response):
+        """Reads and drops a body so the connection can be reused."""
+        try:
+            response.read()
+        except (OSError, http.client.HTTPException):
+            connection.close()
+            return
+        self._finish(key, connection, response)
+
+    def _connect(self, connection, timings):
+        """Opens a new connection, timing the DNS lookup and the handshakes."""
+        dns = []
+
+        def create_connection(address, timeout=None, source_address=None):
+            start = time.perf_counter()
+            addresses = self._resolve(*address)
+            dns.append(time.perf_counter() - start)
+            return _open_socket(addresses, timeout, source_address)
+
+        connection._create_connection = create_connection
+        start = time.perf_counter()
+        connection.connect()
+        _add_time(timings, "dns", sum(dns))
+        _add_time(timings, "connect", time.perf_counter() - start - sum(dns))
+
+    def _resolve(self, host, port):
+        """list: addresses of the host, as returned by getaddrinfo."""
+        return self.resolver.resolve(host, port)
+
+    def _read_body(self, response, max_bytes=None):
+        """tuple: the body, decompressed as it arrives, its wire size and
+                  whether it was cut at 'max_bytes'.
+        Note:
+            Never decompresses more than 'max_bytes' + 1 bytes, so a small
+            compressed body can't blow up in memory.
+        """
+        encoding = response.getheader("Content-Encoding", "").lower()
+        decoder = _decoder(response)
+        limit = -1 if max_bytes is None else max_bytes + 1
+
+        chunks = []
+        size = 0
+        wire_bytes = 0
+        chunk = response.read(self.chunk_size)
+        while chunk:
+            wire_bytes += len(chunk)
+            if decoder is None:
+                data = chunk
+            else:
+                try:
+                    data = decoder.decompress(chunk, max(0, limit - size))
+                except zlib.error:
+                    if encoding != "deflate" or chunks:
+                        raise
+                    decoder = zlib.decompressobj(-zlib.MAX_WBITS)  # raw
+                    data = decoder.decompress(chunk, max(0, limit - size))
+            chunks.append(data)
+            size += len(data)
+            if max_bytes is not None and size > max_bytes:
+                return b"".join(chunks)[:max_bytes], wire_bytes, True
+            chunk = response.read(self.chunk_size)
+        if decoder is not None:
+            chunks.append(decoder.flush())
+        body = b"".join(chunks)
+        if max_bytes is not None and len(body) > max_bytes:
+            return body[:max_bytes], wire_bytes, True
+        return body, wire_bytes, False
+
+    def _acquire(self, key, timeout):
+        """tuple: returns an idle connection to the host or a new one."""
+        with self._lock:
+            pool = self._pools.setdefault(key, queue.LifoQueue())
+        try:
+            connection = pool.get_nowait()
+            connection.timeout = timeout
+            if connection.sock is not None:
+                connection.sock.settimeout(timeout)
+            return connection, True
+        except queue.Empty:
+            scheme, netloc, proxy = key
+            address = netloc
+            if proxy is not None:
+                host, port, authorization = _parse_proxy(proxy)
+                address = "{}:{}".format(host, port)
+            if scheme == "https":
+                connection = http.client.HTTPSConnection(address, timeout=timeout)
+            else:
+                connection = http.client.HTTPConnection(address, timeout=timeout)
+            if proxy is not None and scheme == "https":
+                connection.set_tunnel(netloc, headers=(
+                    {} if authorization is None
+                    else {"Proxy-Authorization": authorization}))
+            return connection, False
+
+    def _release(self, key, connection):
+        """Returns the connection to the pool of idle connections."""
+        pool = self._pools.get(key)
+        if pool is None or pool.qsize() >= self.max_idle:
+            connection.close()
+        else:
+            pool.put(connection)
+
+
+def _decoder(response):
+    """zlib.Decompress: decompressor of the response body, None if plain."""
+    encoding = response.getheader("Content-Encoding", "").lower()
+    if encoding in ("gzip", "x-gzip", "deflate"):
+        return zlib.decompressobj(zlib.MAX_WBITS | 32)  # auto header
+    return None
+
+
+def _parse_proxy(proxy):
+    """tuple: host and port of the proxy url and the value of the
+              Proxy-Authorization header of its credentials, None without.
+    """
+    if "://" not in proxy:
+        proxy = "http://" + proxy
+    parts = urllib.parse.urlsplit(proxy)
+    authorization = None
+    if parts.username is not None:
+        credentials = "{}:{}".format(
+            urllib.parse.unquote(parts.username),
+            urllib.parse.unquote(parts.password or ""))
+        authorization = "Basic " + base64.b64encode(
+            credentials.encode("utf-8")).decode("ascii")
+    return parts.hostname, parts.port or 80, authorization
+
+
+def _open_socket(addresses, timeout, source_address):
+    """socket: connects to the first address that accepts the connection."""
+    error = OSError("getaddrinfo returned an empty list")
+    for family, socktype, proto, _, address in addresses:
+        sock = socket.socket(family, socktype, proto)
+        try:
+            if timeout is not socket._GLOBAL_DEFAULT_TIMEOUT:
+                sock.settimeout(timeout)
+            if source_address:
+                sock.bind(source_address)
+            sock.connect(address)
+            return sock
+        except OSError as e:
+            error = e
+            sock.close()
+    raise error
+
+
+def _add_time(timings, phase, seconds):
+    """Adds the seconds to the phase, requests may go through it many times."""
+    timings[phase] = timings.get(phase, 0) + seconds
+
+
+_default_transport = Transport()
+
+
+def get_default_transport():
+    """Transport: the transport shared by default by every page and crawler."""
+    return _default_transport
@@ -0,0 +1,507 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 17:22:39 2026
+
+@author: Carlos
+"""
+
+import math
+import heapq
+import array
+import hashlib
+import itertools
+import collections
+
+import helpers
+import scoring
+
+
+class HashedUrlSet(object):
+    """Exact set of URLs that only stores a 64 bit fingerprint of each one.
+    Note:
+        The fingerprints live in an open addressing table backed by a flat
+        array of unsigned 64 bit integers, so the memory used is 8 bytes per
+        slot, between 11 and 23 bytes per URL, no matter how long the URLs
+        are. Two different URLs collide with probability ~n/2**64.
+    Args:
+        capacity (int): number of URLs expected, the table grows past it.
+        max_load (float): share of used slots that triggers a resize.
+    """
+
+    _EMPTY = 0
+    _DELETED = 1
+
+    def __init__(self, capacity=1024, max_load=0.7):
+        self.max_load = max_load
+        self._allocate(int(capacity/max_load) + 1)
+
+    def __len__(self):
+        return self._len
+
+    def __contains__(self, url):
+        return self._find(_fingerprint(url)) >= 0
+
+    @property
+    def nbytes(self):
+        """int: memory used by the table, in bytes."""
+        return self._slots.itemsize*len(self._slots)
+
+    def add(self, url):
+        """bool: adds the url to the set, returns False if already there."""
+        fingerprint = _fingerprint(url)
+        index = fingerprint & self._mask
+        free = -1
+        while True:
+            slot = self._slots[index]
+            if slot == fingerprint:
+                return False
+            if slot == self._DELETED and free < 0:
+                free = index
+            elif slot == self._EMPTY:
+                break
+            index = (index + 1) & self._mask
+
+        if free < 0:
+            free = index
+            self._used += 1
+        self._slots[free] = fingerprint
+        self._len += 1
+        if self._used > self.max_load*len(self._slots):
+            self._resize()
+        return True
+
+    def discard(self, url):
+        """Removes the url from the set if present."""
+        index = self._find(_fingerprint(url))
+        if index >= 0:
+            self._slots[index] = self._DELETED
+            self._len -= 1
+
+    def _find(self, fingerprint):
+        """int: index of the slot holding the fingerprint, -1 if missing."""
+        index = fingerprint & self._mask
+        while True:
+            slot = self._slots[index]
+            if slot == fingerprint:
+                return index
+            if slot == self._EMPTY:
+                return -1
+            index = (index + 1) & self._mask
+
+    def _allocate(self, size):
+        """Creates an empty table with a power of two number of slots."""
+        size = 1 << max(3, (size - 1).bit_length())
+        self._slots = array.array("Q", bytes(8*size))
+        self._mask = size - 1
+        self._used = 0  # filled slots, including the deleted ones
+        self._len = 0
+
+    def _resize(self):
+        """Doubles the table when there are few live entries to drop."""
+        old = self._slots
+        grow = 2 if self._len > self.max_load*len(old)/2 else 1
+        self._allocate(len(old)*grow)
+        for slot in old:
+            if slot > self._DELETED:
+                index = slot & self._mask
+                while self._slots[index] != self._EMPTY:
+                    index = (index + 1) & self._mask
+                self._slots[index] = slot
+                self._used += 1
+                self._len += 1
+
+
+class BloomUrlSet(object):
+    """Approximate set of URLs with a bounded false positive rate.
+    Note:
+        Implemented as a scalable Bloom filter: when a filter is full, a
+        new one with twice the capacity and half the error rate is added,
+        so the overall false positive rate stays below 'error_rate' however
+        many URLs are added. Memory is ~1.44*log2(1/error_rate) bits per URL
+        (~2.4 bytes for 1e-4). URLs can't be removed. A false positive means
+        a new URL is taken as already seen and is never crawled.
+    Args:
+        capacity (int): number of URLs held by the first filter.
+        error_rate (float): upper bound on the false positive rate.
+    """
+
+    def __init__(self, capacity=1 << 16, error_rate=1e-4):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self._filters = []
+        self._len = 0
+        self._add_filter()
+
+    def __len__(self):
+        return self._len
+
+    def __contains__(self, url):
+        hashes = _double_hash(url)
+        return any(bloom.contains(hashes) for bloom in self._filters)
+
+    @property
+    def nbytes(self):
+        """int: memory used by the bit arrays, in bytes."""
+        return sum(len(bloom.bits) for bloom in self._filters)
+
+    def add(self, url):
+        """bool: adds the url to the set, returns False if already there."""
+        hashes = _double_hash(url)
+        if any(bloom.contains(hashes) for bloom in self._filters):
+            return False
+        bloom = self._filters[-1]
+        bloom.add(hashes)
+        self._len += 1
+        if bloom.count >= bloom.capacity:
+            self._add_filter()
+        return True
+
+    def _add_filter(self):
+        """Appends a bigger and stricter filter to the chain."""
+        n = len(self._filters)
+        self._filters.append(_BloomFilter(
+            self.capacity << n, self.error_rate/2**(n + 1)))
+
+
+class _BloomFilter(object):
+    """Fixed size Bloom filter, sized for a capacity and error rate."""
+
+    def __init__(self, capacity, error_rate):
+        n_bits = math.ceil(-capacity*math.log(error_rate)/math.log(2)**2)
+        self.capacity = capacity
+        self.count = 0
+        self.n_bits = n_bits
+        self.n_hashes = max(1, round(n_bits/capacity*math.log(2)))
+        self.bits = bytearray(n_bits//8 + 1)
+
+    def _positions(self, hashes):
+        h1, h2 = hashes
+        for i in range(self.n_hashes):
+            yield (h1 + i*h2) % self.n_bits
+
+    def contains(self, hashes):
+        bits = self.bits
+        return all(bits[p >> 3] & (1 << (p & 7)) for p in self._positions(hashes))
+
+    def add(self, hashes):
+        for p in self._positions(hashes):
+            self.bits[p >> 3] |= 1 << (p & 7)
+        self.count += 1
+
+
+class Frontier(object):
+    """FIFO queue of URLs to visit that accepts each URL only once.
+    Note:
+        Every URL pushed is recorded in 'seen', which can be any of the URL
+        sets of this module (or a plain set), so the dedup memory is chosen
+        independently of the queue. Only the pending URLs are kept as full
+        strings.
+    Args:
+        seen (set): set of URLs ever pushed, a new set by default.
+    """
+
+    def __init__(self, seen=None):
+        self.seen = set() if seen is None else seen
+        self._queue = collections.deque()
+
+    def __len__(self):
+        return len(self._queue)
+
+    def __iter__(self):
+        return iter(self._queue)
+
+    def push(self, url, anchor_text="", parent=None):
+        """bool: queues the url, returns False if it was seen before.
+        Note:
+            The anchor text and the parent url describe the link, they are
+            only used by the PriorityFrontier.
+        """
+        if url in self.seen:
+            return False
+        self.seen.add(url)
+        self._queue.append(url)
+        return True
+
+    def extend(self, urls):
+        """int: queues the URLs never seen before, returns how many."""
+        return sum(self.push(url) for url in urls)
+
+    def requeue(self, url):
+        """Queues the url again, even if it was seen before."""
+        self.seen.add(url)
+        self._queue.append(url)
+
+    def ready(self):
+        """bool: True if a url can be popped now."""
+        return len(self) > 0
+
+    def pop(self):
+        """str: removes and returns the next url to visit."""
+        return self._queue.popleft()
+
+    def learn(self, url, is_target=None):
+        """Reports the outcome of a popped url, ignored by the FIFO order."""
+
+
+class PriorityFrontier(Frontier):
+    """Frontier that pops first the URLs most likely to be targets.
+    Note:
+        Each URL is queued with the context of the link that led to it
+        (anchor text and depth) and scored by the scorer. Ties, and every
+        URL while the scorer knows nothing, keep the discovery order. The
+        crawler reports the class of each visited page with 'learn', which
+        trains the scorer, and the queued URLs are rescored every
+        'rescore_every' lessons so they benefit from what was learned.
+        The contexts are kept while the URLs are queued or being visited.
+    Args:
+        scorer (object): has a 'score(context)' method returning a float,
+                         higher first, and a 'learn(context, is_target)'
+                         one, see 'scoring.NaiveBayesScorer'.
+        seen (set): set of URLs ever pushed, a new set by default.
+        rescore_every (int): number of lessons between two rescorings.
+    """
+
+    def __init__(self, scorer, seen=None, rescore_every=1000):
+        super().__init__(seen)
+        self.scorer = scorer
+        self.rescore_every = rescore_every
+        self._heap = []
+        self._order = itertools.count()
+        self._popped = {}  # contexts of the URLs being visited
+        self._lessons = 0
+
+    def __len__(self):
+        return len(self._heap)
+
+    def __iter__(self):
+        return (context.url for _, _, context in sorted(self._heap))
+
+    def push(self, url, anchor_text="", parent=None):
+        """bool: queues the url, returns False if it was seen before."""
+        if url in self.seen:
+            return False
+        self.seen.add(url)
+        origin = self._popped.get(parent)
+        depth = 1 if origin is None else origin.depth + 1
+        self._queue_context(scoring.LinkContext(url, anchor_text or "", depth))
+        return True
+
+    def requeue(self, url):
+        """Queues the url again, even if it was seen before."""
+        self.seen.add(url)
+        context = self._popped.pop(url, None)
+        self._queue_context(context or scoring.LinkContext(url, "", 1))
+
+    def pop(self):
+        """str: removes and returns the url with the highest score."""
+        _, _, context = heapq.heappop(self._heap)
+        self._popped[context.url] = context
+        return context.url
+
+    def learn(self, url, is_target=None):
+        """Trains the scorer with the class of a popped url.
+        Note:
+            'is_target' is None when the visit failed, the url is then only
+            forgotten.
+        """
+        context = self._popped.pop(url, None)
+        if context is None or is_target is None:
+            return
+        self.scorer.learn(context, is_target)
+        self._lessons += 1
+        if self._lessons % self.rescore_every == 0:
+            self.rescore()
+
+    def rescore(self):
+        """Scores again every queued url with the current scorer."""
+        self._heap = [(-self.scorer.score(context), order, context)
+                      for _, order, context in self._heap]
+        heapq.heapify(self._heap)
+
+    def _queue_context(self, context):
+        heapq.heappush(self._heap, (
+            -self.scorer.score(context), next(self._order), context))
+
+
+class HostFrontier(Frontier):
+    """Frontier with a queue per host, visited in a weighted round-robin.
+    Note:
+        The hosts take turns: each one hands out up to its weight of URLs
+        (1 by default) before the next host's turn, so a huge domain can't
+        starve the small ones. At most 'max_per_host' URLs of a host are
+        popped at a time, until their outcome is reported with 'learn' or
+        they are requeued, and a host at its cap is skipped. When a
+        'wait_time' is given, the hosts whose next request would have to
+        wait are skipped too, so a slow or rate limited host only holds its
+        own slots, and only once no host is ready is the one ready soonest
+        popped. 'ready' is False while every host with queued URLs is at
+        its cap.
+    Args:
+        seen (set): set of URLs ever pushed, a new set by default.
+        max_per_host (int): number of URLs of a host popped at a time.
+        weights (dict): number of turns of some hosts per round.
+        wait_time (function): seconds before the next request to a host can
+                              be sent, e.g. PolitenessScheduler.wait_time.
+    """
+
+    def __init__(self, seen=None, max_per_host=2, weights=None,
+                 wait_time=None):
+        super().__init__(seen)
+        self.max_per_host = max_per_host
+        self.weights = dict(weights or {})
+        self.wait_time = wait_time
+        self._queues = {}  # queued URLs by host
+        self._ring = collections.deque()  # hosts with queued URLs, in turn
+        self._credits = {}  # URLs left in the turn of the hosts
+        self._popped = {}  # host of the URLs being visited
+        self._busy = collections.Counter()  # URLs being visited by host
+        self._open = 0  # hosts with queued URLs below their cap
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def __iter__(self):
+        return (url for queue in self._queues.values() for url in queue)
+
+    def push(self, url, anchor_text="", parent=None):
+        """bool: queues the url, returns False if it was seen before."""
+        if url in self.seen:
+            return False
+        self.seen.add(url)
+        self._append(url)
+        return True
+
+    def requeue(self, url):
+        """Queues the url again, even if it was seen before."""
+        self.seen.add(url)
+        self._release(url)
+        self._append(url)
+
+    def ready(self):
+        """bool: True if a host with queued URLs is below its cap."""
+        return self._open > 0
+
+    def pop(self):
+        """str: removes and returns the next url of the host whose turn it is.
+        Raises:
+            IndexError: If every host with queued URLs is at its cap.
+        """
+        soonest = None
+        for host in self._ring:
+            if self._busy[host] >= self.max_per_host:
+                continue
+            if self.wait_time is None:
+                return self._take(host)
+            wait = self.wait_time(host)
+            if wait <= 0:
+                return self._take(host)
+            if soonest is None or wait < soonest[0]:
+                soonest = (wait, host)
+        if soonest is None:
+            raise IndexError("pop from a frontier whose hosts are all busy")
+        return self._take(soonest[1])
+
+    def learn(self, url, is_target=None):
+        """Releases the slot of the host of a popped url."""
+        self._release(url)
+
+    def _append(self, url):
+        host = helpers.get_domain(url)
+        queue = self._queues.get(host)
+        if queue is None:
+            queue = self._queues[host] = collections.deque()
+            self._ring.append(host)
+            self._credits[host] = self.weights.get(host, 1)
+            self._open += self._busy[host] < self.max_per_host
+        queue.append(url)
+        self._size += 1
+
+    def _take(self, host):
+        """str: pops the next url of the host, ending its turn if needed."""
+        queue = self._queues[host]
+        url = queue.popleft()
+        self._size -= 1
+        self._popped[url] = host
+        self._busy[host] += 1
+        self._credits[host] -= 1
+        capped = self._busy[host] >= self.max_per_host
+        if not queue:
+            del self._queues[host], self._credits[host]
+            self._ring.remove(host)
+            self._open -= 1
+        else:
+            self._open -= capped
+            if self._credits[host] <= 0:
+                self._credits[host] = self.weights.get(host, 1)
+                self._ring.remove(host)
+                self._ring.append(host)
+        return url
+
+    def _release(self, url):
+        """Frees the slot of the host of the url, if it was popped."""
+        host = self._popped.pop(url, None)
+        if host is None:
+            return
+        self._busy[host] -= 1
+        if host in self._queues and self._busy[host] == self.max_per_host - 1:
+            self._open += 1
+        if not self._busy[host]:
+            del self._busy[host]
+
+
+_STORES = ("set", "hash", "bloom")
+
+
+def new_url_set(store="set", error_rate=1e-4):
+    """Creates an empty URL set of the given kind.
+    Args:
+        store (str): 'set' for a built-in set of strings, 'hash' for a
+                     HashedUrlSet or 'bloom' for a BloomUrlSet.
+        error_rate (float): false positive rate of the Bloom filter.
+    Raises:
+        ValueError: If the kind of store is unknown.
+    """
+    if store == "set":
+        return set()
+    if store == "hash":
+        return HashedUrlSet()
+    if store == "bloom":
+        return BloomUrlSet(error_rate=error_rate)
+    raise ValueError("Unknown url store: {}, expected one of {}".format(
+        store, _STORES))
+
+
+_FRONTIERS = ("fifo", "priority")
+
+
+def new_frontier(kind="fifo", seen=None, scorer=None):
+    """Creates an empty frontier of the given kind.
+    Args:
+        kind (str): 'fifo' for a Frontier in discovery order or 'priority'
+                    for a PriorityFrontier.
+        seen (set): set of URLs ever pushed, a new set by default.
+        scorer (object): scorer of the PriorityFrontier, defaults to a new
+                         scoring.NaiveBayesScorer.
+    Raises:
+        ValueError: If the kind of frontier is unknown.
+    """
+    if kind == "fifo":
+        return Frontier(seen)
+    if kind == "priority":
+        return PriorityFrontier(scorer or scoring.NaiveBayesScorer(), seen)
+    raise ValueError("Unknown frontier: {}, expected one of {}".format(
+        kind, _FRONTIERS))
+
+
+def _fingerprint(url):
+    """int: 64 bit hash of the url, never one of the reserved slot values."""
+    digest = hashlib.blake2b(url.encode("utf-8"), digest_size=8).digest()
+    return max(int.from_bytes(digest, "little"), HashedUrlSet._DELETED + 1)
+
+
+def _double_hash(url):
+    """tuple: two independent 64 bit hashes of the url."""
+    digest = hashlib.blake2b(url.encode("utf-8"), digest_size=16).digest()
+    return (int.from_bytes(digest[:8], "little"),
+            int.from_bytes(digest[8:], "little") | 1)
@@ -6,10 +6,15 @@ Created on Sat May 19 08:03:57 2018
 """
 
 import bs4
+import time
 import socket
-import urllib.request
+import collections
+import urllib.parse
 
 import helpers
+import recrawl
+import extractor
+import transport as tp
 from decorators import Decorators
 
 
@@ -17,92 +22,304 @@ class TimeoutException(Exception):
     pass
 
 
-class WebPage():
+class PageSummary(object):
+    """Behaviour shared by the live pages and their stored records."""
+
+    __slots__ = ()
+    _INVALID_TARGET = "N/A"
+
+    @property
+    def valid_target(self):
+        """bool: return True if the page matches the target specification."""
+        return self.target_name != self._INVALID_TARGET
+
+    def __str__(self):
+        """Overloads the 'str' method"""
+        if self.valid_target:
+            rep = "Target Text: {}; Title: {}; URL: {}".format(
+                self.target_name, self.title, self.url
+            )
+        else:
+            rep = "Title: {}; URL: {}".format(self.title, self.url)
+        return rep
+
+
+class PageRecord(PageSummary, collections.namedtuple(
+        "PageRecord",
+        ["url", "title", "target_name", "status", "fetch_time", "fields"],
+        defaults=[None])):
+    """Immutable result of a visit, what the crawler keeps of each page.
+    Note:
+        A tuple without a per-instance __dict__, holding only the extracted
+        values. The domain, target specification and timeout are the same
+        for the whole crawl and aren't repeated on each record.
+    """
+
+    __slots__ = ()
+
+
+class WebPage(PageSummary):
     """Holds the relevant information about the page.
 
     Attributes:
         url (str): url of the page, must be a valid url.
+        final_url (str): url that answered, after following redirects. The
+                         relative links of the page are resolved against it.
         target_tag (str): type of html tag that identifies the target.
         target_class (str): class of the html tag that identifies the target.
         timeout (float): time in seconds before timing out the request.
+        transport (Transport): client used to request the page, defaults to
+                               the transport shared by all pages.
+        status (int): HTTP status of the response.
+        fetch_time (float): time in seconds spent requesting the page.
+        timings (dict): seconds spent on each phase of the visit, the ones of
+                        the Response plus 'parse' and 'links'.
+        wire_bytes (int): size of the response body as received.
+        parser (str): 'soup' builds the full BeautifulSoup tree, 'stream'
+                      only extracts the title, target and links in a single
+                      pass over the html, without building a tree.
+        response (Response): response already fetched for the url, parsed
+                             instead of requesting the url again.
+        cached (CacheEntry): values stored by an earlier crawl. The request
+                             is made conditional on its validators and, if
+                             the page didn't change, its values are reused
+                             instead of parsing the page.
+        not_modified (bool): True if the page was rebuilt from 'cached'.
+        etag (str): ETag validator of the response, if any.
+        last_modified (str): Last-Modified validator of the response, if any.
+        rules (RuleSet): extraction rules evaluated on the page, see the
+                         'rules' module.
+        fields (dict): value of each field of the rules, None without rules.
 
     Raises:
         URLError: If the url is invalid.
         HTTPError: If the request cannot be completed.
         AttributeError: If the url is not a string.
+        ValueError: If the parser is unknown.
     """
 
-    _INVALID_TARGET = "N/A"
+    _PARSERS = ("soup", "stream")
     _AGENT = "Academic crawler 1.0 created by Carlos Monteiro. Strictly for python studies."
 
     def __init__(
             self, url, target_tag="div",
-            target_class="productName", timeout=2):
+            target_class="productName", timeout=2, transport=None,
+            parser="soup", response=None, cached=None, rules=None):
+
+        if parser not in self._PARSERS:
+            raise ValueError("Unknown parser: {}".format(parser))
 
         self.url = helpers.safe_url(url)
+        self.final_url = self.url
         self.target_tag = target_tag
         self.target_class = target_class
         self.timeout = timeout
+        self.transport = transport or tp.get_default_transport()
+        self.parser = parser
+        self.status = None
+        self.fetch_time = None
+        self.timings = {}
+        self.wire_bytes = 0
+        self.not_modified = False
+        self.etag = None
+        self.last_modified = None
+        self.rules = rules
+        self.fields = None
 
         self._soup = ""
         self._child_urls = set()
+        self._hrefs = []
+        self._anchor_texts = {}
+        self._base_href = None
+        self._response = response
 
-        div = self.soup.find(self.target_tag, {"class": self.target_class})
+        if cached is not None and self._revalidate(cached):
+            title = cached.title
+            target = cached.target_name
+            if target == self._INVALID_TARGET:
+                target = None
+            self._child_urls = set(cached.child_urls)
+            self.fields = cached.fields
+        elif parser == "stream":
+            response = self._request()
+            start = time.perf_counter()
+            title, target, hrefs, texts, base, self.fields = extractor.extract(
+                response.body, self.target_tag, self.target_class,
+                response.headers.get("Content-Type"), rules=rules)
+            self._hrefs = list(zip(hrefs, texts))
+            self._base_href = base
+            self.timings["parse"] = time.perf_counter() - start
+        else:
+            self._parse_tree(self._request())
+            div = self.soup.find(self.target_tag, {"class": self.target_class})
+            title = self.soup.find("title")
+            title = "" if title is None else title.text  # e.g. truncated
+            target = None if div is None else div.text
 
-        self.title = self.soup.find("title").text
+        self.title = title
         self.domain = helpers.get_domain(self.url)
-        self.target_name = self._INVALID_TARGET if div is None else div.text
+        self.target_name = self._INVALID_TARGET if target is None else target
+
+    def record(self):
+        """PageRecord: compact and immutable copy of the extracted values."""
+        return PageRecord(
+            self.url, self.title, self.target_name, self.status,
+            self.fetch_time, self.fields)
 
-        # dump
-        del div
+    def cache_entry(self, child_urls):
+        """CacheEntry: values to revalidate the page on the next crawl, None
+                       if the server didn't send any validator.
+        """
+        if self.etag is None and self.last_modified is None:
+            return None
+        return recrawl.CacheEntry(
+            self.etag, self.last_modified, self.title, self.target_name,
+            tuple(child_urls), self.fields)
 
     def free(self):
         """Frees memory by reseting the _soup object and the child URLs"""
         self._child_urls.clear()
+        self._hrefs = []
+        self._anchor_texts = {}
         self._soup = ""
 
+    def __getstate__(self):
+        """Pickles the page without the parsed html or the transport."""
+        state = self.__dict__.copy()
+        state.update(transport=None, rules=None, _soup="", _child_urls=set(), _hrefs=[],
+                     _anchor_texts={})
+        return state
+
+    def __setstate__(self, state):
+        """Restores a pickled page, using the shared transport."""
+        self.__dict__.update(state)
+        self.transport = tp.get_default_transport()
+
     @property
-    @Decorators.initializer("_soup")
     def soup(self):
-        """BeautifulSoup: requests the URL and parse the html"""
-        # Gets the response from the HTTP request and creates the bs4 parser
-        request = urllib.request.Request(
-            self.url, headers={"User-Agent": self._AGENT}
-        )
-        # Gets the response treating for potential timeouts
-        try:
-            response = urllib.request.urlopen(request, timeout=self.timeout)
-            self._soup = bs4.BeautifulSoup(response, "html.parser")
-        except socket.timeout:
-            raise TimeoutException("Timeout occurred while requesting page.")
+        """BeautifulSoup: the parsed html of the page.
+        Note:
+            Never requests the url again, that would bypass the budget, the
+            politeness scheduler and the metrics of the crawl.
+        Raises:
+            ValueError: If the page holds no tree, i.e. it was parsed with the
+                        'stream' parser, rebuilt from the recrawl cache, freed
+                        or unpickled.
+        """
+        if not isinstance(self._soup, bs4.BeautifulSoup):
+            raise ValueError(
+                "No html tree held for {}: the page was parsed with the "
+                "'stream' parser, rebuilt from the cache or freed".format(
+                    self.url))
         return self._soup
 
+    def _parse_tree(self, response):
+        """Builds the BeautifulSoup tree of the response and evaluates the
+        rules on it.
+        """
+        start = time.perf_counter()
+        self._soup = bs4.BeautifulSoup(response.body, "html.parser")
+        self.timings["parse"] = time.perf_counter() - start
+        if self.rules is not None:
+            start = time.perf_counter()
+            self.fields = self.rules.extract_tree(self._soup, response.body)
+            self.timings["rules"] = time.perf_counter() - start
+
+    def _request(self, cached=None):
+        """Response: the given response, or requests the URL."""
+        if self._response is not None:
+            response, self._response = self._response, None
+        else:
+            response = request_page(
+                self.url, self.timeout, self.transport,
+                recrawl.conditional_headers(cached))
+        self.status = response.status
+        self.final_url = response.url or self.url
+        self.fetch_time = response.elapsed
+        self.timings.update(response.timings)
+        self.wire_bytes = response.wire_bytes
+        self.etag = response.headers.get("ETag")
+        self.last_modified = response.headers.get("Last-Modified")
+        return response
+
+    def _revalidate(self, cached):
+        """bool: True if the server answered that the page didn't change.
+        Note:
+            Otherwise the full response is kept to be parsed as usual.
+        """
+        response = self._request(cached)
+        if response.status != 304:
+            self._response = response
+            return False
+        self.not_modified = True
+        self.etag = self.etag or cached.etag
+        self.last_modified = self.last_modified or cached.last_modified
+        return True
+
     @property
     @Decorators.initializer("_child_urls")
     def child_urls(self):
         """list: return a list with all the child pages originated from the
-                 same domain without duplicates. Excludes the parent page.
+                 same domain without duplicates. Relative links are resolved
+                 against the final url of the page, or its <base href>.
         """
-        urls = [url["href"] for url in self.soup.find_all("a", href=True)]
-        for url in urls:
-            domain = helpers.get_domain(url)
-            if domain == self.domain:
-                self._child_urls.add(helpers.safe_url(url))
-            elif domain == "":
-                self._child_urls.add(helpers.safe_url(self.domain + url))
+        if self.not_modified:
+            return self._child_urls
+        start = time.perf_counter()
+        if self.parser == "stream":
+            links = self._hrefs
+        else:
+            links = [(anchor["href"], anchor.get_text(" ", strip=True))
+                     for anchor in self.soup.find_all("a", href=True)]
+            base = self.soup.find("base", href=True)
+            self._base_href = None if base is None else base["href"]
+        base_url = self.final_url
+        if self._base_href:
+            base_url = urllib.parse.urljoin(
+                self.final_url, self._base_href.strip())
+        for url, text in helpers.resolve_links(base_url, links, self.domain):
+            self._child_urls.add(url)
+            if text and url not in self._anchor_texts:
+                self._anchor_texts[url] = text
+        self.timings["links"] = time.perf_counter() - start
         return self._child_urls
 
     @property
-    def valid_target(self):
-        """bool: return True if the page matches the target specification."""
-        return self.target_name != self._INVALID_TARGET
+    def child_links(self):
+        """dict: the child URLs mapped to the text of their first anchor."""
+        return {url: self._anchor_texts.get(url, "") for url in self.child_urls}
 
-    def __str__(self):
-        """Overloads the 'str' method"""
-        if self.valid_target:
-            rep = "Target Text: {}; Title: {}; URL: {}".format(
-                self.target_name, self.title, self.url
-            )
-        else:
-            rep = "Title: {}; URL: {}".format(self.title, self.url)
-        return rep
+
+def request_page(url, timeout=2, transport=None, headers=None,
+                 content_filter=None):
+    """Response: requests the url treating for potential timeouts.
+    Note:
+        With a 'content_filter' (see filters.ContentFilter), the responses
+        that aren't html are refused from their headers and the bodies are
+        truncated at its size limit.
+    Raises:
+        TimeoutException: If the server takes longer than 'timeout' seconds.
+        SkippedContent: If the content filter refuses the response.
+    """
+    transport = transport or tp.get_default_transport()
+    headers = dict(headers or {}, **{"User-Agent": WebPage._AGENT})
+    accept = max_bytes = None
+    if content_filter is not None:
+        accept = content_filter.check_headers
+        max_bytes = content_filter.max_bytes
+    try:
+        return transport.get(url, headers=headers, timeout=timeout,
+                             accept=accept, max_bytes=max_bytes)
+    except socket.timeout:
+        raise TimeoutException("Timeout occurred while requesting page.")
+
+
+def parse_response(url, response, parser="soup", rules=None):
+    """tuple: the WebPage parsed from a fetched response and its child links.
+    Note:
+        Module level so it can be sent to a process pool. The page comes
+        back pickled, i.e. without its soup, so the child links are returned
+        on their own, see 'WebPage.child_links'.
+    """
+    page = WebPage(url, parser=parser, response=response, rules=rules)
+    return page, page.child_links
@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 18:05:29 2026
+
+@author: Carlos
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+import http.server
+import urllib.error
+
+sys.path.append(os.path.dirname(os.path.realpath(__file__)) + "/../crawler")
+
+import archive as ar
+import crawler as cw
+import transport as tp
+import fixtures as fx
+
+
+class TestArchive(unittest.TestCase):
+    """Tests the recording of a crawl and its replay off the network."""
+
+    def setUp(self):
+        self.server = fx.serve(DummyStoreHandler)
+        self.domain = self.server.url
+        self.path = os.path.join(tempfile.mkdtemp(), "crawl.warc.gz")
+
+    def tearDown(self):
+        fx.stop(self.server)
+
+    def test_record_and_replay(self):
+        """Tests if a replayed crawl meets the outcomes of the recorded one."""
+        recorder = ar.RecordingTransport(self.path, tp.Transport())
+        recorded = cw.Crawler(
+            self.domain + "/", req_limit=100, transport=recorder,
+            scheduler=fx.fast_scheduler(),
+            indentify_target=lambda page: "/item" in page.url)
+        recorded.run_async(4)
+        recorder.close()
+        fx.stop(self.server)
+
+        replay = ar.ReplayTransport(self.path)
+        self.addCleanup(replay.close)
+        replayed = cw.Crawler(
+            self.domain + "/", req_limit=100, transport=replay,
+            scheduler=ar.ReplayScheduler(),
+            indentify_target=lambda page: page.title == "Item 2")
+        replayed.run_async(4)
+
+        self.assertEqual(set(replayed.visited_urls), set(recorded.visited_urls))
+        self.assertEqual(set(replayed.skipped), {self.domain + "/feed"})
+        self.assertEqual(len(recorded.target_pages), 3)
+        self.assertEqual(list(replayed.target_pages), [self.domain + "/item2"])
+
+    def test_records_and_index(self):
+        """Tests the records read back, with and without the index."""
+        writer = ar.ArchiveWriter(self.path)
+        writer.write("https://a.com/", 200, {"Content-Type": "text/html",
+                                             "Content-Encoding": "gzip"}, b"A")
+        writer.write("https://a.com/old", 200, {}, b"B", "https://a.com/new")
+        writer.write("https://a.com/", 200, {}, b"C")
+        writer.write("https://a.com/gone", 410, {}, b"", reason="Gone")
+        writer.close()
+
+        archive = ar.Archive(self.path)
+        self.assertEqual(len(archive), 3)
+        self.assertEqual(archive.get("https://a.com/").body, b"C")
+        archive.close()
+        for chunk_size in (7, 100, 1 << 16):  # members across and in chunks
+            self.assertEqual(ar._scan(self.path, chunk_size),
+                             ar._load_index(self.path + ".idx"))
+        os.remove(self.path + ".idx")
+        with open(self.path, "ab") as f:
+            f.write(b"\x1f\x8b\x08partial")
+        archive = ar.Archive(self.path)
+        record = archive.get("https://a.com/old")
+        self.assertEqual((record.final_url, record.body),
+                         ("https://a.com/new", b"B"))
+        archive.close()
+
+        replay = ar.ReplayTransport(self.path)
+        self.addCleanup(replay.close)
+        self.assertEqual(replay.get("https://a.com/old").url, "https://a.com/new")
+        with self.assertRaises(urllib.error.HTTPError):
+            replay.get("https://a.com/gone")
+        with self.assertRaises(urllib.error.URLError):
+            replay.get("https://a.com/missing")
+        response = replay.get("https://a.com/", max_bytes=0)
+        self.assertTrue(response.truncated)
+
+
+class DummyStoreHandler(http.server.BaseHTTPRequestHandler):
+    """Store with three items, a feed and a broken link."""
+
+    def do_GET(self):
+        content_type = "text/html"
+        if self.path == "/":
+            links = ["/item{}".format(i) for i in range(3)] + ["/feed", "/gone"]
+            body = "<html><title>Store</title><body>{}</body></html>".format(
+                "".join('<a href="{}">x</a>'.format(link) for link in links))
+        elif self.path.startswith("/item"):
+            body = "<html><title>Item {}</title></html>".format(self.path[5:])
+        elif self.path == "/feed":
+            body, content_type = "<rss></rss>", "application/rss+xml"
+        else:
+            self.send_error(404)
+            return
+        body = body.encode()
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", len(body))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,513 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 17:15:14 2026
+
+@author: Carlos
+"""
+
+import os
+import sys
+import csv
+import json
+import time
+import tempfile
+import collections
+import unittest
+import threading
+import urllib.request
+import http.server
+
+sys.path.append(os.path.dirname(os.path.realpath(__file__)) + "/../crawler")
+
+import sinks
+import recrawl
+import checkpoint as ckpt
+import rules as rl
+import webpage as wp
+import crawler as cw
+import fixtures as fx
+
+
+class TestAsyncCrawler(fx.ServerTestCase):
+    """Tests the asyncio engine against a small local site."""
+
+    handler = "DummySiteHandler"
+
+    def test_crawls_whole_site(self):
+        """Tests if every page is visited exactly once and classified."""
+        crawler = cw.Crawler(
+            self.domain + "/p0", req_limit=1000, scheduler=self.fast(),
+            indentify_target=lambda page: page.valid_target)
+        crawler.run_async(8)
+
+        self.assertEqual(len(crawler.visited_urls), DummySiteHandler.n_pages)
+        self.assertEqual(len(crawler.target_pages), DummySiteHandler.n_pages/2)
+        self.assertEqual(len(crawler.unvisited), 0)
+
+    def test_unexpected_errors(self):
+        """Tests if an error on a page doesn't stop the other workers."""
+        broken = self.domain + "/p5"
+
+        def identify_target(page):
+            if page.url == broken:
+                raise RuntimeError("broken page")
+            return True
+
+        for engine in ("run", "run_async"):
+            crawler = cw.Crawler(
+                self.domain + "/p0", req_limit=1000, scheduler=self.fast(),
+                indentify_target=identify_target)
+            getattr(crawler, engine)(4)
+
+            self.assertEqual(set(crawler.invalid_urls), {broken})
+            self.assertEqual(len(crawler.target_pages),
+                             DummySiteHandler.n_pages - 1)
+            self.assertEqual(crawler.stats()["errors"]["unexpected"], 1)
+
+    def test_failed_requests_are_retried(self):
+        """Tests if failed urls are queued again, up to the retry cap, unless
+           their error status won't change on a retry.
+        """
+        server = fx.serve(DummyFlakyHandler)
+        domain = server.url
+        try:
+            for engine in ("run", "run_async"):
+                DummyFlakyHandler.requests = collections.Counter()
+                crawler = cw.Crawler(domain + "/", req_limit=100,
+                                     scheduler=self.fast())
+                getattr(crawler, engine)(2)
+
+                self.assertEqual(set(crawler.target_pages),
+                                 {domain + "/ok", domain + "/flaky"})
+                self.assertEqual(set(crawler.invalid_urls),
+                                 {domain + "/down", domain + "/missing"})
+                self.assertEqual(DummyFlakyHandler.requests["/down"], 3)
+                self.assertEqual(DummyFlakyHandler.requests["/flaky"], 2)
+                self.assertEqual(DummyFlakyHandler.requests["/missing"], 1)
+                self.assertEqual(crawler.stats()["requests"], 9)  # and robots
+        finally:
+            fx.stop(server)
+
+    def test_links_after_redirect(self):
+        """Tests if relative links resolve against the redirected url."""
+        server = fx.serve(DummyRedirectHandler)
+        domain = server.url
+        try:
+            for engine in ("run", "run_async"):
+                for parser in ("soup", "stream"):
+                    crawler = cw.Crawler(domain + "/", req_limit=100,
+                                         scheduler=self.fast(), parser=parser)
+                    getattr(crawler, engine)(2)
+
+                    self.assertEqual(
+                        set(crawler.visited_urls),
+                        {domain + "/shop", domain + "/shop/item1",
+                         domain + "/shop/item2"})
+                    self.assertFalse(crawler.invalid_urls)
+        finally:
+            fx.stop(server)
+
+    def test_soup_never_requests(self):
+        """Tests if reading the soup of a page without a tree raises instead
+           of requesting the page again.
+        """
+        url = self.domain + "/p2"
+        cached = recrawl.CacheEntry('"v2"', None, "Page 2", "N/A", (), None)
+        DummySiteHandler.n_requests = 0
+        soup_page = wp.WebPage(url)
+        self.assertEqual(soup_page.soup.find("title").text, "Page 2")
+        pages = [wp.WebPage(url, parser="stream"),
+                 wp.WebPage(url, cached=cached), soup_page]
+        soup_page.free()
+        for page in pages:
+            with self.assertRaises(ValueError):
+                page.soup
+        self.assertTrue(pages[1].not_modified)
+        self.assertEqual(DummySiteHandler.n_requests, 3)
+
+    def test_priority_frontier(self):
+        """Tests if both engines crawl the whole site in priority order."""
+        for engine in ("run", "run_async"):
+            crawler = cw.Crawler(
+                self.domain + "/p0", req_limit=1000, scheduler=self.fast(),
+                frontier="priority",
+                indentify_target=lambda page: page.valid_target)
+            getattr(crawler, engine)(8)
+
+            self.assertEqual(
+                len(crawler.visited_urls), DummySiteHandler.n_pages)
+            self.assertEqual(
+                len(crawler.target_pages), DummySiteHandler.n_pages/2)
+            self.assertEqual(len(crawler._frontier), 0)
+
+    def test_stream_parser(self):
+        """Tests if the stream parser yields the same crawl as the soup."""
+        crawler = cw.Crawler(
+            self.domain + "/p0", req_limit=1000, scheduler=self.fast(),
+            parser="stream", indentify_target=lambda page: page.valid_target)
+        crawler.run_async(8)
+
+        self.assertEqual(len(crawler.visited_urls), DummySiteHandler.n_pages)
+        self.assertEqual(len(crawler.target_pages), DummySiteHandler.n_pages/2)
+        page = crawler.target_pages[self.domain + "/p1"]
+        self.assertEqual(page.title, "Page 1")
+        self.assertEqual(page.target_name, "Product 1")
+
+    def test_parse_workers(self):
+        """Tests if parsing on a process pool yields the same crawl."""
+        crawler = cw.Crawler(
+            self.domain + "/p0", req_limit=1000, scheduler=self.fast(),
+            indentify_target=lambda page: page.valid_target)
+        crawler.run_async(8, parse_workers=2)
+
+        self.assertEqual(len(crawler.visited_urls), DummySiteHandler.n_pages)
+        self.assertEqual(len(crawler.target_pages), DummySiteHandler.n_pages/2)
+        page = crawler.target_pages[self.domain + "/p1"]
+        self.assertEqual(page.target_name, "Product 1")
+        self.assertEqual(page.status, 200)
+
+    def test_extraction_rules(self):
+        """Tests if the fields of the rules classify the pages."""
+        rules = [rl.Rule("product", "div.productName", regex=r"Product (\d+)")]
+        for parser, parse_workers in (("soup", 0), ("stream", 2)):
+            crawler = cw.Crawler(
+                self.domain + "/p0", req_limit=1000, scheduler=self.fast(),
+                parser=parser, rules=rules,
+                indentify_target=lambda page: page.fields["product"])
+            crawler.run_async(8, parse_workers)
+
+            self.assertEqual(
+                len(crawler.target_pages), DummySiteHandler.n_pages/2)
+            page = crawler.target_pages[self.domain + "/p3"]
+            self.assertEqual(page.fields, {"product": "3"})
+
+    def test_compact_url_store(self):
+        """Tests if the compact URL stores yield the same crawl."""
+        for store in ("hash", "bloom"):
+            crawler = cw.Crawler(
+                self.domain + "/p0", req_limit=1000, scheduler=self.fast(),
+                url_store=store)
+            crawler.run_async(8)
+            self.assertEqual(
+                len(crawler.visited_urls), DummySiteHandler.n_pages)
+
+    def test_page_records(self):
+        """Tests if only slim records are kept unless in greedy mode."""
+        for greedy, kind in ((False, wp.PageRecord), (True, wp.WebPage)):
+            crawler = cw.Crawler(
+                self.domain + "/p0", req_limit=1000, scheduler=self.fast(),
+                greedy=greedy, indentify_target=lambda page: page.valid_target)
+            crawler.run_async(4)
+            page = crawler.target_pages[self.domain + "/p1"]
+            self.assertIsInstance(page, kind)
+            self.assertEqual(
+                str(page), "Target Text: Product 1; Title: Page 1; URL: "
+                + self.domain + "/p1")
+
+        self.assertFalse(hasattr(crawler.root_page.record(), "__dict__"))
+
+    def test_request_limit(self):
+        """Tests if the engine stops at the request limit, which also pays
+           for the root page and the robots.txt.
+        """
+        crawler = cw.Crawler(
+            self.domain + "/p0", req_limit=7, scheduler=self.fast())
+        crawler.run_async(4)
+        self.assertEqual(len(crawler.visited_urls), 5)
+
+    def test_exact_budget(self):
+        """Tests if both engines make exactly 'req_limit' requests."""
+        for engine in ("run", "run_async"):
+            DummySiteHandler.n_requests = 0
+            crawler = cw.Crawler(
+                self.domain + "/p0", req_limit=7, scheduler=self.fast())
+            getattr(crawler, engine)(16)
+
+            self.assertEqual(DummySiteHandler.n_requests, 6)  # and robots.txt
+            self.assertEqual(crawler.stats()["requests"], 7)
+            self.assertEqual(len(crawler.visited_urls), 5)
+            self.assertEqual(
+                len(crawler.unvisited), len(crawler._frontier.seen) - 5)
+
+    def test_checkpoint_resume(self):
+        """Tests if a crawl resumed from its journal finishes the site."""
+        path = os.path.join(tempfile.mkdtemp(), "crawl.ckpt")
+        crawler = cw.Crawler(
+            self.domain + "/p0", req_limit=10, scheduler=self.fast(),
+            url_store="hash", checkpoint=path)
+        crawler.run_async(4)  # closes the journal
+
+        with open(path, "ab") as f:
+            f.write(b"torn batch")  # a crash in the middle of a write
+        resumed = cw.Crawler.resume(
+            path, req_limit=1000, scheduler=self.fast(),
+            indentify_target=lambda page: page.valid_target)
+        self.assertEqual(len(resumed.visited_urls), 8)
+        self.assertEqual(len(resumed.target_pages), 8)  # saved as targets
+        self.assertEqual(resumed.budget.used, 12)  # the root and robots again
+        self.assertEqual(resumed.parser, "soup")
+
+        resumed.run_async(4)
+        self.assertEqual(len(resumed.visited_urls), DummySiteHandler.n_pages)
+        self.assertEqual(
+            len(resumed.target_pages) + len(resumed.other_pages),
+            DummySiteHandler.n_pages)
+        os.remove(path)
+
+    def test_resumed_budget_counts_failures(self):
+        """Tests if the failed requests still count after a resume."""
+        path = os.path.join(tempfile.mkdtemp(), "crawl.ckpt")
+        journal = ckpt.Checkpoint(path, {"domain": self.domain + "/p0"})
+        journal.record("push", ["a", "b"])
+        for kind, url in (("visit", "a"), ("fail", "a"), ("visit", "a"),
+                          ("visit", "b")):
+            journal.record(kind, url)
+        journal.close()
+
+        snapshot = ckpt.load(path)
+        self.assertEqual((snapshot.requests, snapshot.retries), (3, {"a": 1}))
+        resumed = cw.Crawler.resume(path, req_limit=3, scheduler=self.fast())
+        self.assertTrue(resumed.budget.spent())
+        resumed.checkpoint.close()
+        os.remove(path)
+
+    def test_resume_in_flight_visits(self):
+        """Tests if the visits without an outcome are pending again."""
+        path = os.path.join(tempfile.mkdtemp(), "crawl.ckpt")
+        journal = ckpt.Checkpoint(path, {"domain": self.domain + "/p0"})
+        journal.record("push", ["a", "b", "c", "d"])
+        for kind, url in (("visit", "a"), ("visit", "b"), ("done", "b"),
+                          ("visit", "c")):
+            journal.record(kind, url)
+        journal.close()
+
+        snapshot = ckpt.load(path)
+        self.assertEqual(snapshot.pending, ["a", "c", "d"])
+        self.assertEqual(set(snapshot.visited), {"b"})
+        self.assertEqual(snapshot.requests, 3)
+        os.remove(path)
+
+    def test_resume_appends_to_sink(self):
+        """Tests if a resumed crawl keeps the results already in its sink."""
+        folder = tempfile.mkdtemp()
+        path = os.path.join(folder, "crawl.ckpt")
+        sink = sinks.open_sink(os.path.join(folder, "results.csv"), 3)
+        crawler = cw.Crawler(
+            self.domain + "/p0", req_limit=10, scheduler=self.fast(),
+            checkpoint=path, sink=sink, keep_pages=False)
+        crawler.run_async(4)
+
+        resumed = cw.Crawler.resume(path, req_limit=1000,
+                                    scheduler=self.fast())
+        self.assertFalse(resumed.keep_pages)
+        self.assertEqual(resumed.sink.filename, sink.filename)
+        resumed.run_async(4)
+
+        with open(sink.filename, encoding="utf-8") as f:
+            rows = list(csv.DictReader(f))
+        urls = [row["url"] for row in rows]
+        self.assertEqual(len(urls), DummySiteHandler.n_pages)
+        self.assertEqual(len(set(urls)), DummySiteHandler.n_pages)
+        os.remove(sink.filename)
+        os.remove(path)
+
+    def test_streaming_sinks(self):
+        """Tests if the sinks receive every page while nothing is kept."""
+        folder = tempfile.mkdtemp()
+        for filename in ("results.csv", "results.jsonl"):
+            sink = sinks.open_sink(os.path.join(folder, filename), 7)
+            crawler = cw.Crawler(
+                self.domain + "/p0", req_limit=1000, scheduler=self.fast(),
+                sink=sink, keep_pages=False,
+                indentify_target=lambda page: page.valid_target)
+            crawler.run_async(4)  # closes the sink
+
+            self.assertFalse(crawler.target_pages or crawler.other_pages)
+            self.assertEqual(crawler.n_targets, DummySiteHandler.n_pages/2)
+            with open(sink.filename, encoding="utf-8") as f:
+                if filename.endswith(".csv"):
+                    rows = list(csv.DictReader(f))
+                else:
+                    rows = [json.loads(line) for line in f]
+            self.assertEqual(len(rows), DummySiteHandler.n_pages)
+            row = [row for row in rows if row["url"].endswith("/p3")][0]
+            self.assertEqual(row["title"], "Page 3")
+            self.assertEqual(row["target_name"], "Product 3")
+            self.assertEqual(int(row["status"]), 200)
+            os.remove(sink.filename)
+
+    def test_slow_page_does_not_stall(self):
+        """Tests if a slow page only holds its own slot."""
+        crawler = cw.Crawler(
+            self.domain + "/p0", req_limit=1000, scheduler=self.fast())
+        t0 = time.time()
+        crawler.run_async(4)
+        self.assertLess(time.time() - t0, DummySiteHandler.slow_delay * 3)
+
+
+    def test_stats(self):
+        """Tests if the phases, counters and gauges are recorded."""
+        observed = []
+        crawler = cw.Crawler(
+            self.domain + "/p0", req_limit=1000, scheduler=self.fast(),
+            parser="stream")
+        crawler.metrics.add_hook(lambda *args: observed.append(args))
+        server = crawler.serve_stats()
+        crawler.run_async(8)
+
+        stats = crawler.stats()
+        self.assertEqual(stats["visited"], DummySiteHandler.n_pages)
+        self.assertEqual(stats["counters"]["pages"], DummySiteHandler.n_pages)
+        self.assertGreater(stats["counters"]["bytes"], 0)
+        for phase in ("ttfb", "download", "parse", "links"):
+            self.assertEqual(
+                stats["phases"][phase]["count"], DummySiteHandler.n_pages)
+        self.assertEqual(stats["gauges"], {"queue_depth": 0, "in_flight": 0})
+        self.assertIn(("counter", "pages", 1), observed)
+
+        url = "http://127.0.0.1:{}/metrics".format(server.server_port)
+        with urllib.request.urlopen(url) as response:
+            body = response.read().decode("utf-8")
+        server.shutdown()
+        server.server_close()
+        self.assertIn("crawler_pages_total {}".format(
+            DummySiteHandler.n_pages), body)
+        self.assertIn('crawler_phase_seconds_count{phase="parse"}', body)
+
+
+    def test_recrawl(self):
+        """Tests if unchanged pages are rebuilt from the recrawl cache."""
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, "cache.pkl")
+            results = []
+            for engine in ("run_async", "run", "parse_workers"):
+                crawler = cw.Crawler(
+                    self.domain + "/p0", req_limit=1000, scheduler=self.fast(),
+                    recrawl=path,
+                    indentify_target=lambda page: page.valid_target)
+                if engine == "run":
+                    crawler.run(8)
+                else:
+                    crawler.run_async(
+                        8, parse_workers=2 if engine == "parse_workers" else 0)
+                results.append(crawler)
+
+        first, *others = results
+        self.assertNotIn("not_modified", first.stats()["counters"])
+        for crawler in others:
+            self.assertEqual(crawler.stats()["counters"]["not_modified"],
+                             DummySiteHandler.n_pages)
+            self.assertEqual(set(crawler.target_pages),
+                             set(first.target_pages))
+            page = crawler.target_pages[self.domain + "/p1"]
+            self.assertEqual(page.status, 304)
+            self.assertEqual(page.target_name, "Product 1")
+
+
+class DummyFlakyHandler(http.server.BaseHTTPRequestHandler):
+    """Home linking to a page, one failing once, one always failing and one
+       missing.
+    """
+
+    requests = collections.Counter()
+
+    def do_GET(self):
+        self.requests[self.path] += 1
+        if self.path == "/missing":
+            self.send_error(404)
+            return
+        if self.path == "/down" or (
+                self.path == "/flaky" and self.requests[self.path] == 1):
+            self.send_error(503)
+            return
+        links = "".join('<a href="/{}">x</a>'.format(name)
+                        for name in ("ok", "flaky", "down", "missing"))
+        body = "<html><title>Page</title><body>{}</body></html>".format(
+            links if self.path == "/" else "").encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html")
+        self.send_header("Content-Length", len(body))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class DummyRedirectHandler(http.server.BaseHTTPRequestHandler):
+    """Home linking to '/shop', redirected to a directory page with relative
+       links, one of them through its <base href>.
+    """
+
+    pages = {
+        "/": '<a href="/shop">shop</a>',
+        "/shop/": '<a href="item1">x</a>',
+        "/shop/item1": '<base href="/shop/"><a href="item2">x</a>',
+        "/shop/item2": "",
+    }
+
+    def do_GET(self):
+        if self.path == "/shop":
+            self.send_response(301)
+            self.send_header("Location", "/shop/")
+            self.send_header("Content-Length", 0)
+            self.end_headers()
+            return
+        if self.path not in self.pages:
+            self.send_error(404)
+            return
+        body = "<html><title>Page</title><body>{}</body></html>".format(
+            self.pages[self.path]).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html")
+        self.send_header("Content-Length", len(body))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class DummySiteHandler(http.server.BaseHTTPRequestHandler):
+    """Serves pages '/p<n>' linking to three other pages, one of them slow."""
+
+    domain = ""
+    n_pages = 40
+    n_requests = 0
+    slow_delay = 0.5
+    lock = threading.Lock()
+
+    def do_GET(self):
+        if not self.path.startswith("/p"):
+            self.send_error(404)
+            return
+        with self.lock:
+            type(self).n_requests += 1
+        number = int(self.path.lstrip("/p") or 0)
+        links = "".join(
+            '<a href="{}/p{}">link</a>'.format(
+                self.domain, (number*3 + i) % self.n_pages)
+            for i in range(1, 4))
+        target = '<div class="productName">Product {}</div>'.format(number)
+        body = "<html><title>Page {}</title><body>{}{}</body></html>".format(
+            number, links, target if number % 2 else "").encode()
+        if number == 1:
+            time.sleep(self.slow_delay)
+        etag = '"v{}"'.format(number)
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("ETag", etag)
+        self.send_header("Content-Length", len(body))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 17:29:35 2026
+
+@author: Carlos
+"""
+
+import os
+import sys
+import unittest
+
+sys.path.append(os.path.dirname(os.path.realpath(__file__)) + "/../crawler")
+sys.path.append(os.path.dirname(os.path.realpath(__file__)) + "/../benchmarks")
+
+import crawler as cw
+import run_benchmarks
+import fixtures as fx
+from site_server import SyntheticSite, SiteServer
+
+
+class TestBenchmarkHarness(unittest.TestCase):
+    """Tests the synthetic site and the benchmark measurements."""
+
+    def test_site_is_deterministic(self):
+        """Tests if the same seed yields the same site."""
+        site = SyntheticSite(seed=1)
+        same = SyntheticSite(seed=1)
+        other = SyntheticSite(seed=2)
+        self.assertEqual(site.links(10), same.links(10))
+        self.assertNotEqual(site.links(10), other.links(10))
+        self.assertEqual(len(site.links(10)), site.fan_out)
+        self.assertGreater(len(site.html(10, "http://x")), site.page_size*0.9)
+
+        share = sum(map(site.is_target, range(site.n_pages)))/site.n_pages
+        self.assertAlmostEqual(share, site.target_share, delta=0.05)
+
+    def test_crawl_synthetic_site(self):
+        """Tests if a crawl of the served site finds every page and target."""
+        site = SyntheticSite(n_pages=60, fan_out=3, page_size=2000)
+        server = SiteServer(site)
+        server.start()
+        try:
+            crawler = cw.Crawler(
+                server.root_url, req_limit=1000, parser="stream",
+                scheduler=fx.fast_scheduler(),
+                indentify_target=lambda page: page.valid_target)
+            crawler.run_async(8)
+        finally:
+            fx.stop(server)
+
+        targets = [n for n in range(site.n_pages) if site.is_target(n)]
+        self.assertEqual(len(crawler.visited_urls), site.n_pages)
+        self.assertEqual(len(crawler.target_pages), len(targets))
+
+    def test_percentile(self):
+        """Tests the percentile used for the fetch latencies."""
+        values = list(range(101))
+        self.assertEqual(run_benchmarks.percentile(values, 50), 50)
+        self.assertEqual(run_benchmarks.percentile(values, 99), 99)
+        self.assertIsNone(run_benchmarks.percentile([], 50))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 17:48:18 2026
+
+@author: Carlos
+"""
+
+import os
+import sys
+import unittest
+import http.server
+
+sys.path.append(os.path.dirname(os.path.realpath(__file__)) + "/../crawler")
+
+import crawler as cw
+import canonical as cn
+import fixtures as fx
+
+
+class TestCanonicalization(unittest.TestCase):
+    """Tests the URL canonicalizer and the trap guard."""
+
+    def test_canonicalize(self):
+        """Tests if the aliases of a url share the same canonical form."""
+        canonicalize = cn.UrlCanonicalizer()
+        expected = "https://example.com/shop?color=red&size=m"
+        aliases = [
+            "https://example.com/shop?color=red&size=m",
+            "HTTPS://Example.COM:443/shop?size=m&color=red",
+            "https://example.com/shop?size=m&utm_source=mail&color=red#top",
+            "https://example.com/shop;jsessionid=A1?color=red&PHPSESSID=9&size=m",
+        ]
+        for url in aliases:
+            self.assertEqual(canonicalize(url), expected)
+
+        self.assertEqual(canonicalize("http://example.com"), "http://example.com/")
+        self.assertEqual(canonicalize("http://example.com/dir/"),
+                         "http://example.com/dir/")
+        strip = cn.UrlCanonicalizer(strip_trailing_slash=True)
+        self.assertEqual(strip("http://example.com/dir/"),
+                         "http://example.com/dir")
+        self.assertEqual(canonicalize("http://example.com:8080/a?b=%20&a=1&b=0"),
+                         "http://example.com:8080/a?a=1&b=%20&b=0")
+
+        keep = cn.UrlCanonicalizer(
+            strip_params=(), sort_query=False, strip_fragment=False,
+            strip_trailing_slash=False)
+        self.assertEqual(keep("https://Example.com/a/?utm_id=1&b=2#x"),
+                         "https://example.com/a/?utm_id=1&b=2#x")
+
+    def test_trap_guard(self):
+        """Tests if each guard rejects its kind of trap."""
+        guard = cn.TrapGuard(max_depth=2, max_query_variants=2,
+                             max_repeated_segments=2)
+        self.assertIsNone(guard.check("https://a.com/1"))
+        self.assertIsNone(guard.check("https://a.com/2", "https://a.com/1"))
+        self.assertEqual(guard.check("https://a.com/3", "https://a.com/2"), "depth")
+        guard.release("https://a.com/1")
+        self.assertIsNone(guard.check("https://a.com/3", "https://a.com/1"))
+
+        self.assertIsNone(guard.check("https://a.com/cal?d=1"))
+        self.assertIsNone(guard.check("https://a.com/cal?d=2"))
+        self.assertEqual(guard.check("https://a.com/cal?d=3"), "query_variants")
+        self.assertIsNone(guard.check("https://a.com/other?d=3"))
+
+        unbounded = cn.TrapGuard()
+        for page in range(1000):
+            self.assertIsNone(unbounded.check("https://a.com/p?page={}".format(page)))
+
+        self.assertIsNone(guard.check("https://a.com/x/y/x/y"))
+        self.assertEqual(guard.check("https://a.com/x/y/x/y/x"),
+                         "repeated_segments")
+
+    def test_crawl_avoids_aliases_and_traps(self):
+        """Tests if the crawl visits each page once and stays out of traps."""
+        server = fx.serve(DummyTrapHandler)
+        domain = server.url
+        try:
+            crawler = cw.Crawler(
+                domain + "/", req_limit=100,
+                traps=cn.TrapGuard(max_query_variants=5),
+                scheduler=fx.fast_scheduler())
+            crawler.run_async(4)
+        finally:
+            fx.stop(server)
+
+        paths = [url[len(domain):] for url in crawler.visited_urls]
+        self.assertEqual(paths.count("/about"), 1)
+        self.assertEqual(sum(path.startswith("/calendar") for path in paths), 5)
+        self.assertEqual(max(path.count("loop") for path in paths), 3)
+        counters = crawler.stats()["counters"]
+        self.assertEqual(counters["trap_query_variants"], 1)
+        self.assertEqual(counters["trap_repeated_segments"], 1)
+
+
+class DummyTrapHandler(http.server.BaseHTTPRequestHandler):
+    """Site with aliased links, an endless calendar and a growing path."""
+
+    domain = ""
+
+    def do_GET(self):
+        if self.path == "/":
+            links = ["/about", "/about/", "/about#team", "/about?utm_source=x",
+                     "/calendar?day=0", "/loop/"]
+        elif self.path.startswith("/calendar?day="):
+            day = int(self.path.rsplit("=", 1)[1])
+            links = ["/calendar?day={}".format(day + 1)]
+        elif self.path.startswith("/loop"):
+            links = [self.path.rstrip("/") + "/loop/"]
+        elif self.path == "/about":
+            links = ["/"]
+        else:
+            self.send_error(404)
+            return
+        body = "<html><title>Page</title><body>{}</body></html>".format(
+            "".join('<a href="{}{}">x</a>'.format(self.domain, link)
+                    for link in links)).encode()
+        self.send_response(200)
+        self.send_header("Content-Length", len(body))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+if __name__ == "__main__":
+    unittest.main()
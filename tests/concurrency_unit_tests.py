@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 18:07:42 2026
+
+@author: Carlos
+"""
+
+import os
+import sys
+import time
+import unittest
+import threading
+import http.server
+
+sys.path.append(os.path.dirname(os.path.realpath(__file__)) + "/../crawler")
+
+import crawler as cw
+import concurrency as cc
+import fixtures as fx
+
+
+class TestAimdController(unittest.TestCase):
+    """Tests the adaptation of the concurrency limit."""
+
+    def test_increase_and_bounds(self):
+        """Tests if saturated good windows raise the limit up to the max."""
+        controller = cc.AimdController(initial=2, max_limit=4, min_window=2)
+        for _ in range(20):
+            controller.record(0.1, 200, controller.limit)
+        self.assertEqual(controller.limit, 4)
+        self.assertEqual([d.reason for d in controller.history],
+                         ["increase", "increase"])
+
+        controller = cc.AimdController(initial=2, min_window=2)
+        for _ in range(20):
+            controller.record(0.1, 200, 1)  # the limit is never used
+        self.assertEqual(controller.limit, 2)
+
+    def test_decrease(self):
+        """Tests if errors and slow answers cut the limit."""
+        controller = cc.AimdController(initial=8, min_window=2)
+        for status in [503, 200, None, 200] + [200]*4:
+            controller.record(0.1, status, 8)
+        self.assertEqual((controller.limit, controller.history[-1].reason),
+                         (4, "errors"))
+
+        for _ in range(4):
+            controller.record(0.5, 404, 4)
+        self.assertEqual((controller.limit, controller.history[-1].reason),
+                         (2, "latency"))
+        for _ in range(20):
+            controller.record(5, 200, 4)
+        self.assertEqual(controller.limit, 1)
+
+        with self.assertRaises(ValueError):
+            cc.AimdController(initial=8, max_limit=4)
+
+
+class TestAdaptiveCrawl(unittest.TestCase):
+    """Tests both engines against a site that fails when overloaded."""
+
+    def test_crawl_adapts_to_overload(self):
+        """Tests if the 503 answers of an overloaded site cut the limit."""
+        server = fx.serve(DummyFragileHandler)
+        domain = server.url
+        try:
+            for engine in ("run", "run_async"):
+                DummyFragileHandler.peak = 0
+                controller = cc.AimdController(
+                    initial=8, max_limit=8, min_window=4)
+                crawler = cw.Crawler(
+                    domain + "/", req_limit=1000,
+                    scheduler=fx.fast_scheduler(rate=1e4, burst=1000))
+                getattr(crawler, engine)(controller)
+
+                reasons = {d.reason for d in controller.history}
+                self.assertIn("errors", reasons)
+                self.assertLess(controller.limit, 8)
+                self.assertLessEqual(DummyFragileHandler.peak, 8)
+                self.assertEqual(
+                    crawler.stats()["gauges"]["concurrency_limit"],
+                    controller.limit)
+                self.assertGreater(len(crawler.visited_urls), 0)
+        finally:
+            fx.stop(server)
+
+
+class DummyFragileHandler(http.server.BaseHTTPRequestHandler):
+    """Home linking to 'n_pages' pages, answering 503 beyond 'capacity'."""
+
+    n_pages = 80
+    capacity = 3
+    active = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def do_GET(self):
+        cls = type(self)
+        with cls.lock:
+            cls.active += 1
+            cls.peak = max(cls.peak, cls.active)
+            overloaded = cls.active > self.capacity
+        try:
+            time.sleep(0.01)
+            if overloaded:
+                self.send_error(503)
+                return
+            body = "<html><title>Page</title><body>{}</body></html>".format(
+                "".join('<a href="/p{}">x</a>'.format(i)
+                        for i in range(self.n_pages)) if self.path == "/" else "")
+            body = body.encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html")
+            self.send_header("Content-Length", len(body))
+            self.end_headers()
+            self.wfile.write(body)
+        finally:
+            with cls.lock:
+                cls.active -= 1
+
+    def log_message(self, *args):
+        pass
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -103,7 +103,7 @@ class TestCrawlerLogic(unittest.TestCase):
         """Tests the basic patterns expected on this simple crawler result."""
         crawler = self.crawler
         self.assertTrue(len(crawler.visited_urls) > 0)
-        self.assertTrue(len(crawler.inner_urls) > 0)
+        self.assertTrue(len(crawler._frontier.seen) > len(crawler.visited_urls))
         self.assertTrue(len(crawler.other_pages) > 0)
 
     def test_export_csv(self):
@@ -116,13 +116,6 @@ class TestCrawlerLogic(unittest.TestCase):
         os.remove(filepath)
         self.assertFalse(os.path.exists(filepath))
 
-    def test_get_unvisited_urls(self):
-        """Tests method to retrieve the unvisited URLs."""
-        page = self.crawler.root_page
-        unvisited = self.crawler._get_unvisited_urls(page.child_urls)
-        self.assertTrue(unvisited.isdisjoint(self.crawler.visited_urls))
-        self.assertTrue(unvisited.isdisjoint(self.crawler.invalid_urls))
-
     def test_thread_manager(self):
         operations = ["op{}".format(i) for i in range(6)]
         dummy = DummyThreadingTester(operations, sleeptime=0.1)
@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 17:42:25 2026
+
+@author: Carlos
+"""
+
+import os
+import sys
+import unittest
+
+sys.path.append(os.path.dirname(os.path.realpath(__file__)) + "/../crawler")
+
+import distributed as ds
+import fixtures as fx
+from async_unit_tests import DummySiteHandler
+
+
+def is_target(page):
+    """bool: module level, so it can be sent to the node processes."""
+    return page.valid_target
+
+
+class TestDistributedCrawl(fx.ServerTestCase):
+    """Tests the coordinator and the local multi-process backend."""
+
+    handler = "DummySiteHandler"
+
+    def test_shards(self):
+        """Tests if the shards are stable and spread the URLs."""
+        urls = ["http://a.com/p{}".format(i) for i in range(1000)]
+        shards = [ds.shard_of(url, 4, "url") for url in urls]
+        self.assertEqual(shards, [ds.shard_of(url, 4, "url") for url in urls])
+        self.assertEqual(set(shards), {0, 1, 2, 3})
+        self.assertEqual({ds.shard_of(url, 4, "host") for url in urls},
+                         {ds.shard_of("a.com", 4, "host")})
+        with self.assertRaises(ValueError):
+            ds.shard_of(urls[0], 4, "path")
+
+    def test_coordinator(self):
+        """Tests the budget leases and the detection of the end."""
+        coordinator = ds.Coordinator(2, req_limit=10)
+        self.assertEqual(coordinator.acquire(8), 8)
+        self.assertEqual(coordinator.acquire(8), 2)
+        coordinator.idle(0, unused=3)
+        coordinator.send(0, [("http://a.com/p1", "")])
+        coordinator.idle(1)
+        self.assertTrue(coordinator.finished())  # the budget is spent
+
+        coordinator = ds.Coordinator(2, req_limit=10)
+        coordinator.idle(0)
+        coordinator.send(0, [("http://a.com/p1", "")])
+        coordinator.idle(1)
+        self.assertFalse(coordinator.finished())  # a batch is in transit
+        self.assertEqual(coordinator.receive(0), [("http://a.com/p1", "")])
+        self.assertFalse(coordinator.finished())  # node 0 is busy with it
+        coordinator.idle(0)
+        self.assertTrue(coordinator.finished())
+
+    def test_local_crawl(self):
+        """Tests if the nodes split the site and visit each page once."""
+        reports = ds.crawl_local(
+            self.domain + "/p0", n_nodes=2, req_limit=1000, concurrency=4,
+            indentify_target=is_target,
+            scheduler=fx.fast_scheduler())
+
+        visited = [report["stats"]["visited"] for report in reports]
+        targets = [page.url for report in reports
+                   for page in report["target_pages"]]
+        self.assertEqual(len(reports), 2)
+        self.assertEqual(sum(visited), DummySiteHandler.n_pages)
+        self.assertTrue(all(visited))
+        self.assertEqual(len(set(targets)), DummySiteHandler.n_pages/2)
+        requests = [report["stats"]["requests"] for report in reports]
+        self.assertEqual(sum(requests), DummySiteHandler.n_pages + 2)  # robots
+
+    def test_global_budget(self):
+        """Tests if the request limit holds for the whole crawl."""
+        reports = ds.crawl_local(
+            self.domain + "/p0", n_nodes=2, req_limit=12, concurrency=2,
+            shard_by="url", lease=4,
+            scheduler=fx.fast_scheduler())
+        visited = sum(report["stats"]["visited"] for report in reports)
+        requests = sum(report["stats"]["requests"] for report in reports)
+        self.assertLessEqual(requests, 12)
+        self.assertEqual(requests, visited + 2)  # with the two robots.txt
+        self.assertGreaterEqual(requests, 12 - 2*4)
+
+    def test_host_shards_warn(self):
+        """Tests the warning of a single domain crawl sharded by host."""
+        coordinator = ds.Coordinator(2, req_limit=10)
+        with self.assertWarns(UserWarning):
+            ds.DistributedCrawler(self.domain + "/p0", coordinator, 0,
+                                  shard_by="host")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 17:21:41 2026
+
+@author: Carlos
+"""
+
+import os
+import sys
+import unittest
+
+import bs4
+
+sys.path.append(os.path.dirname(os.path.realpath(__file__)) + "/../crawler")
+
+import extractor
+
+
+class TestStreamExtractor(unittest.TestCase):
+    """Tests the single pass extractor against the BeautifulSoup tree."""
+
+    html = """<html><head><meta charset="iso-8859-1">
+        <title>Perfume &amp; Co</title><base href="/shop/"></head><body>
+        <a href="/a">A</a><a name="no-href">B</a><a href="/b"/>
+        <div class="box"><div class="productName big">Eau <b>de</b>
+        Toilette <div>Fran\xe7aise</div></div></div>
+        <div class="productName">Second</div>
+        </body></html>""".encode("iso-8859-1")
+
+    def test_matches_soup(self):
+        """Tests if the extraction matches the bs4 lookups of WebPage."""
+        soup = bs4.BeautifulSoup(self.html, "html.parser")
+        result = extractor.extract(self.html, "div", "productName", chunk_size=16)
+
+        div = soup.find("div", {"class": "productName"})
+        hrefs = [url["href"] for url in soup.find_all("a", href=True)]
+        self.assertEqual(result.title, soup.find("title").text)
+        self.assertEqual(result.target_name, div.text)
+        self.assertEqual(result.hrefs, hrefs)
+        self.assertEqual(result.anchor_texts, ["A", ""])
+        self.assertEqual(result.base_href, soup.find("base")["href"])
+
+    def test_missing_target(self):
+        """Tests if a page without the target yields None."""
+        result = extractor.extract(self.html, "span", "productName")
+        self.assertIsNone(result.target_name)
+
+    def test_sniff_encoding(self):
+        """Tests if the charset is read from the header before the html."""
+        self.assertEqual(extractor.sniff_encoding(self.html), "iso8859-1")
+        self.assertEqual(
+            extractor.sniff_encoding(self.html, "text/html; charset=UTF-8"),
+            "utf-8")
+        self.assertEqual(extractor.sniff_encoding(b"<html>"), "utf-8")
+
+
+if __name__ == "__main__":
+    unittest.main()
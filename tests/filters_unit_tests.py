@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 17:54:00 2026
+
+@author: Carlos
+"""
+
+import os
+import sys
+import unittest
+import http.server
+
+sys.path.append(os.path.dirname(os.path.realpath(__file__)) + "/../crawler")
+
+import crawler as cw
+import filters as ft
+import fixtures as fx
+
+
+class TestContentFilter(unittest.TestCase):
+    """Tests the filtering of the links and responses that aren't html."""
+
+    def test_checks(self):
+        """Tests the extension and Content-Type checks."""
+        content_filter = ft.ContentFilter()
+        self.assertEqual(content_filter.check_url("https://a.com/f/Doc.PDF?x=1"),
+                         "extension")
+        self.assertIsNone(content_filter.check_url("https://a.com/v1.2/page"))
+        self.assertIsNone(content_filter.check_url("https://a.com/index.html"))
+
+        self.assertIsNone(content_filter.check_headers(
+            {"Content-Type": "text/html; charset=utf-8"}))
+        self.assertIsNone(content_filter.check_headers({}))
+        self.assertEqual(content_filter.check_headers(
+            {"Content-Type": "application/rss+xml"}), "content_type")
+
+    def test_crawl_skips_files(self):
+        """Tests if files are skipped with a reason and big pages cut."""
+        server = fx.serve(DummyFilesHandler)
+        domain = server.url
+        try:
+            for engine in ("run", "run_async"):
+                crawler = cw.Crawler(
+                    domain + "/", req_limit=100,
+                    content_filter=ft.ContentFilter(max_bytes=1000),
+                    scheduler=fx.fast_scheduler())
+                getattr(crawler, engine)(2)
+
+                self.assertEqual(crawler.skipped, {
+                    domain + "/report.pdf": "extension",
+                    domain + "/feed": "content_type"})
+                self.assertEqual(set(crawler.target_pages),
+                                 {domain + "/big", domain + "/page"})
+                self.assertEqual(len(crawler.invalid_urls), 0)
+                counters = crawler.stats()["counters"]
+                self.assertEqual(counters["truncated"], 1)
+                self.assertEqual(counters["skipped_content_type"], 1)
+        finally:
+            fx.stop(server)
+
+
+class DummyFilesHandler(http.server.BaseHTTPRequestHandler):
+    """Site linking to a pdf, a feed and a page bigger than the limit."""
+
+    domain = ""
+
+    def do_GET(self):
+        content_type = "text/html"
+        if self.path == "/":
+            body = "<html><title>Root</title><body>{}</body></html>".format(
+                "".join('<a href="{}{}">x</a>'.format(self.domain, link)
+                        for link in ("/report.pdf", "/feed", "/big", "/page")))
+        elif self.path == "/feed":
+            body = "<rss>{}</rss>".format("<item/>"*10000)
+            content_type = "application/rss+xml"
+        elif self.path == "/big":
+            body = "<html><title>Big</title><body>{}</body></html>".format(
+                "<p>filler</p>"*10000)
+        elif self.path == "/page":
+            body = "<html><title>Page</title></html>"
+        else:
+            self.send_error(404)
+            return
+        body = body.encode()
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", len(body))
+        self.end_headers()
+        try:
+            self.wfile.write(body)
+        except OSError:
+            pass  # the crawler hung up early
+
+    def log_message(self, *args):
+        pass
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 17:45:11 2026
+
+@author: Carlos
+"""
+
+import os
+import sys
+import random
+import unittest
+import http.server
+
+sys.path.append(os.path.dirname(os.path.realpath(__file__)) + "/../crawler")
+
+import crawler as cw
+import fingerprint as fp
+import fixtures as fx
+
+
+def article(seed, extra=""):
+    """bytes: html page with a few hundred random words."""
+    rng = random.Random(seed)
+    words = " ".join(
+        "".join(rng.choice("abcdefghij") for _ in range(6)) for _ in range(400))
+    return "<html><title>Article</title><body><p>{}</p>{}</body></html>".format(
+        words, extra).encode()
+
+
+class TestContentFingerprint(fx.ServerTestCase):
+    """Tests the fingerprints and the crawl of duplicated pages."""
+
+    handler = "DummyDuplicatesHandler"
+
+    def test_simhash_distance(self):
+        """Tests if small edits keep the SimHash close and new text doesn't."""
+        page = fp.simhash(article(1))
+        edited = fp.simhash(article(1, "<span>Sorted by price</span>"))
+        other = fp.simhash(article(2))
+        self.assertLessEqual(bin(page ^ edited).count("1"), 3)
+        self.assertGreater(bin(page ^ other).count("1"), 10)
+        self.assertEqual(fp.simhash(b"<b>Same</b> text"),
+                         fp.simhash(b"<i>Same</i>   text"))
+
+    def test_content_index(self):
+        """Tests if the first page of a content is the canonical one."""
+        index = fp.ContentIndex(max_distance=3)
+        self.assertIsNone(index.add("/a", article(1)))
+        self.assertEqual(index.add("/a?utm=x", article(1)), "/a")
+        self.assertEqual(index.add("/a?sort=price", article(1, "sorted")), "/a")
+        self.assertIsNone(index.add("/b", article(2)))
+
+        self.assertIsNone(fp.simhash(b"<img src='a.png'>"))
+        self.assertIsNone(index.add("/gallery", b"<img src='a.png'>"))
+        self.assertIsNone(index.add("/photos", b"<img src='b.png'>"))
+        self.assertEqual(index.add("/gallery?p=1", b"<img src='a.png'>"),
+                         "/gallery")
+
+        exact = fp.ContentIndex(max_distance=0)
+        exact.add("/a", article(1))
+        self.assertIsNone(exact.add("/a?sort=price", article(1, "sorted")))
+
+    def test_crawl_skips_duplicates(self):
+        """Tests if duplicates are reported as aliases and not parsed."""
+        items = {self.domain + path
+                 for path in ("/item", "/item?utm=mail", "/item?sort=asc")}
+        for dedupe, copies in (("exact", items),
+                               ("near", items | {self.domain + "/printable"})):
+            n_aliases = len(copies) - 1
+            crawler = cw.Crawler(
+                self.domain + "/", req_limit=100, dedupe=dedupe,
+                scheduler=fx.fast_scheduler())
+            crawler.run_async(1)
+
+            self.assertEqual(len(crawler.aliases), n_aliases)
+            canonical = set(crawler.aliases.values())
+            self.assertEqual(len(canonical), 1)  # the first copy visited
+            self.assertEqual(set(crawler.aliases) | canonical, copies)
+            self.assertEqual(
+                crawler.stats()["phases"]["parse"]["count"], 5 - n_aliases)
+            self.assertIn(self.domain + "/unique", crawler.target_pages)
+
+
+class DummyDuplicatesHandler(http.server.BaseHTTPRequestHandler):
+    """Root page linking to an item under several URLs, plus a near copy."""
+
+    domain = ""
+
+    def do_GET(self):
+        if self.path == "/":
+            links = ["/item", "/item?utm=mail", "/item?sort=asc", "/printable",
+                     "/unique"]
+            body = "<html><title>Root</title><body>{}</body></html>".format(
+                "".join('<a href="{}{}">x</a>'.format(self.domain, link)
+                        for link in links))
+            body = body.encode()
+        elif self.path.startswith("/item"):
+            body = article(1)
+        elif self.path == "/printable":
+            body = article(1, "<span>Printed on 2026-10-20</span>")
+        elif self.path == "/unique":
+            body = article(2)
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Length", len(body))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 18:31:43 2026
+
+@author: Carlos
+"""
+
+import os
+import sys
+import unittest
+
+sys.path.append(os.path.dirname(os.path.realpath(__file__)) + "/../crawler")
+sys.path.append(os.path.dirname(os.path.realpath(__file__)) + "/../benchmarks")
+
+import transport as tp
+from scheduler import PolitenessScheduler
+from site_server import LocalServer
+
+
+def fast_scheduler(rate=1000, burst=100):
+    """PolitenessScheduler: a scheduler that barely waits on local servers."""
+    return PolitenessScheduler(rate=rate, burst=burst)
+
+
+def serve(handler):
+    """LocalServer: a started local server of the handler class."""
+    server = LocalServer(handler)
+    server.start()
+    return server
+
+
+def stop(server):
+    """Closes the connections of the shared transport and stops the server."""
+    tp.get_default_transport().close()
+    server.stop()
+
+
+class ServerTestCase(unittest.TestCase):
+    """Tests sharing a local server, served at 'domain'.
+    Note:
+        'handler' names the handler class of the test module, which is
+        usually defined after the tests.
+    """
+
+    handler = None
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = serve(getattr(sys.modules[cls.__module__], cls.handler))
+        cls.domain = cls.server.url
+
+    @classmethod
+    def tearDownClass(cls):
+        stop(cls.server)
+
+    @staticmethod
+    def fast():
+        """PolitenessScheduler: scheduler that doesn't hold the tests back."""
+        return fast_scheduler()
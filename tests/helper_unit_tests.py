@@ -31,6 +31,25 @@ class TestHelperFunctions(unittest.TestCase):
         self.assertEqual(h.get_domain(https_string), no_protocol_string)
         self.assertEqual(h.get_domain(no_protocol_string), no_protocol_string)
 
+    def test_resolve_links(self):
+        """Tests if relative, absolute and foreign links are resolved."""
+        links = [("b?x=1", "B"), ("../up", ""), ("/root", "Root"),
+                 (" //Example.com/net ", ""), ("http://example.com/a b", ""),
+                 ("#top", ""), ("mailto:me@example.com", ""),
+                 ("https://other.com/c", "")]
+        resolved = h.resolve_links("http://example.com/dir/page", links,
+                                   "example.com")
+        self.assertEqual(resolved, [
+            ("http://example.com/dir/b?x=1", "B"),
+            ("http://example.com/up", ""),
+            ("http://example.com/root", "Root"),
+            ("http://Example.com/net", ""),
+            ("http://example.com/a%20b", "")])
+
+        based = h.resolve_links("http://example.com/base/", [("b", "")],
+                                "example.com")
+        self.assertEqual(based, [("http://example.com/base/b", "")])
+
     def test_simple_string_helpers(self):
         """Tests the simple helper functions as adding extension and route."""
         domain = "mydomain.com"
@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 17:32:20 2026
+
+@author: Carlos
+"""
+
+import os
+import sys
+import unittest
+
+sys.path.append(os.path.dirname(os.path.realpath(__file__)) + "/../crawler")
+
+from metrics import Histogram, CrawlMetrics
+
+
+class TestMetrics(unittest.TestCase):
+    """Tests the histograms and the crawl metrics."""
+
+    def test_histogram_quantiles(self):
+        """Tests if the quantiles fall on the right buckets."""
+        histogram = Histogram(bounds=(0.1, 1.0, 10.0))
+        self.assertIsNone(histogram.quantile(0.5))
+        for value in [0.05]*90 + [0.5]*9 + [50]:
+            histogram.observe(value)
+        self.assertEqual(histogram.quantile(0.5), 0.1)
+        self.assertEqual(histogram.quantile(0.95), 1.0)
+        self.assertEqual(histogram.quantile(0.999), float("inf"))
+        self.assertEqual(histogram.summary()["count"], 100)
+
+    def test_prometheus_format(self):
+        """Tests if the buckets are cumulative and every metric exported."""
+        metrics = CrawlMetrics()
+        metrics.observe_all({"ttfb": 0.02, "parse": 0.002})
+        metrics.observe("ttfb", 0.2)
+        metrics.increment("pages", 2)
+        metrics.error("http_503")
+        metrics.add_gauge("in_flight", 3)
+        text = metrics.prometheus()
+        self.assertIn('crawler_phase_seconds_bucket{phase="ttfb",le="0.025"} 1',
+                      text)
+        self.assertIn('crawler_phase_seconds_bucket{phase="ttfb",le="+Inf"} 2',
+                      text)
+        self.assertIn("crawler_pages_total 2", text)
+        self.assertIn('crawler_errors_total{type="http_503"} 1', text)
+        self.assertIn("crawler_in_flight 3", text)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 18:00:48 2026
+
+@author: Carlos
+"""
+
+import os
+import sys
+import time
+import unittest
+import threading
+import http.server
+
+sys.path.append(os.path.dirname(os.path.realpath(__file__)) + "/../crawler")
+
+import url_store as us
+import multidomain as md
+import fixtures as fx
+
+
+class TestHostFrontier(unittest.TestCase):
+    """Tests the fair order of the per-host frontier."""
+
+    def test_round_robin_and_weights(self):
+        """Tests if the hosts take turns, the weighted ones for longer."""
+        frontier = us.HostFrontier(weights={"b.com": 2}, max_per_host=10)
+        for host in ("a.com", "b.com", "c.com"):
+            frontier.extend("https://{}/{}".format(host, i) for i in range(4))
+        frontier.extend(["https://a.com/0"])
+        self.assertEqual(len(frontier), 12)
+
+        hosts = [frontier.pop().split("/")[2] for _ in range(8)]
+        self.assertEqual(hosts, ["a.com", "b.com", "b.com", "c.com",
+                                 "a.com", "b.com", "b.com", "c.com"])
+        self.assertEqual(sorted(frontier), [
+            "https://a.com/2", "https://a.com/3",
+            "https://c.com/2", "https://c.com/3"])
+
+    def test_caps_and_waits(self):
+        """Tests if busy and waiting hosts are passed over."""
+        waits = {"slow.com": 5}
+        frontier = us.HostFrontier(
+            max_per_host=1, wait_time=lambda host: waits.get(host, 0))
+        frontier.extend(["https://slow.com/0", "https://slow.com/1",
+                         "https://a.com/0", "https://a.com/1"])
+
+        self.assertEqual(frontier.pop(), "https://a.com/0")
+        self.assertEqual(frontier.pop(), "https://slow.com/0")
+        self.assertFalse(frontier.ready())
+        with self.assertRaises(IndexError):
+            frontier.pop()
+
+        frontier.learn("https://a.com/0", True)
+        self.assertTrue(frontier.ready())
+        self.assertEqual(frontier.pop(), "https://a.com/1")
+        frontier.requeue("https://slow.com/0")
+        self.assertTrue(frontier.ready())
+        self.assertEqual(len(frontier), 2)
+
+
+class TestMultiDomainCrawler(unittest.TestCase):
+    """Tests a crawl of several local sites, one of them slow."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.servers = []
+        cls.domains = []
+        for delay in (0, 0, 0.2):
+            handler = type("Handler", (DummyShopHandler,), {
+                "delay": delay, "active": 0, "peak": 0,
+                "lock": threading.Lock()})
+            server = fx.serve(handler)
+            cls.servers.append(server)
+            cls.domains.append(server.url)
+
+    @classmethod
+    def tearDownClass(cls):
+        for server in cls.servers:
+            fx.stop(server)
+
+    def test_crawls_every_domain(self):
+        """Tests if every domain is crawled with the per-host cap."""
+        crawler = md.MultiDomainCrawler(
+            [domain + "/" for domain in self.domains], max_per_host=2,
+            req_limit=1000, scheduler=fx.fast_scheduler(),
+            indentify_target=lambda page: "/p" in page.url)
+        start = time.monotonic()
+        crawler.run_async(8)
+
+        results = crawler.results_by_domain()
+        self.assertEqual(len(results), 3)
+        for domain in results.values():
+            self.assertEqual(len(domain["targets"]), DummyShopHandler.n_pages)
+            self.assertEqual(len(domain["others"]), 1)
+        self.assertEqual(len(crawler.visited_urls),
+                         3*(DummyShopHandler.n_pages + 1))
+        for server in self.servers:
+            self.assertLessEqual(server.handler.peak, 2)
+
+        # The slow host takes 2 slots for 11 x 0.2 s, the others go along
+        self.assertLess(time.monotonic() - start, 11*0.2/2 + 1)
+
+    def test_run_is_not_supported(self):
+        """Tests if the level by level engine is refused."""
+        crawler = md.MultiDomainCrawler(self.domains[:1])
+        with self.assertRaises(NotImplementedError):
+            crawler.run(2)
+
+
+class DummyShopHandler(http.server.BaseHTTPRequestHandler):
+    """Serves a home page linking to 'n_pages' products, after 'delay'."""
+
+    n_pages = 10
+    delay = 0
+    active = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def do_GET(self):
+        cls = type(self)
+        with cls.lock:
+            cls.active += 1
+            cls.peak = max(cls.peak, cls.active)
+        try:
+            time.sleep(self.delay)
+            if self.path == "/":
+                body = "".join('<a href="/p{}">product</a>'.format(i)
+                               for i in range(self.n_pages))
+            elif self.path.startswith("/p"):
+                body = '<a href="/">home</a>'
+            else:
+                self.send_error(404)
+                return
+            body = "<html><title>Shop</title><body>{}</body></html>".format(
+                body).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html")
+            self.send_header("Content-Length", len(body))
+            self.end_headers()
+            self.wfile.write(body)
+        finally:
+            with cls.lock:
+                cls.active -= 1
+
+    def log_message(self, *args):
+        pass
+
+
+if __name__ == "__main__":
+    unittest.main()
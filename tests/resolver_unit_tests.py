@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 18:03:16 2026
+
+@author: Carlos
+"""
+
+import os
+import sys
+import socket
+import unittest
+import http.server
+
+sys.path.append(os.path.dirname(os.path.realpath(__file__)) + "/../crawler")
+
+import resolver as rs
+import transport as tp
+import fixtures as fx
+
+
+class TestDnsCache(unittest.TestCase):
+    """Tests the shared cache of host addresses."""
+
+    def test_cache_and_ttl(self):
+        """Tests if the addresses are reused until they expire."""
+        cache = rs.DnsCache()
+        addresses = cache.resolve("localhost", 80)
+        self.assertEqual(cache.resolve("localhost", 80), addresses)
+        self.assertEqual((cache.misses, cache.hits), (1, 1))
+
+        cache = rs.DnsCache(ttl=0)
+        cache.resolve("localhost", 80)
+        cache.resolve("localhost", 80)
+        self.assertEqual((cache.misses, cache.hits), (2, 0))
+
+    def test_negative_cache(self):
+        """Tests if a failed lookup is kept and raised again."""
+        cache = rs.DnsCache()
+        for _ in range(2):
+            with self.assertRaises(socket.gaierror):
+                cache.resolve("localhost", "no-such-service")
+        self.assertEqual((cache.misses, cache.hits), (1, 1))
+
+    def test_prefetch(self):
+        """Tests if a prefetched host is answered from the cache."""
+        cache = rs.DnsCache()
+        future = cache.prefetch("localhost", 443)
+        self.assertGreaterEqual(future.result(), 0)
+        self.assertIsNone(cache.prefetch("localhost", 443))
+        cache.resolve("localhost", 443)
+        self.assertEqual((cache.misses, cache.hits), (1, 1))
+
+        cache.pin("shop.test", "127.0.0.1")
+        self.assertIsNone(cache.prefetch("shop.test", 80))
+
+    def test_endpoint(self):
+        """Tests the host and port a url connects to."""
+        self.assertEqual(rs.endpoint("https://Shop.com/a"), ("shop.com", 443))
+        self.assertEqual(rs.endpoint("http://shop.com:81/"), ("shop.com", 81))
+        self.assertIsNone(rs.endpoint("mailto:me@shop.com"))
+
+    def test_pinned_host(self):
+        """Tests if a pinned test domain reaches the local server."""
+        server = fx.serve(DummyHandler)
+        try:
+            cache = rs.DnsCache()
+            cache.pin("shop.test", ["127.0.0.1"])
+            transport = tp.Transport(resolver=cache)
+            response = transport.get(
+                "http://shop.test:{}/".format(server.port))
+            self.assertEqual(response.body, b"shop.test")
+            self.assertEqual(cache.misses, 0)
+            transport.close()
+        finally:
+            fx.stop(server)
+
+
+class DummyHandler(http.server.BaseHTTPRequestHandler):
+    """Answers with the host the request was sent to."""
+
+    def do_GET(self):
+        body = self.headers["Host"].split(":")[0].encode()
+        self.send_response(200)
+        self.send_header("Content-Length", len(body))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 17:57:21 2026
+
+@author: Carlos
+"""
+
+import os
+import sys
+import pickle
+import unittest
+
+import bs4
+
+sys.path.append(os.path.dirname(os.path.realpath(__file__)) + "/../crawler")
+
+import rules as rl
+import webpage as wp
+import transport as tp
+
+
+class TestExtractionRules(unittest.TestCase):
+    """Tests the compiled extraction rules."""
+
+    html = b"""<html><head><title>Eau de Toilette</title>
+        <meta property="product:brand" content="Maison">
+        <script type="application/ld+json">
+        {"sku": "ET-100", "availability": "https://schema.org/InStock"}
+        </script></head><body>
+        <span class="price">Was 50</span>
+        <div class="product main"><h1>Eau</h1>
+          <p>Price: <span class="price big">$ 39.90</span></p>
+          <span itemprop="sku" content="ET-100">ET 100</span>
+        </div></body></html>"""
+
+    rules = rl.RuleSet([
+        rl.Rule("price", "div.product span.price", regex=r"([\d.]+)"),
+        rl.Rule("sku", "[itemprop=sku]", attribute="content"),
+        rl.Rule("brand", 'meta[property="product:brand"]', attribute="content"),
+        rl.Rule("availability", regex=r'"availability":\s*"[^"]*/(\w+)"'),
+        rl.Rule("color", "span.color"),
+    ])
+
+    def test_extract(self):
+        """Tests if every field is found in a single pass."""
+        fields = self.rules.extract(self.html)
+        self.assertEqual(fields, {
+            "price": "39.90", "sku": "ET-100", "brand": "Maison",
+            "availability": "InStock", "color": None})
+
+        soup = bs4.BeautifulSoup(self.html, "html.parser")
+        self.assertEqual(soup.select_one("div.product span.price").text,
+                         "$ 39.90")
+        self.assertEqual(fields, pickle.loads(pickle.dumps(self.rules)).extract(
+            self.html))
+
+    def test_regex_tries_next_element(self):
+        """Tests if an element rejected by the regex isn't the value."""
+        rules = rl.RuleSet([rl.Rule("price", "span.price", regex=r"\$ ([\d.]+)")])
+        self.assertEqual(rules.extract(self.html), {"price": "39.90"})
+
+    def test_prefilter(self):
+        """Tests if the pages without the prefilter bytes aren't parsed."""
+        self.assertEqual(self.rules.rules[4].prefilter, b"color")
+        page = b"<html><body><span class='price'>10</span></body></html>"
+        candidates = [rule.name for rule in self.rules.candidates(page)]
+        self.assertEqual(candidates, ["price", "availability"])
+        self.assertIsNone(self.rules.matcher(b"<html>Nothing here</html>"))
+        self.assertEqual(set(self.rules.extract(b"<html></html>").values()),
+                         {None})
+
+    def test_repeated_classes(self):
+        """Tests if an element repeating a class is matched once."""
+        html = b'<div><span class="price price">12</span></div>'
+        rules = rl.RuleSet([rl.Rule("price", "span.price")])
+        self.assertEqual(rules.extract(html), {"price": "12"})
+        soup = bs4.BeautifulSoup(html, "html.parser")
+        self.assertEqual(rules.extract_tree(soup, html), {"price": "12"})
+
+    def test_quoted_values(self):
+        """Tests if a quoted attribute value may hold spaces."""
+        rules = rl.RuleSet([rl.Rule("label", 'div [title="a b"]')])
+        html = b'<div><i title="a">x</i><i title="a b">y</i></div>'
+        self.assertEqual(rules.extract(html), {"label": "y"})
+
+    def test_invalid_rules(self):
+        """Tests if invalid selectors and rule sets are refused."""
+        with self.assertRaises(ValueError):
+            rl.Rule("x", "div > span")
+        with self.assertRaises(ValueError):
+            rl.Rule("x")
+        with self.assertRaises(ValueError):
+            rl.RuleSet([rl.Rule("x", "a"), rl.Rule("x", "b")])
+
+    def test_both_parsers(self):
+        """Tests if the soup and stream pages get the same fields."""
+        for parser in ("soup", "stream"):
+            response = tp.Response(
+                "https://shop.com/p", 200, {"Content-Type": "text/html"},
+                self.html)
+            page = wp.WebPage("https://shop.com/p", parser=parser,
+                              response=response, rules=self.rules)
+            self.assertEqual(page.fields["price"], "39.90")
+            self.assertEqual(page.record().fields, page.fields)
+
+        html = b"""<html><head><!-- {"sku": 0} -->
+            <script type="application/ld+json">{"sku": 1}</script>
+            </head></html>"""
+        rules = rl.RuleSet([rl.Rule("json", "script[type=application/ld+json]")])
+        fields = []
+        for parser in ("soup", "stream"):
+            response = tp.Response(
+                "https://shop.com/p", 200, {"Content-Type": "text/html"}, html)
+            fields.append(wp.WebPage("https://shop.com/p", parser=parser,
+                                     response=response, rules=rules).fields)
+        self.assertEqual(fields, [{"json": '{"sku": 1}'}]*2)
+
+        page = wp.WebPage("https://shop.com/p", response=tp.Response(
+            "https://shop.com/p", 200, {}, self.html))
+        self.assertIsNone(page.record().fields)
+
+
+if __name__ == "__main__":
+    unittest.main()
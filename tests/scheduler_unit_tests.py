@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 17:20:40 2026
+
+@author: Carlos
+"""
+
+import os
+import sys
+import time
+import unittest
+import email.utils
+
+sys.path.append(os.path.dirname(os.path.realpath(__file__)) + "/../crawler")
+
+from scheduler import TokenBucket, PolitenessScheduler
+
+
+class TestPolitenessScheduler(unittest.TestCase):
+    """Tests the token buckets and the per-host rate adaptation."""
+
+    def test_token_bucket(self):
+        """Tests if the burst is free and the next requests are spaced."""
+        bucket = TokenBucket(rate=10, burst=3)
+        delays = [bucket.reserve() for _ in range(5)]
+        self.assertEqual(delays[:3], [0, 0, 0])
+        self.assertAlmostEqual(delays[3], 0.1, places=2)
+        self.assertAlmostEqual(delays[4], 0.2, places=2)
+
+    def test_wait_time(self):
+        """Tests if the wait is peeked without taking a token."""
+        bucket = TokenBucket(rate=10, burst=1)
+        self.assertEqual(bucket.wait_time(), 0)
+        self.assertEqual(bucket.reserve(), 0)
+        self.assertAlmostEqual(bucket.wait_time(), 0.1, places=2)
+        self.assertAlmostEqual(bucket.wait_time(), 0.1, places=2)
+        self.assertAlmostEqual(bucket.reserve(), 0.1, places=2)
+
+    def test_crawl_delay(self):
+        """Tests if the Crawl-delay caps the rate and removes the burst."""
+        scheduler = PolitenessScheduler(rate=10, burst=5)
+        scheduler.set_crawl_delay("a.com", 2)
+        self.assertEqual(scheduler.host_rate("a.com"), 0.5)
+        self.assertEqual(scheduler.delay("a.com"), 0)
+        self.assertAlmostEqual(scheduler.delay("a.com"), 2, places=2)
+        self.assertEqual(scheduler.host_rate("b.com"), 10)
+
+    def test_backoff_and_recovery(self):
+        """Tests if a spike of throttling answers cuts the rate once and
+        successes restore it.
+        """
+        scheduler = PolitenessScheduler(
+            rate=8, backoff=0.5, recovery=2, window=10, threshold=0.2)
+        scheduler.feedback("a.com", 429)
+        self.assertEqual(scheduler.host_rate("a.com"), 8)  # a single sample
+
+        for _ in range(3):
+            scheduler.feedback("a.com", 200)
+        scheduler.feedback("a.com", None)
+        self.assertEqual(scheduler.host_rate("a.com"), 4)
+        for _ in range(5):
+            scheduler.feedback("a.com", 429)
+        self.assertEqual(scheduler.host_rate("a.com"), 4)  # cooldown
+
+        for _ in range(5):
+            scheduler.feedback("a.com", 503)
+        self.assertEqual(scheduler.host_rate("a.com"), 2)  # next window
+
+        for _ in range(3):
+            scheduler.feedback("a.com", 200)
+        self.assertEqual(scheduler.host_rate("a.com"), 8)
+
+    def test_retry_after(self):
+        """Tests if a Retry-After header pauses the host."""
+        scheduler = PolitenessScheduler(rate=100, burst=10)
+        scheduler.feedback("a.com", 503, retry_after="3")
+        self.assertGreater(scheduler.delay("a.com"), 2.9)
+        self.assertEqual(scheduler.delay("b.com"), 0)
+
+        date = email.utils.formatdate(time.time() + 60, usegmt=True)
+        scheduler.feedback("c.com", 429, retry_after=date)
+        self.assertGreater(scheduler.delay("c.com"), 50)
+
+
+if __name__ == "__main__":
+    unittest.main()
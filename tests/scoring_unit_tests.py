@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 17:36:47 2026
+
+@author: Carlos
+"""
+
+import os
+import sys
+import unittest
+
+sys.path.append(os.path.dirname(os.path.realpath(__file__)) + "/../crawler")
+
+import url_store as us
+from scoring import LinkContext, NaiveBayesScorer, link_features
+
+
+class TestPriorityFrontier(unittest.TestCase):
+    """Tests the link scorer and the frontier ordered by it."""
+
+    @staticmethod
+    def links(url):
+        """dict: links of a shop where the products are under '/item'."""
+        if "/item/" in url or "/blog/" in url:
+            return {}
+        number = int(url.rsplit("/", 1)[1])
+        links = {"/blog/{}-{}".format(number, i): "Read more"
+                 for i in range(8)}
+        links.update({"/item/{}-{}".format(number, i): "Buy now"
+                      for i in range(2)})
+        links["/c/{}".format(number + 1)] = "Next"
+        return links
+
+    def crawl(self, frontier, budget):
+        """int: number of targets found visiting 'budget' pages."""
+        frontier.push("/c/0")
+        targets = 0
+        for _ in range(budget):
+            url = frontier.pop()
+            is_target = "/item/" in url
+            targets += is_target
+            for child, text in self.links(url).items():
+                frontier.push(child, text, url)
+            frontier.learn(url, is_target)
+        return targets
+
+    def test_features(self):
+        """Tests if numbers are generalized and the context is described."""
+        features = link_features(
+            LinkContext("http://a.com/item/12?x=1", "Buy now", 3))
+        self.assertEqual(features, {
+            "path:item", "path:<num>", "anchor:buy", "anchor:now",
+            "segments:2", "depth:3", "query"})
+
+    def test_untrained_scorer_keeps_order(self):
+        """Tests if the frontier is FIFO before anything is learned."""
+        frontier = us.new_frontier("priority")
+        frontier.extend(["/c", "/a", "/b"])
+        self.assertEqual([frontier.pop() for _ in range(3)], ["/c", "/a", "/b"])
+
+    def test_learns_targets(self):
+        """Tests if the priority frontier finds more targets than the FIFO."""
+        fifo = self.crawl(us.new_frontier("fifo"), 100)
+        priority = self.crawl(
+            us.PriorityFrontier(NaiveBayesScorer(), rescore_every=10), 100)
+        self.assertGreater(priority, 2*fifo)
+
+        with self.assertRaises(ValueError):
+            us.new_frontier("lifo")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 17:39:42 2026
+
+@author: Carlos
+"""
+
+import os
+import sys
+import gzip
+import unittest
+import http.server
+
+sys.path.append(os.path.dirname(os.path.realpath(__file__)) + "/../crawler")
+
+import crawler as cw
+import robots as rb
+import sitemap as sm
+import transport as tp
+import webpage as wp
+import fixtures as fx
+from scheduler import PolitenessScheduler
+
+
+class TestRobotsAndSitemaps(fx.ServerTestCase):
+    """Tests the robots.txt rules and the sitemap seeding."""
+
+    handler = "DummySitemapHandler"
+
+    def test_robots_rules(self):
+        """Tests if the rules, crawl delay and sitemaps are read once."""
+        scheduler = PolitenessScheduler(rate=10)
+        robots = rb.RobotsCache(tp.Transport(), "bot", scheduler=scheduler)
+        DummySitemapHandler.robots_requests = 0
+        self.assertTrue(robots.allowed(self.domain + "/p1"))
+        self.assertEqual(robots.missing([
+            self.domain + "/p2", "http://a.test/p1", "http://a.test/p2"]),
+            ["http://a.test/p1"])
+        self.assertFalse(robots.allowed(self.domain + "/private/p2"))
+        self.assertEqual(robots.sitemaps(self.domain),
+                         [self.domain + "/sitemap_index.xml"])
+        self.assertEqual(DummySitemapHandler.robots_requests, 1)
+        self.assertEqual(DummySitemapHandler.robots_agent, "bot")
+        self.assertEqual(scheduler.host_rate(self.domain[7:]), 0.5)
+
+    def test_sitemap_index(self):
+        """Tests if nested and gzipped sitemaps are read entry by entry."""
+        urls = list(sm.iter_sitemap(
+            self.domain + "/sitemap_index.xml", tp.Transport(chunk_size=64)))
+        expected = ["{}/p{}".format(self.domain, i) for i in range(1, 9)]
+        expected.append(self.domain + "/private/p9")
+        self.assertEqual(urls, expected)
+
+        nested = sm.iter_sitemap(
+            self.domain + "/sitemap_index.xml", tp.Transport(), max_depth=0)
+        self.assertEqual(list(nested), [])
+
+    def test_seeded_crawl(self):
+        """Tests if unlinked pages are found and disallowed ones skipped."""
+        for engine in ("run", "run_async"):
+            crawler = cw.Crawler(
+                self.domain + "/p0", req_limit=100, sitemaps=True,
+                scheduler=fx.fast_scheduler())
+            getattr(crawler, engine)(4)
+
+            visited = {url.rsplit("/", 1)[1] for url in crawler.visited_urls}
+            self.assertEqual(visited, {"p{}".format(i) for i in range(1, 9)})
+            self.assertEqual(
+                crawler.stats()["counters"]["robots_disallowed"], 1)
+            self.assertEqual(DummySitemapHandler.robots_agent, wp.WebPage._AGENT)
+            # the pages, the root, the robots.txt and the four sitemaps
+            self.assertEqual(crawler.stats()["requests"], 8 + 1 + 1 + 4)
+
+
+class DummySitemapHandler(http.server.BaseHTTPRequestHandler):
+    """Site whose pages are only listed on its sitemaps, one of them
+    disallowed by robots.txt.
+    """
+
+    domain = ""
+    robots_requests = 0
+    robots_agent = None
+
+    def do_GET(self):
+        headers = {"Content-Type": "application/xml"}
+        if self.path == "/robots.txt":
+            type(self).robots_requests += 1
+            type(self).robots_agent = self.headers.get("User-Agent")
+            body = ("User-agent: bot\nDisallow: /private/\nCrawl-delay: 2\n\n"
+                    "User-agent: *\nDisallow: /private/\n\n"
+                    "Sitemap: {}/sitemap_index.xml\n".format(self.domain))
+            body, headers = body.encode(), {}
+        elif self.path == "/sitemap_index.xml":
+            body = self.urlset("sitemapindex", "sitemap", [
+                "/sitemap1.xml", "/sitemap2.xml.gz", "/missing.xml"])
+        elif self.path == "/sitemap1.xml":
+            body = self.urlset("urlset", "url", ["/p1", "/p2", "/p3", "/p4"])
+        elif self.path == "/sitemap2.xml.gz":
+            body = gzip.compress(self.urlset(
+                "urlset", "url", ["/p5", "/p6", "/p7", "/p8", "/private/p9"]))
+            headers = {"Content-Type": "application/x-gzip"}
+        elif self.path.startswith("/p") or self.path.startswith("/private"):
+            body = b"<html><title>Page</title><body>No links</body></html>"
+            headers = {"Content-Type": "text/html"}
+        else:
+            self.send_error(404)
+            return
+
+        self.send_response(200)
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.send_header("Content-Length", len(body))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def urlset(self, root, entry, paths):
+        """bytes: sitemap xml listing the paths."""
+        entries = "".join(
+            "<{0}><loc>{1}{2}</loc><lastmod>2026-10-01</lastmod></{0}>".format(
+                entry, self.domain, path)
+            for path in paths)
+        return ('<?xml version="1.0" encoding="UTF-8"?>\n'
+                '<{0} xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+                '{1}</{0}>'.format(root, entries)).encode()
+
+    def log_message(self, *args):
+        pass
+
+
+if __name__ == "__main__":
+    unittest.main()
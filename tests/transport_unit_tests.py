@@ -0,0 +1,209 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 17:19:45 2026
+
+@author: Carlos
+"""
+
+import os
+import sys
+import gzip
+import unittest
+import http.server
+import urllib.error
+
+sys.path.append(os.path.dirname(os.path.realpath(__file__)) + "/../crawler")
+
+import transport as tp
+import fixtures as fx
+
+
+class TestTransport(fx.ServerTestCase):
+    """Tests the pooled keep-alive transport."""
+
+    handler = "DummyKeepAliveHandler"
+
+    def setUp(self):
+        DummyKeepAliveHandler.clients = set()
+
+    def new_transport(self, **kwargs):
+        """Transport: a transport closed at the end of the test."""
+        transport = tp.Transport(**kwargs)
+        self.addCleanup(transport.close)
+        return transport
+
+    def test_connection_reuse(self):
+        """Tests if sequential requests share a single connection."""
+        transport = self.new_transport()
+        for i in range(5):
+            response = transport.get(self.domain + "/plain")
+            self.assertEqual(response.body, DummyKeepAliveHandler.content)
+        self.assertEqual(len(DummyKeepAliveHandler.clients), 1)
+
+    def test_gzip_decompression(self):
+        """Tests if compressed responses are transparently decompressed."""
+        transport = self.new_transport(chunk_size=7)
+        response = transport.get(self.domain + "/gzip")
+        self.assertEqual(response.body, DummyKeepAliveHandler.content)
+        self.assertEqual(response.headers["Content-Encoding"], "gzip")
+
+    def test_streamed_body(self):
+        """Tests if a streamed body is decompressed and the connection kept."""
+        transport = self.new_transport(chunk_size=7)
+        with transport.open(self.domain + "/gzip") as stream:
+            self.assertEqual(stream.peek(6), DummyKeepAliveHandler.content[:6])
+            parts = iter(lambda: stream.read(100), b"")
+            self.assertEqual(b"".join(parts), DummyKeepAliveHandler.content)
+        transport.get(self.domain + "/plain")
+        self.assertEqual(len(DummyKeepAliveHandler.clients), 1)
+
+        with self.assertRaises(urllib.error.HTTPError):
+            transport.open(self.domain + "/missing")
+
+    def test_refused_and_truncated_bodies(self):
+        """Tests if refused bodies aren't read and long ones are truncated."""
+        transport = self.new_transport(chunk_size=64)
+        refuse = lambda headers: "content_type"  # noqa: E731
+        with self.assertRaises(tp.SkippedContent) as context:
+            transport.get(self.domain + "/plain", accept=refuse)
+        self.assertEqual(context.exception.reason, "content_type")
+        with self.assertRaises(tp.SkippedContent):
+            transport.get(self.domain + "/small", accept=refuse)
+        self.assertEqual(len(DummyKeepAliveHandler.clients), 2)  # kept
+
+        response = transport.get(self.domain + "/gzip", max_bytes=100)
+        self.assertTrue(response.truncated)
+        self.assertEqual(response.body, DummyKeepAliveHandler.content[:100])
+        response = transport.get(self.domain + "/gzip", max_bytes=10**6)
+        self.assertFalse(response.truncated)
+        self.assertEqual(response.body, DummyKeepAliveHandler.content)
+        self.assertEqual(len(DummyKeepAliveHandler.clients), 3)
+
+    def test_redirect_and_errors(self):
+        """Tests if redirects are followed and error codes are raised."""
+        transport = self.new_transport()
+        response = transport.get(self.domain + "/redirect")
+        self.assertEqual(response.url, self.domain + "/plain")
+
+        with self.assertRaises(urllib.error.HTTPError):
+            transport.get(self.domain + "/missing")
+        with self.assertRaises(urllib.error.URLError):
+            transport.get("http://127.0.0.1:1/")
+
+    def test_corrupt_body(self):
+        """Tests if a corrupt compressed body fails and isn't pooled."""
+        transport = self.new_transport()
+        with self.assertRaises(urllib.error.URLError):
+            transport.get(self.domain + "/corrupt")
+        self.assertTrue(all(pool.empty() for pool in transport._pools.values()))
+        with self.assertRaises(urllib.error.URLError):
+            with transport.open(self.domain + "/corrupt") as stream:
+                stream.read()
+
+
+class TestProxy(unittest.TestCase):
+    """Tests the requests sent through a proxy."""
+
+    def setUp(self):
+        DummyProxyHandler.requests = []
+        self.proxy = fx.serve(DummyProxyHandler)
+        self.addCleanup(self.proxy.stop)
+
+    def new_transport(self, **kwargs):
+        """Transport: a transport closed at the end of the test."""
+        transport = tp.Transport(**kwargs)
+        self.addCleanup(transport.close)
+        return transport
+
+    def test_http_through_proxy(self):
+        """Tests if http requests are sent to the proxy with the full url."""
+        proxy = self.proxy.url.replace("http://", "http://user:p%40ss@")
+        transport = self.new_transport(proxies={"http": proxy})
+        response = transport.get("http://shop.test/page?id=1")
+        self.assertEqual(response.body, b"http://shop.test/page?id=1")
+        self.assertEqual(DummyProxyHandler.requests, [
+            ("GET", "http://shop.test/page?id=1", "Basic dXNlcjpwQHNz")])
+
+    def test_https_tunnel(self):
+        """Tests if https requests open a CONNECT tunnel through the proxy."""
+        transport = self.new_transport(proxies={"https": self.proxy.url})
+        with self.assertRaises(urllib.error.URLError):
+            transport.get("https://shop.test/page")  # the proxy can't do TLS
+        self.assertEqual(DummyProxyHandler.requests,
+                         [("CONNECT", "shop.test:443", None)])
+
+    def test_no_proxy(self):
+        """Tests if the hosts listed under 'no' are reached directly."""
+        server = fx.serve(DummyKeepAliveHandler)
+        self.addCleanup(server.stop)
+        transport = self.new_transport(
+            proxies={"http": self.proxy.url, "no": "localhost,127.0.0.1"})
+        response = transport.get(server.url + "/small")
+        self.assertEqual(response.body, b"small")
+        self.assertEqual(DummyProxyHandler.requests, [])
+
+
+class DummyProxyHandler(http.server.BaseHTTPRequestHandler):
+    """Proxy answering the requests itself with the url it was asked for."""
+
+    requests = []
+
+    def do_GET(self):
+        self.requests.append(
+            ("GET", self.path, self.headers.get("Proxy-Authorization")))
+        body = self.path.encode()
+        self.send_response(200)
+        self.send_header("Content-Length", len(body))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_CONNECT(self):
+        self.requests.append(
+            ("CONNECT", self.path, self.headers.get("Proxy-Authorization")))
+        self.send_response(200)
+        self.end_headers()
+        self.wfile.write(b"not a tls handshake\r\n")
+
+    def log_message(self, *args):
+        pass
+
+
+class DummyKeepAliveHandler(http.server.BaseHTTPRequestHandler):
+    """HTTP/1.1 handler that records the client port of each request."""
+
+    protocol_version = "HTTP/1.1"
+    content = b"<html><title>Page</title></html>" * 100
+    clients = set()
+
+    def do_GET(self):
+        self.clients.add(self.client_address)
+        headers = {}
+        if self.path == "/plain":
+            status, body = 200, self.content
+        elif self.path == "/small":
+            status, body = 200, b"small"
+        elif self.path == "/gzip":
+            status, body = 200, gzip.compress(self.content)
+            headers["Content-Encoding"] = "gzip"
+        elif self.path == "/corrupt":
+            status, body = 200, b"\x1f\x8b\x08\x00" + b"garbage" * 10
+            headers["Content-Encoding"] = "gzip"
+        elif self.path == "/redirect":
+            status, body = 302, b""
+            headers["Location"] = "/plain"
+        else:
+            status, body = 404, b"not found"
+
+        self.send_response(status)
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.send_header("Content-Length", len(body))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 17:23:09 2026
+
+@author: Carlos
+"""
+
+import os
+import sys
+import unittest
+
+sys.path.append(os.path.dirname(os.path.realpath(__file__)) + "/../crawler")
+
+import url_store as us
+
+
+class TestUrlStore(unittest.TestCase):
+    """Tests the compact URL sets and the frontier."""
+
+    urls = ["https://mydomain.com/p{}".format(i) for i in range(20000)]
+
+    def test_hashed_set(self):
+        """Tests membership, growth and removals of the fingerprint table."""
+        store = us.HashedUrlSet(capacity=8)
+        self.assertTrue(all(store.add(url) for url in self.urls))
+        self.assertFalse(store.add(self.urls[0]))
+        self.assertEqual(len(store), len(self.urls))
+        self.assertTrue(all(url in store for url in self.urls))
+        self.assertNotIn("https://mydomain.com/other", store)
+        self.assertLess(store.nbytes, 24*len(self.urls))
+
+        for url in self.urls[::2]:
+            store.discard(url)
+        self.assertEqual(len(store), len(self.urls)/2)
+        self.assertNotIn(self.urls[0], store)
+        self.assertIn(self.urls[1], store)
+        self.assertTrue(store.add(self.urls[0]))
+
+    def test_bloom_set(self):
+        """Tests if the Bloom filter scales and keeps its error rate."""
+        store = us.BloomUrlSet(capacity=1000, error_rate=0.01)
+        for url in self.urls:
+            store.add(url)
+        self.assertTrue(all(url in store for url in self.urls))
+
+        others = ["https://other.com/p{}".format(i) for i in range(20000)]
+        false_hits = sum(url in store for url in others)
+        self.assertLess(false_hits/len(others), 0.015)  # sampling noise
+        self.assertLess(store.nbytes, 4*len(self.urls))
+
+    def test_frontier(self):
+        """Tests if the frontier keeps the order and drops repeated URLs."""
+        frontier = us.Frontier(us.new_url_set("hash"))
+        self.assertEqual(frontier.extend(["a", "b", "a", "c"]), 3)
+        self.assertEqual(frontier.pop(), "a")
+        self.assertFalse(frontier.push("a"))
+        self.assertEqual(list(frontier), ["b", "c"])
+
+        with self.assertRaises(ValueError):
+            us.new_url_set("tree")
+
+
+if __name__ == "__main__":
+    unittest.main()